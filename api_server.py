@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import socket
+import traceback
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import explainability
+import feature_panel as fp
+import intel_repository
+import planner
+import result_cache
+import roi_engine
+import schemas
+
+# --- 1. SHARED SCORING STATE ---
+class UnknownMarket(Exception):
+    # Country/ISO key not in the dataset; a KeyError from a bug inside a route is not reported as a 404
+    pass
+
+
+class ScoringService:
+    # Loads the same war room frame, model and attribution cache the dashboards use,
+    # and memoizes fully-rendered JSON bodies so hot routes never touch pandas twice
+
+    def __init__(self, cache=None):
+        self.df = roi_engine.load_war_room_data()
+        if self.df is None:
+            raise FileNotFoundError("No war room dataset found (expected one of %s)" % schemas.WAR_ROOM_FILES)
+        self.explain = explainability.get_attributions()
+        self.version = "%s-%s" % (
+            hashlib.sha256(self.df.to_csv(index=False).encode()).hexdigest()[:12],
+            fp.file_version(fp.RF_MODEL_FILE),
+        )
+        self.cache = cache or result_cache.SHARED
+
+        self.lookup = {}
+        for idx, row in self.df.iterrows():
+            self.lookup.setdefault(str(row['country']).lower(), idx)
+            if isinstance(row.get('iso_alpha'), str):
+                self.lookup.setdefault(row['iso_alpha'].lower(), idx)
+
+    # --- helpers ---
+    def _row(self, key):
+        idx = self.lookup.get(unquote(key).strip().lower())
+        if idx is None:
+            raise UnknownMarket(key)
+        return self.df.loc[idx]
+
+    @staticmethod
+    def _weights(params):
+        return tuple(_float_param(params, name, 1.0, 0.0, 5.0) for name in ('w_safe', 'w_room', 'w_wealth'))
+
+    @staticmethod
+    def _records(frame):
+        return [{k: _clean(v) for k, v in rec.items()} for rec in frame.to_dict('records')]
+
+    # --- routes ---
+    def score(self, params):
+        w_safe, w_room, w_wealth = self._weights(params)
+        cols = ['country', 'iso_alpha', 'Survival_Prob', 'market_room', 'purchasing_power', 'infra_saturation']
+        out = self.df[[c for c in cols if c in self.df.columns]].copy()
+        out['ROI_Score'] = roi_engine.roi_score(self.df, w_safe, w_room, w_wealth)
+        out = out.sort_values('ROI_Score', ascending=False)
+        return {'weights': {'w_safe': w_safe, 'w_room': w_room, 'w_wealth': w_wealth},
+                'markets': self._records(out)}
+
+    def allocate(self, params):
+        w_safe, w_room, w_wealth = self._weights(params)
+        scored = self.df.assign(ROI_Score=roi_engine.roi_score(self.df, w_safe, w_room, w_wealth))
+        alloc = roi_engine.allocate(
+            scored,
+            budget=_float_param(params, 'budget', 100, 0, 1e6),
+            tier_1_ticket=_float_param(params, 'tier_1_ticket', 15, 0, 1e6),
+            tier_2_ticket=_float_param(params, 'tier_2_ticket', 5, 0, 1e6),
+            tier_1_cut=_float_param(params, 'tier_1_cut', 0.70, 0, 1),
+            tier_2_cut=_float_param(params, 'tier_2_cut', 0.40, 0, 1),
+        )
+        return {'weights': {'w_safe': w_safe, 'w_room': w_room, 'w_wealth': w_wealth},
+                'deployed_musd': float(alloc['allocation_musd'].sum()),
+                'allocations': self._records(alloc)}
+
+    def plan(self, params):
+        w_safe, w_room, w_wealth = self._weights(params)
+        budget = _float_param(params, 'budget', 100, 0, 1000)
+        forecasts = planner.get_forecasts()
+        staged = planner.plan(
+            planner.plan_inputs(self.df, forecasts, w_safe, w_room, w_wealth),
+            budget=budget,
+            annual_cap=_float_param(params, 'annual_cap', budget * planner.ANNUAL_CAP_SHARE, 0, 1000),
+            tier_1_ticket=_float_param(params, 'tier_1_ticket', 15, 1, 1e4),
+            tier_2_ticket=_float_param(params, 'tier_2_ticket', 5, 1, 1e4),
+            tier_1_cut=_float_param(params, 'tier_1_cut', 0.70, 0, 1),
+            tier_2_cut=_float_param(params, 'tier_2_cut', 0.40, 0, 1),
+            version=forecasts['version'] if forecasts else None,
+        )
+        return {'weights': {'w_safe': w_safe, 'w_room': w_room, 'w_wealth': w_wealth},
+                'deployed_musd': {str(y): float(v) for y, v in staged['deployed_musd'].items()},
+                'unspent_musd': staged['unspent_musd'],
+                'plan': self._records(staged['plan'])}
+
+    def country(self, key, params):
+        row = self._row(key)
+        w_safe, w_room, w_wealth = self._weights(params)
+        body = {k: _clean(v) for k, v in row.to_dict().items()}
+        body['ROI_Score'] = _clean(roi_engine.roi_score(row, w_safe, w_room, w_wealth))
+        drivers = explainability.country_drivers(self.explain, row['country'])
+        if drivers is not None:
+            body['model'] = {
+                'version': self.explain['model_version'],
+                'survival_prob': _clean(self.explain['survival_prob'][row['country']]),
+                'base_value': _clean(self.explain['base_value']),
+                'drivers': self._records(drivers),
+            }
+        return body
+
+    def intel(self, key, params):
+        row = self._row(key)
+        custom_roi = roi_engine.roi_score(row, *self._weights(params))
+        # Same repository and ROI formula as s_app's audit, which scores this war room frame
+        headline, context, verdict = intel_repository.get_comprehensive_intel(row['country'], row, custom_roi)
+        return {'country': row['country'], 'roi': _clean(custom_roi),
+                'headline': headline, 'context': context, 'verdict': verdict}
+
+    # --- dispatch ---
+    def handle(self, target):
+        parts = urlsplit(target)
+        params = parse_qs(parts.query)
+        segments = [s for s in parts.path.split('/') if s]
+        if segments == ['stats']:
+            body = json.dumps({'version': self.version, 'cache': self.cache.stats()}).encode()
+            return 200, body, None
+
+        key = ('api', self.version, parts.path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        try:
+            return self.cache.get_or_compute(key, lambda: self._render(segments, parts.path, params))
+        except Exception:
+            # A bug inside a route: answer with a JSON 500 (never cached) instead of dropping the connection
+            traceback.print_exc()
+            return 500, json.dumps({'error': 'internal error', 'path': parts.path}).encode(), None
+
+    def _render(self, segments, path, params):
+        try:
+            if segments == ['health']:
+                status, payload = 200, {'status': 'ok', 'version': self.version}
+            elif segments == ['score']:
+                status, payload = 200, self.score(params)
+            elif segments == ['allocate']:
+                status, payload = 200, self.allocate(params)
+            elif segments == ['plan']:
+                status, payload = 200, self.plan(params)
+            elif len(segments) == 2 and segments[0] == 'country':
+                status, payload = 200, self.country(segments[1], params)
+            elif len(segments) == 2 and segments[0] == 'intel':
+                status, payload = 200, self.intel(segments[1], params)
+            else:
+                status, payload = 404, {'error': 'unknown route', 'path': path}
+        except UnknownMarket as exc:
+            status, payload = 404, {'error': 'unknown market', 'market': str(exc)}
+        except ValueError as exc:
+            status, payload = 400, {'error': str(exc)}
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+        etag = '"%s"' % hashlib.sha1(self.version.encode() + body).hexdigest()[:20] if status == 200 else None
+        return status, body, etag
+
+
+def _float_param(params, name, default, lo, hi):
+    if name not in params:
+        return float(default)
+    try:
+        value = float(params[name][0])
+    except ValueError:
+        raise ValueError("'%s' must be a number" % name)
+    if not lo <= value <= hi:
+        raise ValueError("'%s' must be between %s and %s" % (name, lo, hi))
+    return value
+
+
+def _clean(value):
+    # JSON has no NaN/inf, and numpy scalars need unwrapping
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+# --- 2. MINIMAL ASYNC HTTP/1.1 FRONT END ---
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+def _write_response(writer, service, status, body, etag, keep_alive, head_only=False):
+    out = ["HTTP/1.1 %d %s" % (status, REASONS.get(status, '')),
+           "Content-Type: application/json; charset=utf-8",
+           "Content-Length: %d" % len(body),
+           "Cache-Control: no-cache",
+           "X-Data-Version: %s" % service.version,
+           "Connection: %s" % ('keep-alive' if keep_alive else 'close')]
+    if etag:
+        out.append("ETag: %s" % etag)
+    writer.write(('\r\n'.join(out) + '\r\n\r\n').encode() + (b'' if head_only else body))
+
+
+async def _serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.LimitOverrunError:
+                # Header block past the stream limit: the framing is lost, so answer and close
+                _write_response(writer, service, 400, b'{"error":"request head too large"}', None, False)
+                await writer.drain()
+                break
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, target, version = lines[0].split(' ', 2)
+            except ValueError:
+                break
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    k, v = line.split(':', 1)
+                    headers[k.strip().lower()] = v.strip()
+            try:
+                length = int(headers.get('content-length', 0) or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # Without a usable length the next request can't be found either: answer and close
+                _write_response(writer, service, 400, b'{"error":"invalid content-length"}', None, False)
+                await writer.drain()
+                break
+            if length:
+                await reader.readexactly(length)
+
+            if method not in ('GET', 'HEAD'):
+                status, body, etag = 405, b'{"error":"method not allowed"}', None
+            else:
+                status, body, etag = service.handle(target)
+                if etag and headers.get('if-none-match') == etag:
+                    status, body = 304, b''
+
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            _write_response(writer, service, status, body, etag, keep_alive, head_only=method == 'HEAD')
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8080):
+    loop = asyncio.get_running_loop()
+    # Cold data/model/attribution load happens off the event loop, before the socket opens
+    service = await loop.run_in_executor(None, ScoringService)
+    server = await asyncio.start_server(lambda r, w: _serve_connection(service, r, w), host, port,
+                                        reuse_port=hasattr(socket, 'SO_REUSEPORT'), backlog=1024)
+    print(f"⚡ GlobalCharge scoring API {service.version} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def _run_worker(host, port):
+    try:
+        asyncio.run(serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless GlobalCharge ROI scoring API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Event-loop processes sharing the port via SO_REUSEPORT (Linux/macOS)")
+    args = parser.parse_args()
+
+    if args.workers <= 1 or not hasattr(socket, 'SO_REUSEPORT'):
+        _run_worker(args.host, args.port)
+    else:
+        workers = [multiprocessing.Process(target=_run_worker, args=(args.host, args.port), daemon=True)
+                   for _ in range(args.workers)]
+        for w in workers:
+            w.start()
+        try:
+            for w in workers:
+                w.join()
+        except KeyboardInterrupt:
+            for w in workers:
+                w.terminate()
@@ -1,28 +1,67 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import os
 
+import diagnostics
+import feature_panel as fp
+import hot_reload
+import profiling
+import result_cache
+import planner
+import roi_engine
+import schemas
+import timeline
+
 # --- 1. SETUP & BRANDING ---
 st.set_page_config(page_title="GlobalCharge War Room", layout="wide", page_icon="⚡")
+profiling.start_run("app", diagnostics.profile_mode())
+if diagnostics.requested():
+    diagnostics.render("app")
+    st.stop()
 st.markdown("<h1 style='text-align: center; color: #18BC9C;'>⚡ GlobalCharge Strategic Intelligence Engine</h1>", unsafe_allow_html=True)
 
-# --- 2. ROBUST DATA LOADING ---
-@st.cache_data
-def load_data():
-    # We try both names just in case of a typo on GitHub
-    for filename in ['streamlit_data.csv', 'streamlit_data_v2.csv']:
-        if os.path.exists(filename):
-            return pd.read_csv(filename)
-    return None
+# --- 2. ROBUST DATA LOADING (hot-swapped: a data or model push goes live without a restart) ---
+def build_snapshot():
+    # We try both names just in case of a typo on GitHub; only the 'streamlit' view's columns are parsed
+    with profiling.stage('csv_load'):
+        data = schemas.load_view('streamlit')
+    if data is None:
+        raise FileNotFoundError("❌ Critical Error: Data file not found on GitHub!")
+    # Forecasts, history and the weight-independent history maps are built here, on the reload thread,
+    # so a model or master push never lands its rebuild on a request
+    with profiling.stage('plan_forecasts'):
+        forecasts = planner.get_forecasts()
+    with profiling.stage('timeline_history'):
+        history = timeline.get_history()
+    with profiling.stage('timeline_frames'):
+        history_figs = {} if history is None else {
+            metric: timeline.history_figure(history, metric) for metric in timeline.METRICS if metric != 'ROI_Score'}
+    return {'df': data, 'data_version': result_cache.frame_version(data),
+            'model_version': fp.file_version(fp.RF_MODEL_FILE),
+            'forecasts': forecasts, 'history': history, 'history_figs': history_figs}
 
-df = load_data()
+@st.cache_resource
+def live_data():
+    watch = schemas.VIEWS['streamlit']['files'] + [fp.RF_MODEL_FILE, fp.GMM_MODEL_FILE, fp.MASTER_FILE]
+    return hot_reload.LiveData('app', watch, build_snapshot).start()
 
-if df is None:
-    st.error("❌ Critical Error: Data file not found on GitHub!")
+live = live_data()
+try:
+    # Timed per rerun from outside: a live snapshot is a reference read, a cold start builds it here
+    with profiling.stage('live_snapshot'):
+        snapshot = live.current()
+except schemas.SchemaError as e:
+    st.error(f"❌ Critical Error: {e}")
+    st.stop()
+except FileNotFoundError as e:
+    st.error(str(e))
     st.write("Files detected in root:", os.listdir("."))
     st.stop()
 
+# One snapshot per rerun: a swap mid-run never mixes versions
+df = snapshot['df']
+st.markdown(hot_reload.badge_html(live, snapshot), unsafe_allow_html=True)
+
 # --- 3. SIDEBAR: STRATEGY PARAMETERS ---
 st.sidebar.title("💎 Strategy Mandate")
 st.sidebar.markdown("Adjust weights to change the $100M allocation logic.")
@@ -31,27 +70,62 @@ w_safety = st.sidebar.slider("🛡️ Resilience Weight", 0.0, 2.0, 1.0)
 w_room = st.sidebar.slider("📈 Market Room Weight", 0.0, 2.0, 1.0)
 w_wealth = st.sidebar.slider("💰 Wealth Weight", 0.0, 2.0, 1.0)
 
-# LIVE ROI MATH (Formula matches your MBA project logic)
-df['ROI_Score'] = (
-    (df['Survival_Prob'] ** w_safety) * (df['market_room'] ** w_room) * (df['purchasing_power'] ** w_wealth)
-) / (1 + df['infra_saturation']) * 100
+# Shared result cache: every session on the same mandate reuses one ROI frame + map
+DATA_VERSION = snapshot['data_version']
+MODEL_VERSION = snapshot['model_version']
+weights = (w_safety, w_room, w_wealth)
+
+def build_roi_view():
+    # LIVE ROI MATH (Formula matches your MBA project logic)
+    with profiling.stage('roi_math'):
+        scored = df.assign(ROI_Score=roi_engine.roi_score(df, w_safety, w_room, w_wealth))
+
+    # The Choropleth Map (Shaded like Tableau), using 'iso_alpha' for perfect country shading
+    with profiling.stage('choropleth'):
+        fig_map = px.choropleth(
+            scored, locations="iso_alpha", color="ROI_Score",
+            hover_name="country", color_continuous_scale="Viridis",
+            projection="natural earth",
+            hover_data={"Survival_Prob": ":.1%", "market_room": ":.1%", "ROI_Score": ":.1f"}
+        )
+        fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=500)
+    return scored, fig_map
+
+df, fig_map = result_cache.SHARED.get_or_compute(
+    result_cache.make_key('app_roi_view', DATA_VERSION, MODEL_VERSION, weights), build_roi_view
+)
 
 # --- 4. TABS ---
-tab_map, tab_compare = st.tabs(["🌍 Strategic Map & Deep Dive", "📊 Asset Comparison"])
+tab_map, tab_compare, tab_plan = st.tabs(["🌍 Strategic Map & Deep Dive", "📊 Asset Comparison", "🗓️ 2025–2027 Deployment Plan"])
 
 with tab_map:
     st.subheader("Global ROI Heatmap")
-    
-    # 1. The Choropleth Map (Shaded like Tableau)
-    # Using 'iso_alpha' for perfect country shading
-    fig_map = px.choropleth(
-        df, locations="iso_alpha", color="ROI_Score",
-        hover_name="country", color_continuous_scale="Viridis",
-        projection="natural earth",
-        hover_data={"Survival_Prob": ":.1%", "market_room": ":.1%", "ROI_Score": ":.1f"}
-    )
-    fig_map.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=500)
-    st.plotly_chart(fig_map, use_container_width=True)
+    m1, m2 = st.columns([1, 2])
+    map_mode = m1.radio("Map Mode", ["Latest Snapshot", "Time Travel (2011–2024)"], horizontal=True)
+
+    if map_mode == "Latest Snapshot":
+        # 1. The Choropleth Map (built once per mandate in build_roi_view)
+        st.plotly_chart(fig_map, use_container_width=True)
+    else:
+        # 1b. Animated history: every year's frame is built once per metric/mandate, then the slider
+        # and play button run in the browser
+        metric = m2.radio("Metric", list(timeline.METRICS), format_func=lambda m: timeline.METRICS[m][0], horizontal=True)
+        history = snapshot['history']
+        if history is None:
+            st.warning("Historical panel or models missing; showing the latest snapshot.")
+            st.plotly_chart(fig_map, use_container_width=True)
+        else:
+            # Weight-independent metrics come prebuilt with the snapshot; ROI follows the mandate
+            fig_history = snapshot['history_figs'].get(metric)
+            if fig_history is None:
+                with profiling.stage('timeline_frames'):
+                    fig_history = result_cache.SHARED.get_or_compute(
+                        result_cache.make_key(f"app_timeline_{metric}", history['version'], None, weights),
+                        lambda: timeline.history_figure(history, metric, weights)
+                    )
+            st.plotly_chart(fig_history, use_container_width=True)
+            st.caption("Historical ROI uses each year's RF survival probability, EV share, GDP and charging-station index. "
+                       "Color range is fixed across years so frames compare directly; blank markets have no data that year.")
     
     st.divider()
     
@@ -92,7 +166,10 @@ with tab_compare:
     
     if compare_list:
         comp_df = df[df['country'].isin(compare_list)]
-        fig_bar = px.bar(comp_df, x='country', y='ROI_Score', color='country', title="Risk-Adjusted Alpha Comparison")
+        fig_bar = result_cache.SHARED.get_or_compute(
+            result_cache.make_key('app_compare', DATA_VERSION, MODEL_VERSION, weights, tuple(sorted(compare_list))),
+            lambda: px.bar(comp_df, x='country', y='ROI_Score', color='country', title="Risk-Adjusted Alpha Comparison")
+        )
         st.plotly_chart(fig_bar, use_container_width=True)
         
         st.dataframe(
@@ -100,3 +177,38 @@ with tab_compare:
             .style.format({'Survival_Prob': '{:.1%}', 'market_room': '{:.1%}', 'EV_Share_Pct': '{:.1f}%'}),
             use_container_width=True
         )
+
+with tab_plan:
+    st.subheader("🗓️ Staged $100M Deployment (2025–2027)")
+    st.caption("Capital is staged year by year against forecast EV share, survival probability and regime posterior. "
+               "Unspent capital rolls forward; a market can take one ticket per year. Later tickets are discounted "
+               f"{planner.PLAN_DISCOUNT:.0%} a year, so a market waits only if its forecast ROI outgrows that.")
+    p1, p2 = st.columns(2)
+    budget = p1.slider("Mandate ($M)", 25, 200, 100, step=5)
+    annual_cap = p2.slider("Max deployment per year ($M)", 5, budget, min(budget, max(5, budget // 2)), step=5)
+
+    forecasts = snapshot['forecasts']
+
+    def build_plan():
+        with profiling.stage('plan_dp'):
+            inputs = planner.plan_inputs(df, forecasts, w_safety, w_room, w_wealth)
+            return planner.plan(inputs, budget=budget, annual_cap=annual_cap,
+                                version=forecasts['version'] if forecasts else None)
+
+    staged = result_cache.SHARED.get_or_compute(
+        result_cache.make_key('app_plan', DATA_VERSION, forecasts['version'] if forecasts else None,
+                              weights + (budget, annual_cap)),
+        build_plan
+    )
+    y_cols = st.columns(len(planner.PLAN_YEARS))
+    for col, year in zip(y_cols, planner.PLAN_YEARS):
+        col.metric(f"{year} Deployment", f"${staged['deployed_musd'].get(year, 0):,.0f}M")
+    if staged['unspent_musd']:
+        st.warning(f"${staged['unspent_musd']:,.0f}M stays undeployed: no further market clears the survival cuts.")
+    st.dataframe(
+        staged['plan'].style.format({'allocation_musd': '${:,.0f}M', 'ROI_Score': '{:.1f}', 'Survival_Prob': '{:.1%}',
+                                     'EV_Share_Pct': '{:.1f}%', 'regime_prob': '{:.2f}'}, na_rep='–'),
+        use_container_width=True, hide_index=True
+    )
+
+profiling.end_run()
@@ -0,0 +1,335 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.express as px
+import sklearn
+
+import charger_demand
+import feature_panel as fp
+import iea_ingest
+import peers
+import planner
+import report_export
+import roi_engine
+import schemas
+import sensitivity
+import siting
+import timeline
+from benchmarks import synthetic
+
+# Usage (from the repo root):
+#   python -m benchmarks.run_benchmarks                      # run all, compare to benchmarks/baseline.json
+#   python -m benchmarks.run_benchmarks --filter score infer
+#   python -m benchmarks.run_benchmarks --save-baseline      # re-record the baseline on this machine
+
+BASELINE_FILE = os.path.join('benchmarks', 'baseline.json')
+RESULTS_FILE = os.path.join('benchmarks', 'latest.json')
+DATA_GLOBS = ['*.csv', os.path.join('py', 'py', '*.csv')]
+
+# --- 1. REGISTRY ---
+BENCHMARKS = []
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def benchmark(group, name):
+    # Registers a setup function; it runs once, untimed, and returns the callable to time
+    def register(setup):
+        BENCHMARKS.append((group, f"{group}/{name}", setup))
+        return setup
+    return register
+
+# --- 2. CASES ---
+# 2a. Load: every CSV in the root and py/py, as CSV and as a columnar (parquet) copy
+# Removed when the interpreter exits (TemporaryDirectory's finalizer), even after a failed run
+_parquet_tmp = tempfile.TemporaryDirectory(prefix='gc_bench_')
+_parquet_dir = _parquet_tmp.name
+
+def _register_loads():
+    for pattern in DATA_GLOBS:
+        for path in sorted(glob.glob(pattern)):
+            label = path.replace(os.sep, '/')
+
+            @benchmark('load', f"csv/{label}")
+            def _csv(path=path):
+                return lambda: pd.read_csv(path, low_memory=False)
+
+            @benchmark('load', f"parquet/{label}")
+            def _parquet(path=path):
+                target = os.path.join(_parquet_dir, os.path.basename(path) + '.parquet')
+                try:
+                    pd.read_csv(path, low_memory=False).to_parquet(target)
+                except ImportError:
+                    raise SkipBenchmark("pyarrow not installed (pip install -r requirements-dev.txt)")
+                except (ValueError, TypeError) as exc:
+                    raise SkipBenchmark(f"no columnar copy: {exc.__class__.__name__}")
+                return lambda: pd.read_parquet(target)
+
+_register_loads()
+
+# IEA workbooks, streamed row by row (the ingest path, not a full-sheet parse)
+@benchmark('load', "xlsx_stream/EVDataExplorer2025.xlsx")
+def _xlsx_ev():
+    return lambda: iea_ingest.stream_ev_data()
+
+@benchmark('load', "xlsx_stream/GlobalEVOutlook2025PolicyExplorer.xlsx")
+def _xlsx_policy():
+    return lambda: iea_ingest.stream_policies()
+
+# Projected, typed view loads (schemas.py) on the live files
+for _view in schemas.VIEWS:
+    @benchmark('load', f"view/{_view}")
+    def _view_load(view=_view):
+        if schemas.load_view(view) is None:
+            raise SkipBenchmark(f"no file for the '{view}' view")
+        return lambda: schemas.load_view(view)
+
+# Full parse vs. the 'streamlit' view on a 100k-row replica of streamlit_data.csv
+def _streamlit_replica(n=100_000):
+    if not os.path.exists('streamlit_data.csv'):
+        raise SkipBenchmark("streamlit_data.csv missing")
+    target = os.path.join(_parquet_dir, f"streamlit_data_{n}.csv")
+    if not os.path.exists(target):
+        src = pd.read_csv('streamlit_data.csv')
+        pd.concat([src] * (n // len(src) + 1)).head(n).to_csv(target, index=False)
+    return target
+
+@benchmark('load', "csv/streamlit_data.csv/100000")
+def _replica_csv():
+    path = _streamlit_replica()
+    return lambda: pd.read_csv(path, low_memory=False)
+
+@benchmark('load', "view/streamlit/100000")
+def _replica_view():
+    path = _streamlit_replica()
+    return lambda: schemas.load_view('streamlit', [path])
+
+# 2b. ROI scoring at the live 35-market size and scaled synthetic panels
+for _n in (35, 1_000, 100_000):
+    @benchmark('score', f"roi_score/{_n}")
+    def _score(n=_n):
+        panel = synthetic.war_room_panel(n)
+        return lambda: roi_engine.roi_score(panel, 1.2, 0.8, 1.1)
+
+# Charger demand: re-deriving the DC gap after a mix change (catalogue/fleet already cached)
+@benchmark('score', "charger_demand/segment_reweight")
+def _charger_demand():
+    model = charger_demand.get_demand_model()
+    if model is None:
+        raise SkipBenchmark("charger demand inputs missing")
+    mix = {'B - Compact': 2.0, 'F - Luxury': 0.5}
+    return lambda: (charger_demand.market_demand(model, segment_weights=mix),
+                    charger_demand.segment_demand(model, segment_weights=mix))
+
+# Sobol sensitivity of rank and allocation: one sweep over the full Saltelli design
+@benchmark('score', "sensitivity/sobol_35x8192")
+def _sensitivity():
+    panel = synthetic.war_room_panel(35)
+    return lambda: sensitivity.analyze(panel)
+
+# 2c. Allocation: same $100M over 1k markets, sliced into ever finer tickets
+for _t1, _t2 in ((15, 5), (1.5, 0.5), (0.15, 0.05)):
+    @benchmark('allocate', f"tiers_{_t1}M_{_t2}M/1000")
+    def _allocate(t1=_t1, t2=_t2):
+        panel = synthetic.war_room_panel(1_000)
+        panel['ROI_Score'] = roi_engine.roi_score(panel)
+        return lambda: roi_engine.allocate(panel, budget=100, tier_1_ticket=t1, tier_2_ticket=t2,
+                                           tier_1_cut=0.5, tier_2_cut=0.2)
+
+# Staged 2025-2027 plan on the live markets: a slider move re-plans with fresh weights every call
+@benchmark('allocate', "staged_plan/live_x3")
+def _staged_plan():
+    df, forecasts = roi_engine.load_war_room_data(), planner.get_forecasts()
+    if df is None or forecasts is None:
+        raise SkipBenchmark("war room data or models missing")
+    rng = np.random.default_rng(0)
+    return lambda: planner.plan(planner.plan_inputs(df, forecasts, *rng.uniform(0.5, 1.5, 3)),
+                                version=forecasts['version'])
+
+# 2d. Regime-aware RF inference across batch sizes
+for _n in (1, 10, 100, 1_000, 10_000):
+    @benchmark('infer', f"rf_predict_proba/{_n}")
+    def _infer(n=_n):
+        model = fp.load_model(fp.RF_MODEL_FILE)
+        if model is None:
+            raise SkipBenchmark(f"{fp.RF_MODEL_FILE} missing")
+        X = synthetic.rf_feature_matrix(n)[fp.RF_FEATURES]
+        return lambda: model.predict_proba(X)
+
+# 2e. Choropleth figure construction
+for _n in (35, 1_000):
+    @benchmark('render', f"choropleth/{_n}")
+    def _render(n=_n):
+        panel = synthetic.war_room_panel(n)
+        panel['ROI_Score'] = roi_engine.roi_score(panel)
+        return lambda: px.choropleth(panel, locations='iso_alpha', color='ROI_Score', hover_name='country',
+                                     color_continuous_scale='Viridis', projection='natural earth')
+
+# One static audit page for a mandate, with the market's figures already cached (the board-pack inner loop)
+@benchmark('render', "audit_report/html")
+def _audit_report():
+    ctx = report_export.build_context('s_app')
+    report_export._figures(ctx, 'Germany')
+    return lambda: report_export.render_report(ctx, 'Germany', 'growth', (0.8, 1.6, 1.0))
+
+# 2011-2024 time-travel map: a new mandate rebuilds every year's ROI frame into one animated figure
+@benchmark('render', "timeline/roi_frames")
+def _timeline():
+    history = timeline.get_history()
+    if history is None:
+        raise SkipBenchmark("historical panel or models missing")
+    return lambda: timeline.history_figure(history, 'ROI_Score', (1.2, 0.8, 1.0))
+
+# 2f. Charger siting: nearest-station / rival counts / demand kernel over candidate sites
+for _n in (10_000, 1_000_000):
+    @benchmark('siting', f"score_sites/{_n}")
+    def _siting(n=_n):
+        market = siting.synthetic_market('Germany', 24_000, 84e6)
+        index = siting.build_index(market['stations'])
+        candidates = siting.synthetic_candidates(market, n)
+        return lambda: siting.score_sites(market, candidates, index)
+
+# 2g. Peer markets: building the precomputed neighbour table vs. one dialog lookup against it
+@benchmark('peers', "index_build/panel")
+def _peer_index():
+    if fp.file_version(fp.MASTER_FILE) is None:
+        raise SkipBenchmark(f"{fp.MASTER_FILE} missing")
+    panel = fp.build_panel()
+    return lambda: peers.build_index(panel)
+
+@benchmark('peers', "lookup/top5")
+def _peer_lookup():
+    index = peers.get_index()
+    if index is None:
+        raise SkipBenchmark(f"{fp.MASTER_FILE} missing")
+    return lambda: peers.neighbours(index, 'Germany', k=5)
+
+# --- 3. TIMER ---
+def time_call(fn, repeat=5, min_batch=0.05):
+    fn()  # warm-up: imports, caches, first-touch allocation
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_batch or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_batch / 10 else 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'number': number, 'repeat': repeat}
+
+
+def run(filters=None, repeat=5, min_batch=0.05):
+    results = {}
+    for group, name, setup in BENCHMARKS:
+        if filters and not any(f in name for f in filters):
+            continue
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                fn = setup()
+                stats = time_call(fn, repeat=repeat, min_batch=min_batch)
+        except SkipBenchmark as exc:
+            results[name] = {'group': group, 'skipped': str(exc)}
+            print(f"  ⏭️  {name:<70} skipped ({exc})")
+            continue
+        results[name] = dict(stats, group=group)
+        print(f"  ⏱️  {name:<70} {_fmt(stats['median_s']):>10}")
+    return results
+
+# --- 4. REPORTING ---
+def _fmt(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def metadata():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__, 'pandas': pd.__version__,
+        'sklearn': sklearn.__version__, 'plotly': plotly.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Ratio of current to baseline median; >1 + threshold is a regression
+    rows = []
+    for name, cur in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'median_s' not in base or 'median_s' not in cur:
+            continue
+        ratio = cur['median_s'] / base['median_s']
+        verdict = 'REGRESSION' if ratio > 1 + threshold else ('faster' if ratio < 1 - threshold else 'ok')
+        rows.append({'benchmark': name, 'baseline': _fmt(base['median_s']), 'current': _fmt(cur['median_s']),
+                     'ratio': round(ratio, 3), 'verdict': verdict})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GlobalCharge benchmark suite")
+    parser.add_argument('--filter', nargs='*', help="Only run benchmarks whose name contains one of these")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-batch', type=float, default=0.05, help="Minimum seconds per timed batch")
+    parser.add_argument('--out', default=RESULTS_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.25, help="Relative slowdown flagged as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    print(f"⚡ GlobalCharge benchmarks ({len(BENCHMARKS)} registered)")
+    report = {'meta': metadata(), 'results': run(args.filter, args.repeat, args.min_batch)}
+    skipped = [name for name, res in report['results'].items() if 'skipped' in res]
+    if skipped:
+        print(f"\n⏭️  {len(skipped)} of {len(report['results'])} benchmark(s) skipped; their reasons are listed above")
+
+    with open(args.out, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\n📁 Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline found; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline) as fh:
+        diff = compare(report['results'], json.load(fh), args.threshold)
+    if diff.empty:
+        print("ℹ️ No overlapping benchmarks with the baseline.")
+        return 0
+    print("\n📊 Comparison vs baseline\n" + diff.to_string(index=False))
+    regressions = int((diff['verdict'] == 'REGRESSION').sum())
+    print(f"\n{'🚨' if regressions else '✅'} {regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+# --- SYNTHETIC COUNTRY PANELS ---
+# Scaled-up stand-ins for the 35-row war room snapshot. Column names, ranges and
+# dtypes follow war_room_data_v3.csv and the regime-aware RF's feature panel so
+# the same engine code runs unchanged on 1k or 100k "markets".
+
+ISO_CODES = ['AUS', 'AUT', 'BEL', 'BRA', 'CAN', 'CHL', 'CHN', 'DNK', 'FIN', 'FRA', 'DEU', 'GRC', 'ISL', 'IND',
+             'ISR', 'ITA', 'JPN', 'MEX', 'NLD', 'NZL', 'NOR', 'POL', 'PRT', 'KOR', 'ESP', 'SWE', 'CHE', 'TUR',
+             'GBR', 'USA', 'ZAF', 'ARG', 'COL', 'IDN', 'THA']
+
+
+def war_room_panel(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    share = rng.gamma(1.5, 12, n_rows).clip(0.1, 95)
+    gdp = rng.lognormal(10.4, 0.6, n_rows)
+    policy = rng.uniform(0, 4, n_rows)
+    return pd.DataFrame({
+        'country': [f"Market_{i:06d}" for i in range(n_rows)],
+        'iso_alpha': np.resize(ISO_CODES, n_rows),
+        'year': 2024,
+        'EV_Share_Pct': share,
+        'EV_Share_Pct_2023': (share - rng.normal(2.5, 3, n_rows)).clip(0, 95),
+        'GDP_per_capita': gdp,
+        'Policy_Score': policy,
+        'Policy_Score_2023': policy + rng.normal(0, 0.3, n_rows),
+        'Survival_Prob': rng.beta(2, 3, n_rows),
+        'market_room': (100 - share) / 100,
+        'purchasing_power': gdp / 10000,
+        'infra_saturation': rng.uniform(0, 1, n_rows),
+    })
+
+
+def rf_feature_matrix(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'log_gdp': rng.normal(10.4, 0.6, n_rows),
+        'Policy_Score': rng.uniform(0, 4, n_rows),
+        'infra_score': rng.beta(0.6, 4, n_rows),
+        'lagged_share': rng.gamma(1.5, 12, n_rows).clip(0, 95),
+        'news_sentiment': rng.normal(0, 0.2, n_rows),
+        'consumer_review_sentiment': rng.normal(0, 0.2, n_rows),
+        'regime_prob': rng.uniform(0, 1, n_rows),
+    })
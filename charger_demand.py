@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+import feature_panel as fp
+import iea_ingest
+
+# --- 1. FILES & ASSUMPTIONS ---
+SPEC_FILE = 'py/py/electric_vehicles_spec_2025.csv.csv'
+BEV_SHARE_FILE = 'py/py/bev-share-new-ev.csv'
+EV_SALES_FILE = 'py/py/electric-car-sales.csv'
+
+# OWID spells out the names the war room abbreviates
+NAME_ALIASES = {'United Kingdom': 'UK', 'United States': 'USA', 'Turkiye': 'Turkey'}
+
+ANNUAL_KM = 12_000            # Distance per car per year
+PUBLIC_DC_SHARE = 0.20        # Share of BEV energy bought at public DC chargers
+PHEV_KWH_PER_YEAR = 1_500     # Plug-ins top up at home/AC; no DC demand
+FLEET_LIFE_YEARS = 8          # Sales still on the road
+TARGET_UTILISATION = 0.15     # Share of hours a DC charger is busy
+POINT_KW = 20                 # DC-equivalent kW per public charging point: the IEA counts slow AC and fast DC together, ~1/3 fast at ~60 kW
+MIN_POINTS_PER_1K_BEV = 0.1   # Below this a charging-point census is a reporting gap, not a market
+
+POWER_BANDS = [0, 50, 100, 150, 250, np.inf]
+POWER_BAND_LABELS = ['<50 kW', '50-100 kW', '100-150 kW', '150-250 kW', '250+ kW']
+
+# --- 2. SPEC CATALOGUE (479 models) ---
+def load_catalogue(spec_file=SPEC_FILE):
+    spec = pd.read_csv(spec_file, usecols=['brand', 'model', 'segment', 'battery_capacity_kWh',
+                                           'efficiency_wh_per_km', 'fast_charging_power_kw_dc', 'fast_charge_port'])
+    spec = spec.dropna(subset=['efficiency_wh_per_km', 'fast_charging_power_kw_dc', 'fast_charge_port'])
+    spec['power_band'] = pd.cut(spec['fast_charging_power_kw_dc'], POWER_BANDS, labels=POWER_BAND_LABELS, right=False)
+    return spec.reset_index(drop=True)
+
+# --- 3. MARKET FLEET (sales x BEV mix) ---
+def load_fleet(sales_file=EV_SALES_FILE, share_file=BEV_SHARE_FILE):
+    # Country x Year grids, then a rolling fleet-life window: BEV/PHEV cars on the road
+    sales = pd.read_csv(sales_file).pivot_table(index='Entity', columns='Year', values='Electric cars sold')
+    share = pd.read_csv(share_file).pivot_table(index='Entity', columns='Year',
+                                                values='Battery-electric as a share of electric cars sold')
+    sales, share = sales.align(share, join='left')
+    share = share.ffill(axis=1).fillna(50) / 100
+    sales = sales.fillna(0)
+
+    bev = (sales * share).T.rolling(FLEET_LIFE_YEARS, min_periods=1).sum().T
+    phev = (sales * (1 - share)).T.rolling(FLEET_LIFE_YEARS, min_periods=1).sum().T
+    fleet = pd.DataFrame({
+        'country': sales.index.map(lambda name: NAME_ALIASES.get(name, name)),
+        'year': sales.columns[-1],
+        'bev_stock': bev.iloc[:, -1].to_numpy(),
+        'phev_stock': phev.iloc[:, -1].to_numpy(),
+    })
+    return fleet.set_index('country')
+
+# --- 4. DEMAND MODEL (cached per file version) ---
+_cache = {}
+
+def get_demand_model(spec_file=SPEC_FILE, sales_file=EV_SALES_FILE, share_file=BEV_SHARE_FILE):
+    # Everything that doesn't depend on the assumptions: catalogue arrays, fleet vector, segment one-hot
+    key = (fp.file_version(spec_file), fp.file_version(sales_file), fp.file_version(share_file))
+    if None in key:
+        return None
+    if key not in _cache:
+        catalogue = load_catalogue(spec_file)
+        fleet = load_fleet(sales_file, share_file)
+        cells = pd.MultiIndex.from_frame(
+            catalogue[['fast_charge_port', 'power_band']].astype(str).drop_duplicates().sort_values(
+                ['fast_charge_port', 'power_band'], key=lambda s: s.map(_band_order)))
+        cell_of_model = cells.get_indexer(pd.MultiIndex.from_frame(catalogue[['fast_charge_port', 'power_band']].astype(str)))
+        onehot = np.zeros((len(catalogue), len(cells)))
+        onehot[np.arange(len(catalogue)), cell_of_model] = 1
+        _cache.clear()
+        _cache[key] = {
+            'version': '-'.join(key),
+            'catalogue': catalogue,
+            'fleet': fleet,
+            'cells': cells,
+            'onehot': onehot,
+            'wh_per_km': catalogue['efficiency_wh_per_km'].to_numpy(float),
+            'segments': catalogue['segment'].to_numpy(),
+        }
+    return _cache[key]
+
+def _band_order(value):
+    return POWER_BAND_LABELS.index(value) if value in POWER_BAND_LABELS else value
+
+def _model_weights(model, segment_weights=None):
+    # Equal weight per model unless a segment mix is given (e.g. {'B - Compact': 2})
+    if segment_weights:
+        w = np.array([segment_weights.get(seg, 1.0) for seg in model['segments']], dtype=float)
+    else:
+        w = np.ones(len(model['segments']))
+    return w / w.sum()
+
+def segment_demand(model, annual_km=ANNUAL_KM, dc_share=PUBLIC_DC_SHARE, utilisation=TARGET_UTILISATION,
+                   segment_weights=None):
+    # Market x (port, power band) DC demand: one outer product over the catalogue, then a one-hot fold
+    w = _model_weights(model, segment_weights)
+    dc_kwh_per_car = w * model['wh_per_km'] / 1000 * annual_km * dc_share
+    per_cell = dc_kwh_per_car @ model['onehot']
+    dc_kwh = np.outer(model['fleet']['bev_stock'].to_numpy(), per_cell)
+
+    countries = model['fleet'].index
+    index = pd.MultiIndex.from_tuples(
+        [(c, port, band) for c in countries for port, band in model['cells']],
+        names=['country', 'port', 'power_band'],
+    )
+    out = pd.DataFrame({'dc_kwh': dc_kwh.ravel()}, index=index)
+    out['dc_kw_demand'] = out['dc_kwh'] / (8760 * utilisation)
+    return out.sort_index()
+
+def query(segments, country=None, port=None, band=None):
+    # Indexed lookup on the (country, port, power_band) index; None means "all"
+    sl = pd.IndexSlice[country if country is not None else slice(None),
+                       port if port is not None else slice(None),
+                       band if band is not None else slice(None)]
+    return segments.loc[sl, :]
+
+def market_demand(model, annual_km=ANNUAL_KM, dc_share=PUBLIC_DC_SHARE, utilisation=TARGET_UTILISATION,
+                  segment_weights=None):
+    # Per market: fleet, total charging energy, public DC energy and the DC kW needed to serve it
+    fleet = model['fleet']
+    w = _model_weights(model, segment_weights)
+    kwh_per_bev = float(w @ model['wh_per_km']) / 1000 * annual_km
+    out = fleet.copy()
+    out['annual_kwh'] = fleet['bev_stock'] * kwh_per_bev + fleet['phev_stock'] * PHEV_KWH_PER_YEAR
+    out['dc_kwh'] = fleet['bev_stock'] * kwh_per_bev * dc_share
+    out['dc_kw_demand'] = out['dc_kwh'] / (8760 * utilisation)
+    return out
+
+# --- 5. SUPPLY / DEMAND GAP ---
+_supply_cache = {}
+
+def station_supply(ev_workbook=iea_ingest.EV_WORKBOOK):
+    # Latest public charging points per market from the IEA "EV charging points" series (the master
+    # CSV's station column is 0 for USA, South Korea and Turkey and 12 for China). Empty if the workbook is missing.
+    version = fp.file_version(ev_workbook)
+    if version is None:
+        return pd.Series(dtype=float, name='charging_points')
+    if version not in _supply_cache:
+        _, points = iea_ingest.stream_ev_data(ev_workbook)
+        points = points[points > 0].rename_axis(['country', 'year']).reset_index()
+        latest = points.sort_values('year').groupby('country').tail(1)
+        _supply_cache.clear()
+        _supply_cache[version] = latest.set_index('country')['total_charging_stations'].rename('charging_points')
+    return _supply_cache[version]
+
+def supply_gap(demand, supply):
+    # infra_saturation = supply / (supply + demand): 0 = unserved, 0.5 = balanced, ->1 = overbuilt.
+    # NaN where the census is missing or implausibly small; `census` says which.
+    gap = demand[['bev_stock', 'dc_kw_demand']].join(supply, how='left')
+    gap['supply_kw'] = gap['charging_points'] * POINT_KW
+    gap['gap_kw'] = gap['dc_kw_demand'] - gap['supply_kw']
+    per_1k_bev = gap['charging_points'] / gap['bev_stock'].where(gap['bev_stock'] > 0) * 1000
+    gap['census'] = np.select([gap['charging_points'].isna(), per_1k_bev < MIN_POINTS_PER_1K_BEV],
+                              ['missing', 'implausible'], 'ok')
+    total = gap['supply_kw'] + gap['dc_kw_demand']
+    gap['infra_saturation'] = (gap['supply_kw'] / total).where((total > 0) & (gap['census'] == 'ok'))
+    return gap
+
+_gap_memo = {}
+
+def get_supply_gap(ev_workbook=iea_ingest.EV_WORKBOOK, **assumptions):
+    model = get_demand_model()
+    if model is None or fp.file_version(ev_workbook) is None:
+        return None
+    key = (model['version'], fp.file_version(ev_workbook), tuple(sorted(
+        (k, tuple(sorted(v.items())) if isinstance(v, dict) else v) for k, v in assumptions.items())))
+    if key not in _gap_memo:
+        _gap_memo.clear()
+        _gap_memo[key] = supply_gap(market_demand(model, **assumptions), station_supply(ev_workbook))
+    return _gap_memo[key]
+
+def apply_gap(df, gap, country_col='country'):
+    # Swap in the modelled saturation where the census supports it. Markets without a usable census
+    # (or outside the demand model) keep the file's infra_saturation and are flagged in infra_census.
+    if gap is None:
+        return df
+    df['infra_census'] = df[country_col].map(gap['census']).fillna('no demand model')
+    df['infra_saturation'] = df[country_col].map(gap['infra_saturation']).fillna(df['infra_saturation'])
+    df['dc_kw_demand'] = df[country_col].map(gap['dc_kw_demand'])
+    df['dc_supply_kw'] = df[country_col].map(gap['supply_kw'])
+    return df
+
+
+def census_note(row):
+    # Caption for a market whose saturation could not be modelled; None when it was
+    status = row.get('infra_census')
+    if status is None or status == 'ok':
+        return None
+    if status == 'implausible':
+        reason = f"the IEA lists only {row['dc_supply_kw'] / POINT_KW:,.0f} public charging points for its BEV fleet"
+    elif status == 'missing':
+        reason = "the IEA has no public charging-point series for it"
+    else:
+        reason = "it is outside the BEV demand model"
+    return f"⚡ DC supply/demand gap not modelled for {row['country']}: {reason}, so its infra saturation is the dataset's charging index."
@@ -0,0 +1,57 @@
+import streamlit as st
+import plotly.express as px
+
+import profiling
+import result_cache
+
+# --- 1. QUERY-PARAM SWITCHES ---
+# ?diagnostics=1 swaps the dashboard for the hidden Diagnostics page,
+# ?profile=cpu|mem|all turns on cProfile / tracemalloc for this rerun.
+def requested():
+    return st.query_params.get('diagnostics') in ('1', 'true', 'yes')
+
+
+def profile_mode():
+    return st.query_params.get('profile')
+
+# --- 2. HIDDEN DIAGNOSTICS PAGE ---
+def render(app_name):
+    st.markdown(f"<h2 style='color: #0f766e; margin-bottom: 0;'>🩺 Diagnostics: {app_name}</h2>", unsafe_allow_html=True)
+    st.caption(f"Release `{profiling.RELEASE}` | rolling window of the last {profiling.BUFFER_SIZE:,} stage timings in this server process")
+
+    summary = profiling.summary()
+    if summary.empty:
+        st.info("No timings recorded yet. Open the dashboard (optionally with `?profile=cpu`, `mem` or `all`) and come back.")
+    else:
+        c1, c2, c3 = st.columns(3)
+        reruns = summary[summary['stage'] == 'rerun_total']
+        c1.metric("Reruns Timed", f"{int(reruns['calls'].sum()) if not reruns.empty else 0}")
+        c2.metric("Slowest Stage p95", f"{summary['p95_ms'].max():.1f} ms", summary.iloc[0]['stage'])
+        c3.metric("Result Cache Hit Rate", f"{result_cache.SHARED.stats()['hit_rate']:.1%}")
+
+        st.markdown("### ⏱️ Per-Stage Latency & Memory")
+        fig = px.bar(summary, x='p95_ms', y='stage', color='app', orientation='h', barmode='group',
+                     labels={'p95_ms': 'p95 latency (ms)', 'stage': ''})
+        fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=320)
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(summary.style.format({'p50_ms': '{:.2f}', 'p95_ms': '{:.2f}', 'max_ms': '{:.2f}', 'peak_mem_kb': '{:,.0f}'}, na_rep='—'),
+                     hide_index=True, use_container_width=True)
+        st.caption("Peak memory is process-wide, so it is attributed only while a single session runs with `?profile=mem` or `all`; "
+                   "stages of concurrent memory-profiled reruns show —.")
+
+    st.markdown("### 🗄️ Shared Result Cache")
+    st.json(result_cache.SHARED.stats())
+
+    profiles = profiling.last_profiles()
+    if profiles:
+        st.markdown("### 🔬 Latest cProfile Captures")
+        for app, prof in profiles.items():
+            with st.expander(f"{app} | run {prof['run_id']}"):
+                st.code(prof['report'])
+
+    c1, c2 = st.columns(2)
+    c1.download_button("EXPORT TIMINGS (JSONL)", profiling.export_jsonl(), file_name="globalcharge_timings.jsonl",
+                       mime="application/json")
+    if c2.button("RESET COUNTERS"):
+        profiling.clear()
+        st.rerun()
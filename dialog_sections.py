@@ -0,0 +1,25 @@
+import streamlit as st
+
+import profiling
+import result_cache
+import siting
+
+# Streamlit sections shared by the s_app and sr_app audit dialogs. The computation lives in the
+# modules they call, which the API and the board-pack export import without streamlit.
+
+# --- 1. CHARGER SITING ---
+def siting_section(country, title):
+    # Cached per charging-census version, independent of the mandate weights
+    st.markdown(f"### {title}")
+    with profiling.stage('siting'):
+        sited = result_cache.SHARED.get_or_compute(
+            result_cache.make_key('siting', siting.input_version(), None, country=country),
+            lambda: siting.site_country(country)
+        )
+    s1, s2, s3 = st.columns(3)
+    s1.metric("Public Stations", f"{sited['stations']:,}")
+    s2.metric("Uncovered Area", f"{sited['uncovered_share']:.0%}", f">{siting.COVERAGE_KM} km from a charger", delta_color="off")
+    s3.metric("Median Distance", f"{sited['median_nearest_km']:.1f} km" if sited['median_nearest_km'] is not None else "n/a",
+              "to nearest station", delta_color="off")
+    st.plotly_chart(siting.siting_figure(sited), use_container_width=True)
+    st.caption(siting.siting_caption(sited))
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import feature_panel as fp
+
+# --- 1. PATH-DEPENDENT TREE SHAP (Lundberg et al., Algorithm 2) ---
+# Every sample is pushed through the same recursion at once: the path's
+# "one fractions" and permutation weights are arrays over the batch, so a
+# single walk of each tree attributes every country in one pass.
+
+def _extend(path, zero_frac, one_frac, feature):
+    depth = len(path)
+    n = len(one_frac)
+    path.append([feature, zero_frac, one_frac, np.ones(n) if depth == 0 else np.zeros(n)])
+    for i in range(depth - 1, -1, -1):
+        path[i + 1][3] = path[i + 1][3] + one_frac * path[i][3] * (i + 1) / (depth + 1)
+        path[i][3] = zero_frac * path[i][3] * (depth - i) / (depth + 1)
+
+
+def _unwind(path, index):
+    depth = len(path) - 1
+    _, zero_frac, one_frac, _ = path[index]
+    hot = one_frac != 0
+    safe_one = np.where(hot, one_frac, 1.0)
+    next_one = path[depth][3]
+    for i in range(depth - 1, -1, -1):
+        w = path[i][3]
+        hot_w = next_one * (depth + 1) / ((i + 1) * safe_one)
+        cold_w = w * (depth + 1) / (zero_frac * (depth - i))
+        path[i][3] = np.where(hot, hot_w, cold_w)
+        next_one = w - hot_w * zero_frac * (depth - i) / (depth + 1)
+    for i in range(index, depth):
+        path[i][:3] = path[i + 1][:3]
+    path.pop()
+
+
+def _unwound_sum(path, index):
+    depth = len(path) - 1
+    _, zero_frac, one_frac, _ = path[index]
+    hot = one_frac != 0
+    safe_one = np.where(hot, one_frac, 1.0)
+    next_one = path[depth][3]
+    hot_total = np.zeros_like(next_one)
+    cold_total = np.zeros_like(next_one)
+    for i in range(depth - 1, -1, -1):
+        tmp = next_one / ((i + 1) * safe_one)
+        hot_total = hot_total + tmp
+        next_one = path[i][3] - tmp * zero_frac * (depth - i)
+        cold_total = cold_total + path[i][3] / (zero_frac * (depth - i))
+    return np.where(hot, hot_total, cold_total) * (depth + 1)
+
+
+def _tree_shap(tree, X, phi, node_value):
+    left, right = tree.children_left, tree.children_right
+    feature, threshold = tree.feature, tree.threshold
+    cover = tree.weighted_n_node_samples
+
+    def recurse(node, path, zero_frac, one_frac, parent_feature):
+        path = [list(el) for el in path]
+        _extend(path, zero_frac, one_frac, parent_feature)
+
+        if left[node] == -1:
+            for i in range(1, len(path)):
+                w = _unwound_sum(path, i)
+                phi[:, path[i][0]] += w * (path[i][2] - path[i][1]) * node_value[node]
+            return
+
+        goes_left = (X[:, feature[node]] <= threshold[node]).astype(float)
+        incoming_zero, incoming_one = 1.0, np.ones(len(X))
+        for k in range(1, len(path)):
+            if path[k][0] == feature[node]:
+                incoming_zero, incoming_one = path[k][1], path[k][2]
+                _unwind(path, k)
+                break
+
+        recurse(left[node], path, incoming_zero * cover[left[node]] / cover[node],
+                incoming_one * goes_left, feature[node])
+        recurse(right[node], path, incoming_zero * cover[right[node]] / cover[node],
+                incoming_one * (1 - goes_left), feature[node])
+
+    recurse(0, [], 1.0, np.ones(len(X)), -1)
+
+
+def forest_attributions(model, X):
+    # Returns (base_value, phi) for the positive class; base + phi.sum(1) == predict_proba[:, 1]
+    X = np.asarray(X, dtype=np.float32).astype(float)
+    phi = np.zeros(X.shape)
+    base = 0.0
+    for est in model.estimators_:
+        tree = est.tree_
+        counts = tree.value[:, 0, :]
+        node_value = counts[:, 1] / counts.sum(axis=1)
+        _tree_shap(tree, X, phi, node_value)
+        base += node_value[0]
+    n_trees = len(model.estimators_)
+    return base / n_trees, phi / n_trees
+
+# --- 2. VERSIONED ATTRIBUTION CACHE ---
+_cache = {}
+
+def get_attributions(model_file=fp.RF_MODEL_FILE, master_file=fp.MASTER_FILE, gmm_file=fp.GMM_MODEL_FILE):
+    # One batched pass over every country's latest snapshot, reused until the
+    # model pickle, the master dataset or the GMM behind regime_prob changes on disk
+    key = (fp.file_version(model_file), fp.file_version(master_file), fp.file_version(gmm_file))
+    if None in key:
+        return None
+    if key not in _cache:
+        model = fp.load_model(model_file)
+        latest = fp.latest_snapshot(fp.build_panel(master_file, gmm_file))
+        X = latest[fp.RF_FEATURES]
+        base, phi = forest_attributions(model, X.values)
+
+        attr = pd.DataFrame(phi, index=latest.index, columns=fp.RF_FEATURES)
+        _cache.clear()
+        _cache[key] = {
+            'model_version': key[0],
+            'base_value': base,
+            'attributions': attr,
+            'features': X,
+            'survival_prob': pd.Series(model.predict_proba(X)[:, 1], index=latest.index),
+        }
+    return _cache[key]
+
+
+def country_drivers(cache, country):
+    # Tidy per-feature breakdown for one market, largest absolute push first
+    if cache is None or country not in cache['attributions'].index:
+        return None
+    contrib = cache['attributions'].loc[country]
+    drivers = pd.DataFrame({
+        'feature': contrib.index,
+        'label': [fp.FEATURE_LABELS.get(f, f) for f in contrib.index],
+        'value': cache['features'].loc[country].values,
+        'contribution': contrib.values,
+    })
+    return drivers.reindex(drivers['contribution'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+# --- 3. DIALOG FIGURE ---
+def drivers_figure(drivers):
+    plot_df = drivers.iloc[::-1].assign(pts=lambda d: d['contribution'] * 100)
+    fig = px.bar(
+        plot_df, x='pts', y='label', orientation='h',
+        color=plot_df['pts'] >= 0, color_discrete_map={True: '#0f766e', False: '#e11d48'},
+        hover_data={'value': ':.2f', 'pts': ':+.1f', 'label': False},
+        labels={'pts': 'Push on Survival Probability (pts)', 'label': ''}
+    )
+    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=260, showlegend=False,
+                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+    return fig
@@ -0,0 +1,92 @@
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# --- 1. FILES & FEATURE DEFINITIONS ---
+MASTER_FILE = 'master_ev_dataset_FINAL_COMPLETED.csv'
+RF_MODEL_FILE = 'rf_regime_aware_model.pkl'
+GMM_MODEL_FILE = 'gmm_regime_detector.pkl'
+
+# Same aggregate filter as the notebook's regime-aware training block
+AGGREGATES = ['World', 'EU27', 'Europe', 'Rest of the world', 'Rest of World', 'Other', 'Global', 'European Union (27)']
+
+REGIME_FEATURES = ['log_gdp', 'infra_score']
+RF_FEATURES = ['log_gdp', 'Policy_Score', 'infra_score', 'lagged_share',
+               'news_sentiment', 'consumer_review_sentiment', 'regime_prob']
+
+FEATURE_LABELS = {
+    'log_gdp': 'Wealth (log GDP/Capita)',
+    'Policy_Score': 'Policy Support',
+    'infra_score': 'Charging Infrastructure',
+    'lagged_share': 'Prior-Year EV Share',
+    'news_sentiment': 'News Sentiment',
+    'consumer_review_sentiment': 'Consumer Sentiment',
+    'regime_prob': 'Macro Regime (GMM)',
+}
+
+# --- 2. VERSIONING ---
+_version_memo = {}
+HASH_CHUNK = 1 << 20
+
+def file_version(path):
+    # Content hash, memoized on (mtime, size) so reruns don't re-read the file
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _version_memo:
+        # Streamed in 1 MiB chunks: the IEA workbooks and model pickles never sit in memory whole
+        digest = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        _version_memo[key] = digest.hexdigest()[:12]
+    return _version_memo[key]
+
+# --- 3. MODEL LOADING ---
+_model_memo = {}
+
+def load_model(path):
+    version = file_version(path)
+    if version is None:
+        return None
+    if (path, version) not in _model_memo:
+        _model_memo[(path, version)] = joblib.load(path)
+    return _model_memo[(path, version)]
+
+# --- 4. COUNTRY x YEAR PANEL (mirrors the notebook's HMM + Dual-NLP prep) ---
+def build_panel(master_file=MASTER_FILE, gmm_file=GMM_MODEL_FILE):
+    # gmm_file=None builds the panel without regime_prob (callers that never feed the RF); a GMM
+    # that is asked for but missing is an error, since every RF_FEATURES consumer needs the column
+    gmm = None
+    if gmm_file is not None:
+        gmm = load_model(gmm_file)
+        if gmm is None:
+            raise FileNotFoundError(f"{gmm_file} not found: the regime-aware RF needs regime_prob from the GMM")
+    df_raw = pd.read_csv(master_file)
+    df = df_raw[~df_raw['Country'].isin(AGGREGATES)]
+    df = df[df['mode_Cars'] == True]
+
+    panel = df.groupby(['Country', 'Year']).agg({
+        'EV_Share_Pct': 'mean', 'GDP_per_capita': 'max', 'Policy_Score': 'max',
+        'total_charging_stations': 'max', 'Population': 'max',
+        'news_sentiment': 'max', 'consumer_review_sentiment': 'max'
+    }).reset_index().sort_values(['Country', 'Year'])
+
+    panel['log_gdp'] = np.log1p(panel['GDP_per_capita'])
+    panel['infra_score'] = panel.groupby('Year')['total_charging_stations'].transform(
+        lambda x: (x - x.min()) / (x.max() - x.min()) if (x.max() - x.min()) != 0 else 0
+    )
+    panel['lagged_share'] = panel.groupby('Country')['EV_Share_Pct'].shift(1)
+    panel = panel.dropna(subset=['lagged_share']).reset_index(drop=True)
+
+    if gmm is not None:
+        panel['regime_prob'] = gmm.predict_proba(panel[REGIME_FEATURES])[:, 1]
+    return panel
+
+def latest_snapshot(panel):
+    # One row per country: the most recent year on record
+    return panel.sort_values('Year').groupby('Country').tail(1).set_index('Country').sort_index()
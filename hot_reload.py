@@ -0,0 +1,105 @@
+import html
+import os
+import threading
+import time
+
+import feature_panel as fp
+import profiling
+
+# --- 1. SETTINGS ---
+POLL_SECONDS = float(os.environ.get('GLOBALCHARGE_RELOAD_POLL', 5))
+
+# --- 2. HOT-SWAPPED LIVE DATASET ---
+class LiveData:
+    # One per process. `build()` assembles a complete snapshot (frame, model caches, prebuilt
+    # figures) on the watcher thread; the finished snapshot replaces the live one with a single
+    # reference swap. Sessions read `current()` once per rerun, so a run that started on the old
+    # snapshot finishes on it (the old one is freed once no run holds it), and nobody ever sees a
+    # half-built version or waits for a rebuild. A failed rebuild keeps the previous snapshot live,
+    # is reported in the badge, and is not retried until one of the watched files changes again.
+
+    def __init__(self, name, watch, build, poll=POLL_SECONDS):
+        self.name = name
+        self.watch = list(watch)
+        self.build = build
+        self.poll = poll
+        self._live = None
+        self._failed = None           # (versions, exception) of the last failed build
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = None
+        self.swaps = 0
+
+    def versions(self):
+        # (mtime, size)-memoized content hashes, so a poll on unchanged files is a few stat calls
+        return tuple(fp.file_version(path) for path in self.watch)
+
+    def _stale(self, versions):
+        # A build is due when nothing is live or a file changed, unless these exact versions already failed
+        if self._live is not None and self._live['versions'] == versions:
+            return False
+        return self._failed is None or self._failed[0] != versions
+
+    def current(self):
+        if self._live is None:
+            self.refresh()            # Cold start: the first session builds synchronously
+            if self._live is None:    # These versions already failed: re-raise instead of rebuilding
+                raise self._failed[1]
+        return self._live
+
+    def refresh(self):
+        # Rebuilds only when due; returns True if a new snapshot went live, raises if the build failed
+        versions = self.versions()
+        if not self._stale(versions):
+            return False
+        with self._build_lock:
+            if not self._stale(versions):
+                return False
+            started = time.perf_counter()
+            try:
+                snapshot = self.build()
+            except Exception as exc:
+                self._failed = (versions, exc)
+                self.last_error = f"{exc.__class__.__name__}: {exc}"
+                raise
+            snapshot.update(versions=versions, loaded_at=time.time(), build_s=time.perf_counter() - started)
+            self._live = snapshot
+            self._failed = None
+            self.swaps += 1
+            self.last_error = None
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll):
+            if not self._stale(self.versions()):
+                continue                  # Idle poll: no profiling record, no rebuild
+            profiling.start_run(f"{self.name}_reload")
+            try:
+                self.refresh()
+            except Exception:             # Bad push: recorded in last_error; the last good snapshot stays live
+                pass
+            finally:
+                profiling.end_run()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name=f"{self.name}-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+# --- 3. VERSION BADGE ---
+def badge_html(live, snapshot):
+    # Small pill under the page title: data/model versions and when they went live
+    parts = [f"Data {snapshot.get('data_version') or 'n/a'}", f"Model {(snapshot.get('model_version') or 'n/a')[:8]}",
+             f"live since {time.strftime('%H:%M:%S', time.localtime(snapshot['loaded_at']))}"]
+    color, icon = ('#b45309', '⚠️') if live.last_error else ('#0f766e', '🟢')
+    title = html.escape(f"Reload failed, serving the previous version: {live.last_error}" if live.last_error
+                        else f"Built in {snapshot['build_s']:.1f}s off the request path; checks for new files every {live.poll:.0f}s")
+    return (f"<span title=\"{title}\" style='display: inline-block; padding: 2px 10px; border-radius: 999px; "
+            f"border: 1px solid {color}; color: {color}; font-size: 0.78rem; font-weight: 700;'>"
+            f"{icon} {' · '.join(parts)}</span>")
@@ -0,0 +1,208 @@
+import argparse
+import os
+from collections import defaultdict
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import plotly.express as px
+
+import feature_panel as fp
+import schemas
+
+# Usage (from the repo root):
+#   python iea_ingest.py                        # rebuild war_room_data_v3.csv from the IEA workbooks
+#   python iea_ingest.py --out /tmp/preview.csv --year 2023
+
+# --- 1. SOURCES ---
+EV_WORKBOOK = 'py/py/EVDataExplorer2025.xlsx'
+POLICY_WORKBOOK = 'py/py/GlobalEVOutlook2025PolicyExplorer.xlsx'
+EV_SHEET = 'GEVO_EV_2025'
+CACHE_DIR = os.environ.get('GLOBALCHARGE_INGEST_CACHE', '.ingest_cache')
+INGEST_VERSION = 2   # Bump when the normalization below changes; invalidates cached panels
+
+# IEA spellings -> the names the war room (and master dataset) use
+NAME_ALIASES = {
+    'United Kingdom': 'UK', 'United States': 'USA', 'Korea': 'South Korea', 'Turkiye': 'Turkey',
+    'EU27': 'European Union (27)', 'European Union': 'European Union (27)', 'Rest of the world': 'Rest of World',
+}
+
+# Codes plotly's gapminder table lacks (or spells differently)
+ISO_CODES = {
+    'Cyprus': 'CYP', 'Estonia': 'EST', 'Latvia': 'LVA', 'Lithuania': 'LTU', 'Luxembourg': 'LUX',
+    'Slovakia': 'SVK', 'South Korea': 'KOR', 'UK': 'GBR', 'USA': 'USA', 'Seychelles': 'SYC', 'United Arab Emirates': 'ARE',
+}
+
+# --- 2. STREAMING READERS (read-only row iterators; the workbook is never held in memory) ---
+def stream_ev_data(path=EV_WORKBOOK, sheet=EV_SHEET):
+    # Keeps only the historical car sales share and public charging points, keyed by (country, year)
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        col = {name: i for i, name in enumerate(next(rows))}
+        share, chargers = {}, defaultdict(float)
+        for row in rows:
+            if row[col['category']] != 'Historical':
+                continue
+            key = (NAME_ALIASES.get(row[col['region_country']], row[col['region_country']]), int(row[col['year']]))
+            parameter, value = row[col['parameter']], row[col['value']]
+            if parameter == 'EV sales share' and row[col['mode']] == 'Cars':
+                share[key] = float(value)
+            elif parameter == 'EV charging points':
+                chargers[key] += float(value)
+    finally:
+        wb.close()
+    return pd.Series(share, name='EV_Share_Pct'), pd.Series(chargers, name='total_charging_stations')
+
+
+def stream_policies(path=POLICY_WORKBOOK):
+    # One record per listed measure: (country, year or None). Tables come from PDF extraction,
+    # so leading cells drift; the region is the first filled cell and the country sits right after it
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    records = []
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header or 'Year' not in header:
+                continue
+            year_idx = header.index('Year')
+            for row in rows:
+                lead = next((i for i, cell in enumerate(row[:2]) if cell), None)
+                if lead is None or not isinstance(row[lead + 1], str):
+                    continue   # continuation line of a wrapped measure
+                year = row[year_idx] if year_idx < len(row) else None
+                country = row[lead + 1].strip()
+                records.append((NAME_ALIASES.get(country, country), year if isinstance(year, int) else None))
+    finally:
+        wb.close()
+    return pd.DataFrame(records, columns=['country', 'year'])
+
+# --- 3. NORMALIZATION -> war_room_data_v3 schema ---
+def iso_lookup():
+    codes = px.data.gapminder()[['country', 'iso_alpha']].drop_duplicates('country').set_index('country')['iso_alpha']
+    return pd.concat([codes, pd.Series(ISO_CODES)])
+
+
+def policy_scores(policies, year):
+    # Cumulative measures in force by `year` (undated ones always count), 0-10 scaled to the leader
+    dated = policies['year'].fillna(0)
+    now = policies[dated <= year].groupby('country').size()
+    prior = policies[dated <= year - 1].groupby('country').size()
+    top = now.max() if len(now) else 1
+    return now / top * 10, prior / top * 10
+
+
+def _gdp_table(master_file=fp.MASTER_FILE):
+    raw = pd.read_csv(master_file, usecols=['Country', 'Year', 'GDP_per_capita'])
+    raw = raw[raw['GDP_per_capita'] > 0]
+    latest = raw.sort_values('Year').groupby('Country').tail(1)
+    return latest.set_index('Country')['GDP_per_capita']
+
+
+def build_war_room(share, chargers, policies, year=None, master_file=fp.MASTER_FILE):
+    year = year or int(share.index.get_level_values(1).max())
+    share = share.unstack()
+    countries = share.index[share.get(year).notna()] if year in share.columns else share.index[:0]
+
+    df = pd.DataFrame({'country': countries, 'year': year})
+    df['EV_Share_Pct'] = share.loc[countries, year].to_numpy()
+    df['lagged_share'] = share.loc[countries].get(year - 1, pd.Series(np.nan, index=countries)).to_numpy()
+
+    stations = chargers.unstack()
+    stations = stations.loc[:, stations.columns <= year].ffill(axis=1)
+    df['total_charging_stations'] = df['country'].map(stations.iloc[:, -1]).fillna(0).to_numpy()
+
+    gdp = _gdp_table(master_file)
+    df['GDP_per_capita'] = df['country'].map(gdp)
+    df = df.dropna(subset=['GDP_per_capita'])   # macro regions (Asia Pacific, Africa, ...) have no GDP row
+    df = df[~df['country'].isin(fp.AGGREGATES)]  # World, Europe, EU27, Rest of World: not investable, as in the planner
+
+    now, prior = policy_scores(policies, year)
+    df['Policy_Score'] = df['country'].map(now).fillna(0)
+    df['Policy_Score_2023'] = df['country'].map(prior).fillna(0)
+    df['log_gdp'] = np.log1p(df['GDP_per_capita'])
+    span = df['total_charging_stations'].max() - df['total_charging_stations'].min()
+    df['infra_score'] = (df['total_charging_stations'] - df['total_charging_stations'].min()) / span if span else 0.0
+    df['lagged_share'] = df['lagged_share'].fillna(df['EV_Share_Pct'])
+    df['EV_Share_Pct_2023'] = df['lagged_share']
+
+    df['Survival_Prob'] = 0.5
+    df['iso_alpha'] = df['country'].map(iso_lookup())   # NaN if unmapped: kept in tables and the API, off the map
+
+    df['market_room'] = (100 - df['EV_Share_Pct']) / 100
+    df['purchasing_power'] = df['GDP_per_capita'] / 10000
+    df['infra_saturation'] = df['infra_score']
+    out = df[list(schemas.WAR_ROOM_SCHEMA)].astype(schemas.WAR_ROOM_SCHEMA)
+    out['iso_alpha'] = out['iso_alpha'].where(df['iso_alpha'].notna())   # pandas < 3 casts NaN to 'nan' under str
+    return out.sort_values('country').reset_index(drop=True)
+
+
+def carry_forward(df, previous):
+    # Survival_Prob is a model output the IEA doesn't publish; carry it over from the live file
+    if previous is None or 'Survival_Prob' not in previous.columns:
+        return df
+    prev = previous.drop_duplicates('country').set_index('country')['Survival_Prob']
+    df = df.copy()
+    df['Survival_Prob'] = df['country'].map(prev).fillna(df['Survival_Prob'])
+    return df
+
+def change_report(df, previous):
+    # What an ingest adds or drops against the file it replaces, and which markets can't be mapped
+    lines = []
+    if previous is not None:
+        new = sorted(set(df['country']) - set(previous['country']))
+        gone = sorted(set(previous['country']) - set(df['country']))
+        if new:
+            lines.append(f"+{len(new)} new (Survival_Prob placeholder 0.5 until the RF scores them): {', '.join(new)}")
+        if gone:
+            lines.append(f"-{len(gone)} dropped: {', '.join(gone)}")
+    unmapped = sorted(df.loc[df['iso_alpha'].isna(), 'country'])
+    if unmapped:
+        lines.append(f"{len(unmapped)} without an ISO code (not drawn on the map): {', '.join(unmapped)}")
+    return lines
+
+# --- 4. CACHED INGEST ---
+def workbook_key(ev_workbook=EV_WORKBOOK, policy_workbook=POLICY_WORKBOOK, year=None):
+    versions = [fp.file_version(ev_workbook), fp.file_version(policy_workbook), fp.file_version(fp.MASTER_FILE)]
+    if None in versions:
+        return None
+    return '-'.join(versions + [f"v{INGEST_VERSION}", str(year or 'latest')])
+
+
+def ingest(ev_workbook=EV_WORKBOOK, policy_workbook=POLICY_WORKBOOK, year=None, previous=None, use_cache=True):
+    # Same workbooks (by content hash) -> same panel, straight from the pickle cache
+    key = workbook_key(ev_workbook, policy_workbook, year)
+    if key is None:
+        raise FileNotFoundError(f"Missing IEA workbook(s): {ev_workbook}, {policy_workbook}")
+    cached = os.path.join(CACHE_DIR, f"war_room_{key}.pkl")
+    if use_cache and os.path.exists(cached):
+        return carry_forward(pd.read_pickle(cached), previous), True
+
+    share, chargers = stream_ev_data(ev_workbook)
+    df = build_war_room(share, chargers, stream_policies(policy_workbook), year)
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_pickle(cached)
+    return carry_forward(df, previous), False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream the IEA EV workbooks into the war room panel")
+    parser.add_argument('--ev-workbook', default=EV_WORKBOOK)
+    parser.add_argument('--policy-workbook', default=POLICY_WORKBOOK)
+    parser.add_argument('--year', type=int, default=None, help="Snapshot year (default: latest historical)")
+    parser.add_argument('--out', default=schemas.WAR_ROOM_FILES[0])
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    previous = pd.read_csv(args.out) if os.path.exists(args.out) else None
+    df, hit = ingest(args.ev_workbook, args.policy_workbook, args.year, previous, use_cache=not args.no_cache)
+    df.to_csv(args.out, index=False)
+    print(f"{'♻️ Cache hit' if hit else '📥 Ingested'}: {len(df)} markets, year {df['year'].iloc[0]} -> {args.out}")
+    for line in change_report(df, previous):
+        print(f"   {line}")
+
+
+if __name__ == '__main__':
+    main()
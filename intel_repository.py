@@ -0,0 +1,233 @@
+import math
+
+
+def _roi_text(custom_roi):
+    # Markets without a usable station census have no ROI (NaN); say so instead of printing 'nan'
+    return "n/a" if math.isnan(custom_roi) else f"{custom_roi:.1f}"
+
+# --- 1. WAR ROOM BRIEFINGS (s_app.py) ---
+def get_comprehensive_intel(country, c_data, custom_roi):
+    roi = _roi_text(custom_roi)
+    intel = {
+        "Germany": (
+            "⚠️ Constitutional Crisis & The Subsidy Cliff",
+            "**2023-2024 Regime Shift:** In December 2023, the German Federal Constitutional Court struck down €60 billion in climate funding. This forced the immediate, premature cancellation of the *Umweltbonus* (up to €4,500 per EV). Consequently, H1 2024 saw a brutal 30%+ collapse in domestic EV sales. European OEMs (VW, Mercedes) have formally delayed their ICE phase-out targets as a result.",
+            f"**Strategic ROI ({roi}):** The AI model severely penalizes Germany's Resilience score. The data proves the market was artificially propped up by state aid rather than structural utility. Despite a massive $55k GDP/Capita providing organic purchasing power, the extreme political volatility and high existing infrastructure density make this a high-risk capital deployment zone."
+        ),
+        "USA": (
+            "🛡️ IRA Deployment & Section 301 Trade Walls",
+            "**2023-2024 Regime Shift:** The US market underwent a structural isolation event. In May 2024, the Biden Administration enacted 100% Section 301 tariffs on Chinese EVs, effectively blocking BYD and NIO from undercutting domestic OEMs. Concurrently, the NEVI Formula Program transitioned from planning to breaking ground, injecting billions into domestic highway charging corridors.",
+            f"**Strategic ROI ({roi}):** The USA is classified as a 'Safe Haven' with massive Protected Alpha. Growth is guaranteed by long-term Inflation Reduction Act (IRA) 30D tax credits locked through 2030, virtually eliminating European-style 'Subsidy Cliff' risks. High wealth and artificially protected margins yield top-tier infrastructure ROI."
+        ),
+        "Norway": (
+            "✅ The Saturation Trap & Fiscal Rollbacks",
+            "**2023-2024 Regime Shift:** Norway has completed the S-Curve (approaching 90% share). Recognizing peak adoption, the Norwegian government initiated a fiscal pullback in 2024. They implemented a new weight-based registration tax and applied a 25% VAT to luxury EVs (over 500k NOK) to recoup lost fossil-fuel road tax revenues. The hyper-growth era is officially over.",
+            f"**Strategic ROI ({roi}):** While the AI predicts 100% survival probability (the market functions entirely without subsidies now), the ROI is mechanically suppressed. There is functionally zero 'Market Room' remaining. Deploying a new $100M fund here operates as a low-yield public utility play rather than a venture-growth investment."
+        ),
+        "China": (
+            "🏭 Post-Subsidy Hyper-Competition & Export Pivots",
+            "**2023-2024 Regime Shift:** China officially terminated its decade-long national NEV purchase subsidy at the end of 2022/2023. 2024 is defined by a brutal, margin-crushing domestic price war (e.g., BYD launching the Seagull under $10,000). Facing up to 38% anti-subsidy tariffs from the EU in 2024, Chinese OEMs are furiously pivoting export capacity to the Global South.",
+            f"**Strategic ROI ({roi}):** China acts as a 'Maintenance Market'. The AI correctly identifies that Chinese EV adoption is structurally permanent (highly resilient). However, extreme over-saturation of existing charging infrastructure in Tier-1 and Tier-2 cities drastically dilutes the expected profit-margin per newly deployed charging plug."
+        ),
+        "Mexico": (
+            "📈 USMCA Nearshoring & Fleet Mandates",
+            "**2023-2024 Regime Shift:** Mexico is the primary beneficiary of geopolitical fracturing. To bypass US tariffs via USMCA 'Rules of Origin', Chinese OEMs (like BYD) spent 2024 aggressively scouting Mexican factory sites. Domestically, growth is surging not from consumer subsidies, but from heavy commercial fleet electrification (e.g., DHL, Walmart Mexico) fulfilling cross-border ESG mandates.",
+            f"**Strategic ROI ({roi}):** Mexico is a highly-rated 'Dark Horse'. The ROI is exceptionally strong because growth is driven by **Industrial Necessity**, not fickle consumer politics. Combined with 98% untapped 'Market Room', this represents one of the highest-alpha deployment targets in the portfolio."
+        ),
+        "UK": (
+            "⚖️ The ZEV Mandate vs. Political Delays",
+            "**2023-2024 Regime Shift:** The UK experienced conflicting market signals. While the strict ZEV Mandate took effect in Jan 2024 (requiring OEMs to hit 22% zero-emission sales or face massive fines), the Prime Minister simultaneously pushed the 2030 ICE ban back to 2035. This created severe consumer confusion and stalled private charging investments.",
+            f"**Strategic ROI ({roi}):** The AI model flags the UK with moderate resilience. The ZEV mandate forces OEM compliance, preventing a total collapse, but the political delay of the ICE ban reduces the immediate urgency for rapid, nationwide infrastructure expansion."
+        ),
+        "India": (
+            "🌱 Local Manufacturing Subsidy Overhauls",
+            "**2023-2024 Regime Shift:** The flagship FAME-II subsidy ended in March 2024 and was replaced by the leaner EMPS 2024 scheme. Crucially, in 2024, India slashed EV import taxes (from up to 100% down to 15%) for global automakers *only if* they commit to investing at least $500M in local manufacturing. This sparked a race to build localized supply chains.",
+            f"**Strategic ROI ({roi}):** India possesses astronomical 'Market Room'. The AI views the transition from consumer-handouts to manufacturing-incentives as a positive long-term resilience indicator. However, low current GDP/Capita restricts immediate consumer purchasing power, capping the short-term infrastructure ROI."
+        )
+    }
+    
+    # Dynamic fallback for unlisted countries
+    if country not in intel:
+        s_shift = c_data.get('EV_Share_Pct', 0) - c_data.get('EV_Share_Pct_2023', 0)
+        p_shift = c_data.get('Policy_Score', 0) - c_data.get('Policy_Score_2023', 0)
+        
+        trend_word = "expanded" if s_shift >= 0 else "contracted"
+        pol_word = "strengthened" if p_shift >= 0 else "weakened"
+        
+        dyn_headline = f"🔍 Macro-Economic Maturation Phase"
+        dyn_context = f"**2023-2024 Market Dynamics:** {country} {trend_word} its EV market share by {abs(s_shift):.1f}% over the last 12 months. Concurrently, national policy support has {pol_word} (Shift: {p_shift:+.1f}). Our data pipelines indicate that adoption in {country} is closely following organic GDP S-Curve modeling, rather than being driven by sudden, disruptive geopolitical black-swan events."
+        dyn_roi = f"**Strategic ROI ({roi}):** The AI generated this score by mathematically weighing {country}'s purchasing power (${c_data.get('GDP_per_capita', 0):,.0f}) against its remaining untapped 'Market Room' ({c_data.get('market_room', 0)*100:.1f}%). The model views this region as a stable, secondary deployment target."
+        return (dyn_headline, dyn_context, dyn_roi)
+        
+    return intel[country]
+
+
+# --- 2. PLATINUM AUDIT REPOSITORY (sr_app.py) ---
+def get_detailed_intel(country, c_data, custom_roi):
+    roi = _roi_text(custom_roi)
+    repo = {
+        "Belgium": (
+            "⚖️ Fiscal Dominance & The Company Car Mandate",
+            "**2023-2024 Regime Shift:** Belgium's market is uniquely shielded by its 'Company Car' tax structure. In 2024, the government mandated that only zero-emission company vehicles qualify for 100% tax deductibility. This created an artificial but highly resilient 'floor' for adoption.",
+            f"**Strategic Verdict (ROI {roi}):** Defensive Safe Haven. The structural corporate mandate makes it highly stable for long-term infrastructure ROI."
+        ),
+        "Australia": (
+            "🛡️ NVES Policy Shield & The FBT Exemption",
+            "**2023-2024 Regime Shift:** Australia successfully avoided the 2024 European crash by implementing the New Vehicle Efficiency Standard (NVES). Combined with the ongoing Fringe Benefits Tax (FBT) exemption, commercial fleet ROI has surged.",
+            f"**Strategic Verdict (ROI {roi}):** Core Growth Target. The 12% share provides exponential room for growth, heavily shielded by federal tax law."
+        ),
+        "India": (
+            "🐘 The EMPS Pivot & The Opportunity Alpha",
+            "**2023-2024 Regime Shift:** India's pivot from FAME-II to the EMPS scheme caused a temporary supply-side plateau. However, the 2024 manufacturing incentive (PLI) has forced global giants like Tesla and VinFast into localized production talks.",
+            f"**Strategic Verdict (ROI {roi}):** Emerging Alpha Play. Targets the 2026 S-Curve breakout. Massive structural demand outweighs current policy transitions."
+        ),
+        "France": (
+            "🇫🇷 The 'Eco-Score' Moat & Sovereign Protection",
+            "**2023-2024 Regime Shift:** France's 2024 'Eco-Score' redefined subsidies to exclude carbon-intensive shipping. This effectively subsidized European-made EVs while taxing Asian imports.",
+            f"**Strategic Verdict (ROI {roi}):** Protected Mature Market. Highly resilient to the 2024 Chaos Regime because its policy actively shields domestic margins."
+        ),
+        "Germany": (
+            "⚠️ The 'Umweltbonus' Shock & Subsidy Cliff",
+            "**2023-2024 Regime Shift:** The Dec 2023 constitutional court ruling forced an immediate end to all EV subsidies. This 'Policy Heart Attack' proved that German adoption was an artificial bubble. Sales collapsed 35% in early 2024.",
+            f"**Strategic Verdict (ROI {roi}):** High Volatility Value Trap. Human veto recommended until structural mean reversion stabilizes in late 2025."
+        ),
+        "USA": (
+            "🦅 The Inflation Reduction Act (IRA) & Reshoring",
+            "**2023-2024 Regime Shift:** The $7,500 IRA tax credit created a localized manufacturing boom, decoupling US adoption from global supply chain shocks. The $5B NEVI formula program is forcing charging infrastructure across all 50 states.",
+            f"**Strategic Verdict (ROI {roi}):** Primary Core Asset. Massive market room combined with locked-in federal capital guarantees structural resilience."
+        ),
+        "China": (
+            "🐉 Post-Subsidy Saturation & Price Wars",
+            "**2023-2024 Regime Shift:** The total phase-out of national EV subsidies in late 2022 triggered a brutal domestic price war between BYD and Tesla. The market has shifted from policy-driven to pure hyper-competitive saturation (>35% penetration).",
+            f"**Strategic Verdict (ROI {roi}):** Mature / Saturated. Market room is shrinking. Deploy capital selectively into hyper-local grid management rather than broad growth."
+        ),
+        "UK": (
+            "🇬🇧 ZEV Mandate vs Retail Apathy",
+            "**2023-2024 Regime Shift:** The UK implemented a strict ZEV mandate requiring 22% of OEM sales to be zero-emission by 2024. While high interest rates stalled private retail demand, corporate fleet adoption is forced forward by aggressive tax incentives.",
+            f"**Strategic Verdict (ROI {roi}):** Stable. Fleet mandates provide a reliable floor, insulating the market from consumer inflation fears."
+        ),
+        "Norway": (
+            "❄️ The 'End-State' Market Transition",
+            "**2023-2024 Regime Shift:** Having reached >90% EV sales, Norway began scaling back tax exemptions, imposing VAT on luxury EVs. It represents the 'end-state' of EV adoption where subsidies are no longer required.",
+            f"**Strategic Verdict (ROI {roi}):** Saturated Safe Haven. Zero policy risk, but zero exponential growth opportunity. A pure defensive play."
+        ),
+        "Sweden": (
+            "🇸🇪 'Climate Bonus' Removal & Corporate Leasing",
+            "**2023-2024 Regime Shift:** Sweden abruptly scrapped its 'Climate Bonus' in late 2022, causing a temporary dip. However, high carbon taxes on ICE vehicles and strong corporate leasing policies have maintained adoption resilience.",
+            f"**Strategic Verdict (ROI {roi}):** Structurally sound. Withstood policy shock via pure GDP wealth and corporate infrastructure."
+        ),
+        "Canada": (
+            "🍁 Federal ZEV Mandate & iZEV Alignment",
+            "**2023-2024 Regime Shift:** Anchored by a federal mandate for 100% ZEV sales by 2035 and the $5,000 iZEV rebate. The market closely mirrors the US trajectory but with more predictable federal policy support.",
+            f"**Strategic Verdict (ROI {roi}):** High Conviction. Strong purchasing power and immense market room make this a Tier 1 target."
+        ),
+        "Spain": (
+            "🇪🇸 Bureaucratic Friction & MOVES III",
+            "**2023-2024 Regime Shift:** The MOVES III subsidy program was extended, but severe bureaucratic friction in paying out consumers has suppressed the takeoff phase. EV penetration remains heavily lagging at ~12%.",
+            f"**Strategic Verdict (ROI {roi}):** High Risk. Policy exists on paper but fails in execution. Model flags for immediate veto."
+        ),
+        "Italy": (
+            "🇮🇹 Income-Tiered Ecobonus Overhaul",
+            "**2023-2024 Regime Shift:** Overhauled its 'Ecobonus' in 2024 to target low-income buyers and heavily scrap older ICE vehicles. However, severely lacking charging infrastructure keeps structural resilience critically low.",
+            f"**Strategic Verdict (ROI {roi}):** Vulnerable. High risk of supply bottleneck. Do not deploy without hard infrastructure guarantees."
+        ),
+        "Japan": (
+            "🗾 Hybrid Dominance & The Kei-EV",
+            "**2023-2024 Regime Shift:** Domestic OEMs (Toyota) aggressively prioritize hybrid (HEV) technology. Pure BEV adoption is structurally blocked by cultural preferences, aside from niche 'Kei-EV' domestic models like the Nissan Sakura.",
+            f"**Strategic Verdict (ROI {roi}):** Veto. Market fundamentally resists full electrification. ROI models do not support capital entry."
+        ),
+        "South Korea": (
+            "🔋 Battery-Density Subsidy Protectionism",
+            "**2023-2024 Regime Shift:** Revised subsidies in 2024 to heavily favor high-density batteries and extensive charging networks, an explicit policy designed to protect domestic giants (Hyundai/Kia) from cheaper LFP-based Chinese imports.",
+            f"**Strategic Verdict (ROI {roi}):** Deploy Cautiously. Strong tech ecosystem, but foreign infrastructure capital faces headwinds."
+        ),
+        "Israel": (
+            "🇮🇱 Purchase Tax Spike & Demand Pull-Forward",
+            "**2023-2024 Regime Shift:** Purchase taxes on EVs increased significantly in January 2024. This caused massive 'pull-forward' demand in late 2023, leading to an artificial sales freeze and plateau throughout 2024.",
+            f"**Strategic Verdict (ROI {roi}):** Temporal anomaly detected. Underlying tech adoption is high, but near-term capital deployment will underperform."
+        ),
+        "Mexico": (
+            "🏭 The Nearshoring Production Boom",
+            "**2023-2024 Regime Shift:** Driven purely by the 'nearshoring' manufacturing boom rather than retail subsidies. Chinese OEMs (BYD) are rapidly flooding the market to secure a North American foothold around US tariffs.",
+            f"**Strategic Verdict (ROI {roi}):** Emerging Growth. A high-leverage backdoor into NAFTA supply chains. Approved for Alpha allocation."
+        ),
+        "Brazil": (
+            "🇧🇷 Import Tax Reintroduction",
+            "**2023-2024 Regime Shift:** Reintroduced staggered import taxes on EVs in January 2024 to force local manufacturing. This triggered massive stockpiling and sales spikes of Chinese imports in late 2023 before the tax hit.",
+            f"**Strategic Verdict (ROI {roi}):** Volatile Takeoff. High risk/reward. Only deploy capital aligned with localized manufacturing mandates."
+        ),
+        "Chile": (
+            "⛰️ Commercial Electromobility Strategy",
+            "**2023-2024 Regime Shift:** Focused strictly on commercial and public transport electrification through the National Electromobility Strategy, actively avoiding the volatile retail consumer subsidy traps seen in Europe.",
+            f"**Strategic Verdict (ROI {roi}):** Niche Safety. B2B and public transit infrastructure ROI is highly resilient here."
+        ),
+        "Denmark": (
+            "🇩🇰 Phased Registration Tax Re-entry",
+            "**2023-2024 Regime Shift:** Successfully managing a phased reintroduction of registration taxes for EVs without crashing the market, backed by incredibly robust charging infrastructure and very high GDP per capita.",
+            f"**Strategic Verdict (ROI {roi}):** Resilient Mature Market. Handled the tax phase-in flawlessly. Safe deployment target."
+        ),
+        "Finland": (
+            "🇫🇮 Subsidies Swapped for Tax Incentives",
+            "**2023-2024 Regime Shift:** Removed direct EV purchase subsidies but maintained highly favorable company car taxation. Market growth has cooled slightly but remains structurally sound due to high baseline wealth.",
+            f"**Strategic Verdict (ROI {roi}):** Approved. Organic demand remains strong despite the removal of direct state cash."
+        ),
+        "Iceland": (
+            "🌋 Mileage-Tax Contraction",
+            "**2023-2024 Regime Shift:** Replaced full VAT exemptions with a mileage-based road tax in 2024. The sudden removal of the upfront tax shield caused a severe and immediate market contraction.",
+            f"**Strategic Verdict (ROI {roi}):** Veto. Model correctly caught the regime shift. Capital deployment blocked."
+        ),
+        "Netherlands": (
+            "🇳🇱 SEPP Subsidy & Infrastructure Saturation",
+            "**2023-2024 Regime Shift:** Tightened the SEPP subsidy pool, but the market is highly mature with one of the densest charging networks globally. The market is transitioning from early adopters to standard mass-market pricing.",
+            f"**Strategic Verdict (ROI {roi}):** Defensive Yield. The growth phase is over; this is now a pure infrastructure yield play."
+        ),
+        "New Zealand": (
+            "🇳🇿 'Clean Car Discount' Repeal",
+            "**2023-2024 Regime Shift:** The sudden political repeal of the 'Clean Car Discount' in Dec 2023 crashed Q1 2024 sales. However, high wealth and geographic isolation keep long-term fundamental demand metrics intact.",
+            f"**Strategic Verdict (ROI {roi}):** Monitor. Survived the policy shock better than Germany, but requires a 6-month holding pattern."
+        ),
+        "Poland": (
+            "🇵🇱 'My Elektryk' & Localized Battery Hubs",
+            "**2023-2024 Regime Shift:** Supported by the 'My Elektryk' scheme, the market is in its infancy. Benefiting heavily from major investments in battery manufacturing (LG), driving localized structural momentum.",
+            f"**Strategic Verdict (ROI {roi}):** Eastern European Alpha. High room for growth backed by hard supply-chain manufacturing capital."
+        ),
+        "Portugal": (
+            "🇵🇹 Privatized Subsidy Cuts",
+            "**2023-2024 Regime Shift:** Cut state subsidies for private EV purchases entirely in 2024, redirecting funds exclusively to commercial fleets and charities. The private consumer market faces heavy headwinds.",
+            f"**Strategic Verdict (ROI {roi}):** Pivot required. Shift all planned deployment from retail to commercial fleet charging."
+        ),
+        "Switzerland": (
+            "🇨🇭 High Wealth, High Import Tax",
+            "**2023-2024 Regime Shift:** Imposed a new 4% import tax on EVs starting in 2024. Lacking federal purchase subsidies, the market is entirely dependent on its massive organic high-wealth consumer demand.",
+            f"**Strategic Verdict (ROI {roi}):** Deploy. Wealth metrics easily absorb the 4% tax shock. Extremely resilient core market."
+        ),
+        "Austria": (
+            "🇦🇹 Fleet Subsidy Reallocation",
+            "**2023-2024 Regime Shift:** Slashed corporate EV subsidies to redirect capital toward private buyers and public charging infrastructure, attempting to stabilize the retail market against corporate fleet volatility.",
+            f"**Strategic Verdict (ROI {roi}):** Approved. The redirection of state funds into hard infrastructure de-risks capital deployment."
+        ),
+        "Greece": (
+            "🇬🇷 'Kinoumai Ilektrika' Dependency",
+            "**2023-2024 Regime Shift:** Highly reliant on the 'Kinoumai Ilektrika' state aid. With low GDP per capita, the market is artificial. Any removal of this subsidy will cause an immediate and total market collapse.",
+            f"**Strategic Verdict (ROI {roi}):** Veto. Fundamental wealth does not support the adoption curve. High risk of a Germany-style crash."
+        ),
+        "Turkey": (
+            "🇹🇷 The 'Togg' Nationalist Boom",
+            "**2023-2024 Regime Shift:** Despite massive hyperinflation, the launch of the domestic EV brand 'Togg' created overwhelming nationalistic demand, completely decoupling adoption from standard macroeconomic indicators.",
+            f"**Strategic Verdict (ROI {roi}):** Anomalous Takeoff. The model flags this as highly irregular. Growth is massive but defies standard risk parameters."
+        ),
+        "Rest of World": (
+            "🌍 Emerging Market Grid Constraints",
+            "**2023-2024 Regime Shift:** Represents aggregate emerging markets where EV adoption is currently limited by grid stability and upfront costs, but opportunity gaps are widening rapidly as ICE price-parity approaches.",
+            f"**Strategic Verdict (ROI {roi}):** Hold. Wait for battery pack prices to drop below $80/kWh before broad deployment."
+        )
+    }
+    
+    # Dynamic Fallback
+    res = repo.get(country)
+    if res: return res
+    
+    gap = c_data.get('opportunity_gap', 0.5)
+    return (f"🔍 Structural Resilience Audit: {country}", 
+            f"**2023-24 Dynamics:** {country} is following a classic GDP-driven S-Curve. Adoption is shielded from European political volatility by organic wealth growth and the redirection of global supply chains toward non-tariffed regions.",
+            f"**Strategic Verdict (ROI {roi}):** Stable deployment target with an Opportunity Gap of {gap:.2f}. Growth is driven by long-term infrastructure expansion rather than fickle state aid.")
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# --- 1. KEEP-ALIVE CLIENT ---
+DEFAULT_PATHS = [
+    '/score', '/score?w_safe=1.5&w_room=0.5&w_wealth=1.2', '/allocate', '/allocate?budget=100&tier_1_cut=0.3&tier_2_cut=0.15',
+    '/plan', '/plan?budget=100&annual_cap=40',
+    '/country/DEU', '/country/USA', '/country/CHN', '/country/NOR', '/intel/DEU', '/intel/MEX',
+]
+
+async def _client(host, port, paths, deadline, revalidate, latencies, statuses, offset):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            extra = "If-None-Match: %s\r\n" % etags[path] if revalidate and path in etags else ""
+            start = time.perf_counter()
+            writer.write(("GET %s HTTP/1.1\r\nHost: %s\r\n%s\r\n" % (path, host, extra)).encode())
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length, etag = 0, None
+            for line in head.split(b'\r\n')[1:]:
+                name, _, value = line.partition(b':')
+                if name.lower() == b'content-length':
+                    length = int(value)
+                elif name.lower() == b'etag':
+                    etag = value.strip().decode()
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if etag:
+                etags[path] = etag
+    finally:
+        writer.close()
+
+
+async def run(url, concurrency, duration, paths, revalidate):
+    parts = urlsplit(url)
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(parts.hostname, parts.port or 80, paths, deadline, revalidate, latencies, statuses, n)
+        for n in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+
+    lat_ms = np.array(latencies) * 1000
+    print(f"📊 {len(lat_ms):,} requests in {elapsed:.1f}s over {concurrency} connections")
+    print(f"   Throughput : {len(lat_ms) / elapsed:,.0f} req/s")
+    if len(lat_ms):
+        print(f"   Latency ms : p50 {np.percentile(lat_ms, 50):.2f} | p95 {np.percentile(lat_ms, 95):.2f} | p99 {np.percentile(lat_ms, 99):.2f}")
+    print(f"   Statuses   : {dict(statuses)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test the GlobalCharge scoring API")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--paths', default=','.join(DEFAULT_PATHS), help="Comma-separated request paths to rotate through")
+    parser.add_argument('--revalidate', action='store_true', help="Send If-None-Match with the last ETag seen per path")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.paths.split(','), args.revalidate))
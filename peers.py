@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+import feature_panel as fp
+import iea_ingest
+
+# --- 1. SIMILARITY SPACE ---
+PEER_FEATURES = ['log_gdp', 'Policy_Score', 'infra_score', 'lagged_share', 'news_sentiment', 'consumer_review_sentiment']
+K_MAX = 10          # Neighbours precomputed per Country x Year row
+
+# --- 2. PRECOMPUTED NEIGHBOUR TABLE ---
+def canonical(country):
+    # The war room's spelling of a market (IEA / OWID variants such as Turkiye -> Turkey)
+    return iea_ingest.NAME_ALIASES.get(country, country)
+
+
+def build_index(panel, k_max=K_MAX):
+    # z-scored Country x Year vectors; the ball-tree holds only rows whose next year is on record
+    # (an analogue is only useful if we know what happened next). Every row's top-k peers from
+    # other countries are found in one batched query, so a lookup is a dict hit and two slices.
+    # One spelling per market (the master carries both Turkey and Turkiye): alias rows are renamed and
+    # dropped where the canonical spelling already has that year, so no market is its own analogue
+    canon = panel['Country'].map(canonical)
+    panel = (panel.assign(_alias=panel['Country'] != canon, Country=canon)
+             .sort_values(['Country', 'Year', '_alias']).drop_duplicates(['Country', 'Year'])
+             .drop(columns='_alias').reset_index(drop=True))
+    X = panel[PEER_FEATURES].to_numpy(float)
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    Z = (X - mean) / np.where(std > 0, std, 1.0)
+
+    nxt = panel.groupby('Country')['EV_Share_Pct'].shift(-1)
+    nxt_year = panel.groupby('Country')['Year'].shift(-1)
+    has_next = (nxt.notna() & (nxt_year == panel['Year'] + 1)).to_numpy()
+    pool = np.flatnonzero(has_next)
+    tree = BallTree(Z[pool])
+
+    # Over-fetch by the longest country history so k_max survive the same-country filter
+    fetch = min(len(pool), k_max + int(panel.groupby('Country').size().max()))
+    dist, pos = tree.query(Z, k=fetch)
+    countries = panel['Country'].to_numpy()
+    idx = np.full((len(panel), k_max), -1)
+    d = np.full((len(panel), k_max), np.inf)
+    for i in range(len(panel)):
+        rows = pool[pos[i]]
+        keep = countries[rows] != countries[i]
+        rows, dd = rows[keep][:k_max], dist[i][keep][:k_max]
+        idx[i, :len(rows)], d[i, :len(rows)] = rows, dd
+
+    # Each row's peers as ready-made records, so a lookup is a dict hit and a list slice
+    records = list(zip(panel['Country'], panel['Year'].astype(int), panel['EV_Share_Pct'], nxt, nxt - panel['EV_Share_Pct']))
+    table = [[records[j] + (float(dd), 1 / (1 + float(dd))) for j, dd in zip(idx[i], d[i]) if j >= 0]
+             for i in range(len(panel))]
+    return {
+        'rows': {(c, int(y)): i for i, (c, y) in enumerate(zip(panel['Country'], panel['Year']))},
+        'latest': panel.groupby('Country')['Year'].max().astype(int).to_dict(),
+        'table': table, 'records': records,
+        'tree': tree, 'pool': pool, 'mean': mean, 'std': std,
+    }
+
+
+_cache = {}
+
+def get_index(master_file=fp.MASTER_FILE):
+    # Rebuilt only when the master dataset changes on disk; PEER_FEATURES never use the GMM regime
+    key = fp.file_version(master_file)
+    if key is None:
+        return None
+    if key not in _cache:
+        _cache.clear()
+        _cache[key] = build_index(fp.build_panel(master_file, gmm_file=None))
+    return _cache[key]
+
+# --- 3. LOOKUPS ---
+PEER_COLUMNS = ['Country', 'Year', 'EV_Share_Pct', 'next_share', 'share_change', 'distance', 'similarity']
+
+def neighbours(index, country, year=None, k=5):
+    # Closest other-country Country x Year states to `country` in `year` (default: its latest), as
+    # PEER_COLUMNS tuples with what happened to each peer the following year
+    if index is None:
+        return []
+    country = canonical(country)
+    year = year if year is not None else index['latest'].get(country)
+    i = index['rows'].get((country, year))
+    return [] if i is None else index['table'][i][:k]
+
+
+def analogues(index, country, year=None, k=5):
+    # Same lookup as a frame, for the dialogs
+    peers = neighbours(index, country, year, k)
+    return pd.DataFrame(peers, columns=PEER_COLUMNS) if peers else None
+
+
+def query_vector(index, features, k=5):
+    # Ad-hoc profile (dict of PEER_FEATURES) against the same tree, e.g. for a what-if market
+    z = (np.array([[features[f] for f in PEER_FEATURES]], float) - index['mean']) / np.where(index['std'] > 0, index['std'], 1.0)
+    dist, pos = index['tree'].query(z, k=k)
+    return [index['records'][j] + (float(dd), 1 / (1 + float(dd))) for j, dd in zip(index['pool'][pos[0]], dist[0])]
+
+
+def summarize(peers):
+    # One-line read of the peers' next-year outcomes
+    grew = int((peers['share_change'] > 0).sum())
+    return f"{grew} of {len(peers)} analogues grew EV share the following year (median {peers['share_change'].median():+.1f} pts)."
+
+
+def display_table(peers):
+    # Dialog table: peer state then, and the following year's outcome
+    return pd.DataFrame({
+        'Peer': peers['Country'], 'Year': peers['Year'].astype(str),
+        'Similarity': peers['similarity'].map('{:.0%}'.format),
+        'EV Share Then': peers['EV_Share_Pct'].map('{:.1f}%'.format),
+        'Next Year': peers['next_share'].map('{:.1f}%'.format),
+        'Change': peers['share_change'].map('{:+.1f} pts'.format),
+    })
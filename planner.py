@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+import feature_panel as fp
+import roi_engine
+
+# --- 1. MANDATE ---
+PLAN_YEARS = (2025, 2026, 2027)
+TREND_YEARS = 3                 # Share and GDP trends are fitted over the last three observed years
+MAX_LOGIT_STEP = 0.8            # Cap on yearly logit(share) momentum, so one boom year doesn't run away
+GDP_GROWTH = (-0.05, 0.08)      # Clip on projected real GDP/capita growth per year
+ANNUAL_CAP_SHARE = 0.5          # No more than half the mandate deployed in any single year
+PLAN_UNIT_MUSD = 1.0            # Budget grid of the DP; tickets are rounded to whole units
+PLAN_DISCOUNT = 0.08            # Yearly discount on a later ticket's payoff (cost of capital, execution risk)
+
+# --- 2. PER-YEAR MARKET FORECASTS ---
+def _logit(share):
+    p = np.clip(share / 100, 1e-3, 1 - 1e-3)
+    return np.log(p / (1 - p))
+
+
+def forecast_panel(panel, model, gmm, years=PLAN_YEARS):
+    # One row per (Country, Year): share rolled forward on its logit trend, GDP on its growth trend,
+    # then the GMM regime posterior and the regime-aware RF survival probability in one batch each
+    recent = panel.sort_values('Year').groupby('Country').tail(TREND_YEARS + 1)
+    first, last = recent.groupby('Country').first(), recent.groupby('Country').last()
+    span = (last['Year'] - first['Year']).clip(lower=1)
+    share_step = ((_logit(last['EV_Share_Pct']) - _logit(first['EV_Share_Pct'])) / span).clip(-MAX_LOGIT_STEP, MAX_LOGIT_STEP)
+    gdp_growth = ((last['GDP_per_capita'] / first['GDP_per_capita']) ** (1 / span) - 1).clip(*GDP_GROWTH).fillna(0)
+
+    rows = []
+    for year in years:
+        steps = year - last['Year']
+        share = 100 / (1 + np.exp(-(_logit(last['EV_Share_Pct']) + share_step * steps)))
+        prior = 100 / (1 + np.exp(-(_logit(last['EV_Share_Pct']) + share_step * (steps - 1))))
+        gdp = last['GDP_per_capita'] * (1 + gdp_growth) ** steps
+        rows.append(last.assign(Year=year, EV_Share_Pct=share, lagged_share=prior,
+                                GDP_per_capita=gdp, log_gdp=np.log1p(gdp)))
+    out = pd.concat(rows).reset_index()
+    if gmm is not None:
+        out['regime_prob'] = gmm.predict_proba(out[fp.REGIME_FEATURES])[:, 1]
+    out['Survival_Prob'] = model.predict_proba(out[fp.RF_FEATURES])[:, 1]
+    return out.set_index(['Country', 'Year'])[['EV_Share_Pct', 'GDP_per_capita', 'regime_prob', 'Survival_Prob']].sort_index()
+
+
+_forecast_cache = {}
+
+def get_forecasts(model_file=fp.RF_MODEL_FILE, gmm_file=fp.GMM_MODEL_FILE, master_file=fp.MASTER_FILE):
+    # Rebuilt only when the RF, the GMM or the master dataset changes on disk
+    key = (fp.file_version(model_file), fp.file_version(gmm_file), fp.file_version(master_file))
+    if None in key:
+        return None
+    if key not in _forecast_cache:
+        _forecast_cache.clear()
+        _forecast_cache[key] = {
+            'version': '-'.join(key),
+            'markets': forecast_panel(fp.build_panel(master_file, gmm_file), fp.load_model(model_file), fp.load_model(gmm_file)),
+        }
+    return _forecast_cache[key]
+
+# --- 3. COUNTRY x YEAR PAYOFFS ---
+def plan_inputs(df, forecasts, w_safe=1.0, w_room=1.0, w_wealth=1.0, years=PLAN_YEARS):
+    # Forecast survival/share/GDP per year on top of the live frame's saturation; markets the
+    # forecast doesn't cover keep their current values every year. Regional aggregates are not
+    # investable and never reach the DP.
+    base = df[~df['country'].isin(fp.AGGREGATES)].set_index('country')
+    markets = forecasts['markets'] if forecasts else None
+    frames = []
+    for year in years:
+        year_df = base[['Survival_Prob', 'EV_Share_Pct', 'GDP_per_capita', 'infra_saturation']].copy()
+        year_df['regime_prob'] = np.nan
+        if markets is not None:
+            fc = markets.xs(year, level='Year').reindex(year_df.index)
+            year_df.update(fc)
+        year_df['market_room'] = (100 - year_df['EV_Share_Pct']) / 100
+        year_df['purchasing_power'] = year_df['GDP_per_capita'] / 10000
+        year_df['ROI_Score'] = roi_engine.roi_score(year_df, w_safe, w_room, w_wealth)
+        frames.append(year_df.assign(year=year))
+    # Unscored markets (NaN ROI, no usable station census) are dropped, as in roi_engine.allocate
+    return pd.concat(frames).rename_axis('country').reset_index().dropna(subset=['ROI_Score'])
+
+# --- 4. STAGED DYNAMIC PROGRAM ---
+# Stage = year, state = remaining budget in PLAN_UNIT_MUSD units. Each year's sub-problem (best
+# deployment of d units, one ticket per market) is a knapsack solved once for every d and memoized;
+# the outer DP then chooses how much to deploy each year, with unspent capital carried forward.
+# A ticket's payoff is units x that year's forecast ROI, discounted by PLAN_DISCOUNT per year of
+# waiting: a market whose forecast ROI grows faster than the discount is worth funding later.
+_year_memo = {}
+
+def _year_table(key, roi, prob, tickets, cuts, capacity):
+    # best[d]: payoff of deploying at most d units this year; pick[i, d]: ticket chosen for market i
+    if key in _year_memo:
+        return _year_memo[key]
+    best = np.zeros(capacity + 1)
+    pick = np.zeros((len(roi), capacity + 1), dtype=np.int8)
+    for i in range(len(roi)):
+        cand, choice = best.copy(), np.zeros(capacity + 1, dtype=np.int8)
+        for tier, (units, cut) in enumerate(zip(tickets, cuts), start=1):
+            if prob[i] <= cut or units > capacity:
+                continue
+            shifted = np.full(capacity + 1, -np.inf)
+            shifted[units:] = best[:capacity + 1 - units] + units * roi[i]
+            better = shifted > cand
+            cand[better], choice[better] = shifted[better], tier
+        best, pick[i] = cand, choice
+    if len(_year_memo) > 256:
+        _year_memo.clear()
+    _year_memo[key] = (best, pick)
+    return best, pick
+
+
+def _unwind_year(pick, tickets, d):
+    # Walk the markets backwards from d units, collecting (market index, tier)
+    chosen = []
+    for i in range(len(pick) - 1, -1, -1):
+        tier = pick[i, d]
+        if tier:
+            chosen.append((i, tier))
+            d -= tickets[tier - 1]
+    return chosen[::-1]
+
+
+def plan(inputs, budget=100, annual_cap=None, tier_1_ticket=15, tier_2_ticket=5, tier_1_cut=0.70, tier_2_cut=0.40,
+         unit=PLAN_UNIT_MUSD, discount=PLAN_DISCOUNT, version=None):
+    # Returns the year-by-year ticket plan, $M deployed per year and the total payoff
+    years = sorted(inputs['year'].unique())
+    budget_units = int(round(budget / unit))
+    cap_units = min(budget_units, int(round((annual_cap if annual_cap is not None else budget * ANNUAL_CAP_SHARE) / unit)))
+    tickets = (max(1, int(round(tier_1_ticket / unit))), max(1, int(round(tier_2_ticket / unit))))
+    cuts = (tier_1_cut, tier_2_cut)
+
+    tables = []
+    for t, year in enumerate(years):
+        rows = inputs[inputs['year'] == year]
+        roi = rows['ROI_Score'].to_numpy() / (1 + discount) ** t * unit
+        key = (version, year, cap_units, tickets, cuts, unit, roi.tobytes(), rows['Survival_Prob'].to_numpy().tobytes())
+        tables.append((rows, _year_table(key, roi, rows['Survival_Prob'].to_numpy(), tickets, cuts, cap_units)))
+
+    # value[t][b]: best payoff from year t on with b units left; spend[t][b]: units deployed in year t
+    value = np.zeros((len(years) + 1, budget_units + 1))
+    spend = np.zeros((len(years), budget_units + 1), dtype=int)
+    b = np.arange(budget_units + 1)
+    for t in range(len(years) - 1, -1, -1):
+        best = tables[t][1][0]
+        d = np.arange(cap_units + 1)
+        # total[b, d] = this year's best for d units + the rest of the mandate on b - d units
+        total = best[None, :] + np.where(d[None, :] <= b[:, None], value[t + 1][np.clip(b[:, None] - d[None, :], 0, None)], -np.inf)
+        spend[t] = total.argmax(axis=1)
+        value[t] = total.max(axis=1)
+
+    plan_rows, deployed, left = [], {}, budget_units
+    for t, year in enumerate(years):
+        rows, (_, pick) = tables[t]
+        d = spend[t][left]
+        for i, tier in _unwind_year(pick, tickets, d):
+            row = rows.iloc[i]
+            plan_rows.append((year, row['country'], f"Tier {tier}", tickets[tier - 1] * unit, row['ROI_Score'],
+                              row['Survival_Prob'], row['EV_Share_Pct'], row['regime_prob']))
+        deployed[year] = sum(r[3] for r in plan_rows if r[0] == year)
+        left -= int(round(deployed[year] / unit))
+    columns = ['year', 'country', 'tier', 'allocation_musd', 'ROI_Score', 'Survival_Prob', 'EV_Share_Pct', 'regime_prob']
+    return {
+        'plan': pd.DataFrame(plan_rows, columns=columns),
+        'deployed_musd': pd.Series(deployed, name='allocation_musd'),
+        'payoff': float(value[0][budget_units]),
+        'unspent_musd': left * unit,
+    }
@@ -0,0 +1,189 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+# --- 1. RECORD BUFFER ---
+# Process-wide ring buffer of stage timings; every session's reruns land here.
+# Set GLOBALCHARGE_PROFILE_LOG to also append each record to a JSON-lines file.
+LOG_FILE = os.environ.get('GLOBALCHARGE_PROFILE_LOG')
+RELEASE = os.environ.get('GLOBALCHARGE_RELEASE', 'dev')
+PROFILE_MODES = ('cpu', 'mem', 'all')
+BUFFER_SIZE = int(os.environ.get('GLOBALCHARGE_PROFILE_BUFFER', 5000))
+
+_records = deque(maxlen=BUFFER_SIZE)
+_profiles = {}
+_lock = threading.Lock()
+_local = threading.local()   # Streamlit runs each session's script on its own thread
+_mem_runs = 0                # Open mem-profiled runs; tracemalloc is process-wide, so it is reference-counted
+_mem_owner = False           # True if tracemalloc was started here (not by someone else in the process)
+_mem_joins = 0               # Bumped whenever a mem-profiled run opens; a stage that saw it change shared the peak
+_open = {}                   # Script thread -> whether its open run holds tracemalloc
+
+
+def _emit(record):
+    with _lock:
+        _records.append(record)
+        if LOG_FILE:
+            with open(LOG_FILE, 'a') as fh:
+                fh.write(json.dumps(record) + '\n')
+
+# --- 2. RUN & STAGE TIMERS ---
+def start_run(app, mode=None):
+    # Opens one dashboard rerun; mode='cpu'|'mem'|'all' turns on cProfile/tracemalloc for it
+    if getattr(_local, 'started', None) is not None:
+        _close_run(record=False)     # A run this thread never closed: release its profiler and tracing
+    _reap_dead_runs()
+    _local.app = app
+    _local.run_id = uuid.uuid4().hex[:8]
+    _local.mode = mode if mode in PROFILE_MODES else None
+    _local.started = time.perf_counter()
+    _local.profiler = None
+    _local.tracing = _local.mode in ('mem', 'all')
+    if _local.tracing:
+        _acquire_tracing()
+    with _lock:
+        _open[threading.current_thread()] = _local.tracing
+    if _local.mode in ('cpu', 'all'):
+        _local.profiler = cProfile.Profile()
+        _local.profiler.enable()
+
+
+def end_run():
+    if getattr(_local, 'started', None) is not None:
+        _close_run(record=True)
+
+
+def _close_run(record):
+    if record:
+        _record('rerun_total', (time.perf_counter() - _local.started) * 1000, None)
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        if record:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+            with _lock:
+                _profiles[_local.app] = {'run_id': _local.run_id, 'ts': time.time(), 'report': out.getvalue()}
+    if getattr(_local, 'tracing', False):
+        _release_tracing()
+    with _lock:
+        _open.pop(threading.current_thread(), None)
+    _local.started = None
+    _local.profiler = None
+    _local.tracing = False
+
+
+def _reap_dead_runs():
+    # st.stop(), st.rerun() and exceptions skip end_run, and Streamlit starts each rerun on a fresh
+    # script thread; a run whose thread has exited is dropped here so its tracing hold is released
+    with _lock:
+        dead = [t for t in _open if not t.is_alive()]
+        holds = sum(_open.pop(t) for t in dead)
+    for _ in range(holds):
+        _release_tracing()
+
+
+def _acquire_tracing():
+    global _mem_runs, _mem_owner, _mem_joins
+    with _lock:
+        _mem_joins += 1
+        if _mem_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _mem_owner = True
+        _mem_runs += 1
+
+
+def _release_tracing():
+    # The last mem-profiled run out stops tracing, and only if this module started it
+    global _mem_runs, _mem_owner
+    with _lock:
+        _mem_runs -= 1
+        if _mem_runs == 0 and _mem_owner:
+            tracemalloc.stop()
+            _mem_owner = False
+
+
+def _record(stage_name, ms, mem_kb):
+    _emit({
+        'ts': round(time.time(), 3),
+        'release': RELEASE,
+        'app': getattr(_local, 'app', None),
+        'run_id': getattr(_local, 'run_id', None),
+        'stage': stage_name,
+        'ms': round(ms, 3),
+        'mem_kb': None if mem_kb is None else round(mem_kb, 1),
+    })
+
+
+def _sole_mem_run():
+    # Peak memory is process-wide: it is only attributable to a stage while no other session is
+    # mem-profiling (resetting it would also corrupt that session's reading). Returns the join
+    # count to compare at stage end, or None if the stage can't own the peak.
+    with _lock:
+        if getattr(_local, 'tracing', False) and _mem_runs == 1 and tracemalloc.is_tracing():
+            return _mem_joins
+        return None
+
+
+@contextmanager
+def stage(name):
+    joins = _sole_mem_run()
+    tracing = joins is not None
+    if tracing:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        # Dropped if another session opened a mem-profiled run mid-stage and shared the peak
+        mem_kb = (tracemalloc.get_traced_memory()[1] - base) / 1024 if tracing and _mem_joins == joins else None
+        _record(name, elapsed, mem_kb)
+
+
+# --- 3. READ-OUT ---
+def records():
+    with _lock:
+        return list(_records)
+
+
+def summary():
+    # Per (app, stage): call count, p50/p95/max latency and peak traced memory
+    df = pd.DataFrame(records())
+    if df.empty:
+        return df
+    grouped = df.groupby(['app', 'stage'], dropna=False)
+    out = grouped['ms'].agg(
+        calls='count',
+        p50_ms=lambda s: s.quantile(0.50),
+        p95_ms=lambda s: s.quantile(0.95),
+        max_ms='max',
+    )
+    out['peak_mem_kb'] = grouped['mem_kb'].max()
+    return out.reset_index().sort_values('p95_ms', ascending=False)
+
+
+def last_profiles():
+    with _lock:
+        return dict(_profiles)
+
+
+def export_jsonl():
+    return ''.join(json.dumps(r) + '\n' for r in records())
+
+
+def clear():
+    with _lock:
+        _records.clear()
+        _profiles.clear()
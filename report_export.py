@@ -0,0 +1,354 @@
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import charger_demand
+import explainability
+import intel_repository
+import peers
+import result_cache
+import roi_engine
+import schemas
+import sensitivity
+import siting
+
+# Usage (from the repo root):
+#   python report_export.py                                    # s_app audit, every market x the default mandates
+#   python report_export.py --app sr_app --workers 4
+#   python report_export.py --scenario board=1.2,0.8,1.5 --countries Germany USA --out /tmp/pack
+
+# --- 1. MANDATES & OUTPUT ---
+SCENARIOS = {
+    'balanced': (1.0, 1.0, 1.0),
+    'defensive': (1.6, 0.8, 1.0),     # Resilience first
+    'growth': (0.8, 1.6, 1.0),        # Untapped market room first
+    'wealth_tilt': (1.0, 0.8, 1.6),   # Purchasing power first
+}
+OUT_DIR = 'board_pack'
+FIGURE_CACHE_DIR = os.environ.get('GLOBALCHARGE_EXPORT_CACHE') or os.path.join(tempfile.gettempdir(), 'globalcharge_export_cache')
+FIGURE_TTL = 7 * 24 * 3600          # Keys carry the data/model versions, so age alone never makes a figure stale
+FIGURE_FORMAT = 2                    # Bump when _build_figures' output changes, so stale disk entries are not read back
+
+# --- 2. SHARED CONTEXT (built once in the parent, inherited by every worker) ---
+def build_context(app):
+    # Same frame, attribution cache, sensitivity sweep and peer index the dashboard would use
+    if app == 's_app':
+        df = roi_engine.load_war_room_data()
+    else:
+        df = schemas.load_view('audit')
+    if df is None:
+        raise FileNotFoundError(f"No dataset found for {app}")
+    explain = explainability.get_attributions()
+    data_version = result_cache.frame_version(df)
+    peer_index = peers.get_index()
+    return {
+        'app': app,
+        'df': df.set_index('country', drop=False),
+        'explain': explain,
+        'data_version': data_version,
+        'model_version': explain['model_version'] if explain else None,
+        'siting_version': siting.input_version(),
+        'sens': sensitivity.analyze(df) if app == 's_app' else None,
+        'peers': peer_index,
+        # Weight-independent: each market's neighbour lookup and table are rendered once, not once per mandate
+        'analogues': {country: _analogue_body(peer_index, country) for country in df['country']},
+    }
+
+# --- 3. STATIC TEMPLATE (one stylesheet and one plotly.js per pack) ---
+CSS = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; color: #1e293b; max-width: 1100px; margin: 32px auto; padding: 0 24px; }
+h1 { font-size: 1rem; letter-spacing: 0.08rem; color: #64748b; margin-bottom: 4px; }
+h2 { color: #0f766e; margin: 0 0 4px 0; }
+h3 { margin-top: 28px; border-bottom: 1px solid #e2e8f0; padding-bottom: 6px; }
+.mandate { color: #64748b; font-size: 0.85rem; font-weight: 600; }
+.row { display: flex; gap: 16px; }
+.row > div { flex: 1; }
+.box { padding: 16px 18px; border-radius: 8px; line-height: 1.6; }
+.info { background: #eff6ff; color: #1e3a8a; }
+.warning { background: #fffbeb; color: #78350f; }
+.metric .label { color: #64748b; font-size: 0.8rem; font-weight: 700; text-transform: uppercase; }
+.metric .value { color: #0f766e; font-size: 1.7rem; font-weight: 800; }
+.metric .delta { color: #475569; font-size: 0.85rem; }
+.caption { color: #64748b; font-size: 0.85rem; }
+.intel-box { background-color: #f8fafc; padding: 25px; border-left: 6px solid #0f766e; border-radius: 8px; margin-top: 24px; line-height: 1.7; }
+.intel-box h4 { color: #0f766e; margin-top: 0; }
+table { border-collapse: collapse; width: 100%; } td, th { padding: 6px 10px; border-bottom: 1px solid #e2e8f0; text-align: left; }
+"""
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="report.css"><script src="plotly.min.js"></script></head>
+<body>{body}</body></html>
+"""
+
+
+def write_assets(out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'report.css'), 'w') as fh:
+        fh.write(CSS)
+    js = os.path.join(out_dir, 'plotly.min.js')
+    if not os.path.exists(js):
+        with open(js, 'w', encoding='utf-8') as fh:
+            fh.write(get_plotlyjs())
+
+
+def _md(text):
+    # The dashboards' markdown subset: **bold**, *italic*, blank-line paragraphs
+    text = html.escape(str(text))
+    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'\*(.+?)\*', r'<i>\1</i>', text)
+    return text.replace('\n\n', '<br><br>')
+
+
+def _metric(label, value, delta=''):
+    return (f"<div class='metric'><div class='label'>{html.escape(label)}</div>"
+            f"<div class='value'>{html.escape(value)}</div><div class='delta'>{html.escape(delta)}</div></div>")
+
+
+def _row(*cells):
+    return "<div class='row'>" + ''.join(f"<div>{c}</div>" for c in cells) + "</div>"
+
+
+def _fig_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+
+# --- 4. PER-MARKET FIGURES (weight-independent: rendered once, reused by every mandate) ---
+_figure_cache = None
+
+def _figures(ctx, country):
+    global _figure_cache
+    if _figure_cache is None:
+        _figure_cache = result_cache.ResultCache(max_entries=256, ttl=FIGURE_TTL, disk_dir=FIGURE_CACHE_DIR)
+    key = result_cache.make_key(f"report_figures_v{FIGURE_FORMAT}", (ctx['data_version'], ctx['siting_version']), ctx['model_version'],
+                                country=(ctx['app'], country))
+    return _figure_cache.get_or_compute(key, lambda: _build_figures(ctx, country))
+
+
+def _build_figures(ctx, country):
+    out = {'drivers': None, 'siting': None, 'tornado': None}
+    drivers = explainability.country_drivers(ctx['explain'], country)
+    if drivers is not None:
+        out['drivers'] = {'top': drivers.iloc[0].to_dict(), 'html': _fig_html(explainability.drivers_figure(drivers))}
+    sited = siting.site_country(country)
+    out['siting'] = {k: sited[k] for k in ('stations', 'uncovered_share', 'median_nearest_km', 'candidates')}
+    out['siting'].update(caption=siting.siting_caption(sited), html=_fig_html(siting.siting_figure(sited)))
+    if ctx['sens'] is not None and country in ctx['sens']['rank']['ST'].index:
+        out['tornado'] = _fig_html(sensitivity.tornado_figure(ctx['sens'], country))
+    return out
+
+# --- 5. REPORT SECTIONS (mirror render_final_report in s_app.py / sr_app.py) ---
+def _war_room_sections(ctx, country, c_data, custom_roi, figs):
+    headline, context, verdict = intel_repository.get_comprehensive_intel(country, c_data, custom_roi)
+    status = "🚀 Takeoff Phase" if c_data['EV_Share_Pct'] < 20 else "📉 Mature / Saturated"
+    resilience = "✅ Highly Resilient" if c_data['Survival_Prob'] > 0.65 else "⚠️ Policy Vulnerable"
+    stage_text = (f"**Classification 1: Market Stage**\n\n**{status}**\n\n*Data Justification:* Market exhibits "
+                  f"{c_data['EV_Share_Pct']:.1f}% adoption. Capital deployment into markets under 20% yields the highest "
+                  "exponential returns before saturation.")
+    risk_text = (f"**Classification 2: AI Risk Profile**\n\n**{resilience}**\n\n*Data Justification:* The Random Forest model "
+                 f"predicts a {c_data['Survival_Prob']:.1%} probability of sustained market expansion in a strict, zero-subsidy environment.")
+    parts = ["<h3>1. Market Classifications</h3>",
+             _row(f"<div class='box info'>{_md(stage_text)}</div>", f"<div class='box warning'>{_md(risk_text)}</div>")]
+    s_shift = c_data['EV_Share_Pct'] - c_data['EV_Share_Pct_2023']
+    p_shift = c_data['Policy_Score'] - c_data['Policy_Score_2023']
+    parts += ["<h3>2. Regime Shift Analytics (2023 ➔ 2024)</h3>", _row(
+        _metric("Current Market Share", f"{c_data['EV_Share_Pct']:.1f}%", f"{s_shift:+.1f}% vs 2023"),
+        _metric("Gov. Policy Support", f"{c_data['Policy_Score']:.1f} Score", f"{p_shift:+.1f} vs 2023"),
+        _metric("Purchasing Power", f"${c_data['GDP_per_capita']:,.0f}", "GDP/Capita"),
+    )]
+    census_note = charger_demand.census_note(c_data)
+    if census_note:
+        parts.append(f"<p class='caption'>{html.escape(census_note)}</p>")
+    elif pd.notna(c_data.get('dc_kw_demand')):
+        parts.append(f"<p class='caption'>⚡ Public DC charging: ~{c_data['dc_kw_demand'] / 1000:,.0f} MW needed for the on-road BEV fleet vs. {c_data['dc_supply_kw'] / 1000:,.0f} MW installed (infra saturation {c_data['infra_saturation']:.0%}).</p>")
+    parts += _shared_sections(ctx, country, figs, "3. What Drove the Survival Probability")
+    if pd.isna(custom_roi):
+        parts += ["<h3>5. How Robust Is the Ranking</h3>",
+                  f"<p class='caption'>{html.escape(country)} has no ROI (see the infra note above), so every sampled mandate ranks it after the scored markets and never funds it.</p>"]
+    elif figs['tornado']:
+        sens = ctx['sens']
+        band, rank_st = sens['rank_band'].loc[country], sens['rank']['ST'].loc[country]
+        lead = rank_st.idxmax()
+        caption = (f"Across {sens['n_evaluations']:,} Sobol-sampled mandates, {country} ranks #{band['p05']:.0f}–#{band['p95']:.0f} "
+                   f"of {len(sens['countries'])} (90% band) and is funded in {sens['funded_share'].loc[country]:.0%} of them. "
+                   + (f"**{sensitivity.FACTOR_LABELS[lead]}** explains the most rank variance ({rank_st[lead]:.0%} total effect)."
+                      if rank_st[lead] > 0 else "Its rank does not move."))
+        parts += ["<h3>5. How Robust Is the Ranking</h3>", f"<p class='caption'>{_md(caption)}</p>", figs['tornado']]
+    parts += _analogue_section(ctx, country, "6. Closest Historical Analogues")
+    parts.append(_intel_box(f"📰 Geopolitical & Policy Context: {headline}", context, verdict))
+    return parts
+
+
+def _audit_sections(ctx, country, c_data, custom_roi, figs):
+    headline, context, verdict = intel_repository.get_detailed_intel(country, c_data, custom_roi)
+    share = c_data.get('lagged_share', 15)
+    status = "🚀 Takeoff Phase" if share < 20 else "📉 Mature / Saturated"
+    resilience = "✅ Highly Resilient" if c_data.get('new_prob_pct', 0) >= 78 else "⚠️ Policy Vulnerable"
+    curr_p, base_p = c_data.get('new_prob_pct', 0), c_data.get('base_prob_pct', 75)
+    stage_text = (f"**Classification 1: Market Stage**\n\n**{status}**\n\n*Justification:* Market exhibits {share:.1f}% adoption. "
+                  "Deployment into markets under 20% yields highest exponential returns.")
+    risk_text = (f"**Classification 2: AI Risk Profile**\n\n**{resilience}**\n\n*Justification:* Model identifies high "
+                 "structural stability despite the 2024 'Chaos Regime' shifts.")
+    parts = ["<h3>1. Market Classifications</h3>",
+             _row(f"<div class='box info'>{_md(stage_text)}</div>", f"<div class='box warning'>{_md(risk_text)}</div>"),
+             "<h3>2. Regime Shift Analytics (2023 ➔ 2024)</h3>", _row(
+        _metric("AI Confidence", f"{curr_p:.1f}%", f"{curr_p - base_p:+.1f}% vs Baseline"),
+        _metric("Opportunity Gap", f"{c_data.get('opportunity_gap', 0):.2f}", "Alpha Index"),
+        _metric("ROI Potential Index", f"{custom_roi:,.0f}", "Scaled Score"),
+    )]
+    parts += _shared_sections(ctx, country, figs, "3. What Drove the AI Confidence")
+    parts += _analogue_section(ctx, country, "5. Closest Historical Analogues")
+    parts.append(_intel_box(f"📰 Geopolitical Context: {headline}", context, verdict))
+    return parts
+
+
+def _shared_sections(ctx, country, figs, drivers_title):
+    parts = []
+    explain = ctx['explain']
+    if figs['drivers']:
+        top = figs['drivers']['top']
+        caption = (f"Regime-aware Random Forest (model {explain['model_version']}): {explain['survival_prob'][country]:.1%} survival "
+                   f"vs. {explain['base_value']:.1%} portfolio baseline. Strongest driver: **{top['label']}** "
+                   f"({top['contribution'] * 100:+.1f} pts).")
+        parts += [f"<h3>{drivers_title}</h3>", f"<p class='caption'>{_md(caption)}</p>", figs['drivers']['html']]
+    s = figs['siting']
+    median = f"{s['median_nearest_km']:.1f} km" if s['median_nearest_km'] is not None else "n/a"
+    parts += ["<h3>4. Where to Build: Charger Siting</h3>", _row(
+        _metric("Public Stations", f"{s['stations']:,}"),
+        _metric("Uncovered Area", f"{s['uncovered_share']:.0%}", f">{siting.COVERAGE_KM} km from a charger"),
+        _metric("Median Distance", median, "to nearest station"),
+    ), s['html'],
+        f"<p class='caption'>{html.escape(s['caption'])}</p>"]
+    return parts
+
+
+def _analogue_body(peer_index, country):
+    analogues = peers.analogues(peer_index, country)
+    if analogues is None:
+        return "<p class='caption'>No Country x Year history on record for this market.</p>"
+    caption = (f"Other markets whose GDP, policy, infrastructure, share and sentiment looked most like {country} in "
+               f"{peer_index['latest'][peers.canonical(country)]}. " + peers.summarize(analogues))
+    return (peers.display_table(analogues).to_html(index=False, border=0, escape=True)
+            + f"<p class='caption'>{html.escape(caption)}</p>")
+
+
+def _analogue_section(ctx, country, title):
+    return [f"<h3>{title}</h3>", ctx['analogues'][country]]
+
+
+def _intel_box(headline, context, verdict):
+    return (f"<div class='intel-box'><h4>{_md(headline)}</h4><p>{_md(context)}</p>"
+            f"<hr style='border: 1px solid #cbd5e1;'><h4>💰 ROI Justification &amp; Verdict</h4><p>{_md(verdict)}</p></div>")
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')
+
+
+def render_report(ctx, country, scenario, weights):
+    # One self-contained audit page (shared css/js next to it); returns its ROI under the mandate
+    c_data = ctx['df'].loc[country]
+    if ctx['app'] == 's_app':
+        custom_roi = float(roi_engine.roi_score(c_data, *weights))
+        sections = _war_room_sections
+    else:
+        custom_roi = float(roi_engine.centered_roi(c_data, *weights))
+        sections = _audit_sections
+    figs = _figures(ctx, country)
+    header = (f"<h1>📋 OFFICIAL EXECUTIVE AUDIT REPORT</h1><h2>Strategic Target: {html.escape(country)}</h2>"
+              f"<div class='mandate'>Mandate '{html.escape(scenario)}': Resilience {weights[0]:.1f} · Market Room {weights[1]:.1f} · "
+              f"Wealth {weights[2]:.1f} | Data {ctx['data_version']} · Model {(ctx['model_version'] or 'n/a')[:8]}</div>")
+    body = header + ''.join(sections(ctx, country, c_data, custom_roi, figs))
+    return PAGE.format(title=f"Audit: {html.escape(country)} ({html.escape(scenario)})", body=body), custom_roi
+
+# --- 6. PARALLEL PACK BUILD ---
+_ctx = None
+
+def _init_worker(ctx):
+    global _ctx
+    _ctx = ctx
+
+
+def _render_country(job):
+    # One work unit per market: its figures are built (or loaded) once, then every mandate is written
+    country, scenarios, out_dir = job
+    rows = []
+    for scenario, weights in scenarios.items():
+        page, roi = render_report(_ctx, country, scenario, weights)
+        name = f"{_slug(country)}__{_slug(scenario)}.html"
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as fh:
+            fh.write(page)
+        rows.append((country, scenario, roi, name))
+    return rows
+
+
+def write_index(out_dir, rows, scenarios, ctx):
+    table = pd.DataFrame(rows, columns=['country', 'scenario', 'roi', 'file'])
+    head = ''.join(f"<th>{html.escape(s)}</th>" for s in scenarios)
+    body = []
+    for country, group in table.groupby('country'):
+        cells = group.set_index('scenario').reindex(list(scenarios))
+        body.append(f"<tr><td>{html.escape(country)}</td>" + ''.join(
+            "<td>–</td>" if not isinstance(r.file, str)
+            else f"<td><a href='{r.file}'>{'unscored' if pd.isna(r.roi) else f'{r.roi:,.1f}'}</a></td>"
+            for r in cells.itertuples()) + "</tr>")
+    page = PAGE.format(title="Board Pack", body=(
+        f"<h1>📋 BOARD PACK: EXECUTIVE AUDIT REPORTS</h1><div class='mandate'>{len(table)} reports · Data {ctx['data_version']} · "
+        f"Model {(ctx['model_version'] or 'n/a')[:8]} · ROI under each mandate</div>"
+        f"<table><tr><th>Market</th>{head}</tr>{''.join(body)}</table>"))
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as fh:
+        fh.write(page)
+
+
+def build_pack(app='s_app', scenarios=SCENARIOS, countries=None, out_dir=OUT_DIR, workers=None):
+    ctx = build_context(app)
+    countries = [c for c in (countries or ctx['df'].index) if c in ctx['df'].index]
+    write_assets(out_dir)
+    jobs = [(country, scenarios, out_dir) for country in countries]
+    # Never more workers than markets, and at least one even when no requested market is on record
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        _init_worker(ctx)
+        results = [_render_country(job) for job in jobs]
+    else:
+        # fork hands every worker the parent's context without re-pickling it per task
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        with multiprocessing.get_context(method).Pool(workers, _init_worker, (ctx,)) as pool:
+            results = pool.map(_render_country, jobs, chunksize=1)
+    rows = [row for batch in results for row in batch]
+    write_index(out_dir, rows, scenarios, ctx)
+    return rows
+
+
+def _scenario(text):
+    name, _, weights = text.partition('=')
+    values = tuple(float(w) for w in weights.split(','))
+    if not name or len(values) != 3:
+        raise argparse.ArgumentTypeError("expected name=w_safe,w_room,w_wealth")
+    return name, values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the executive audit report for every market x mandate to static HTML")
+    parser.add_argument('--app', choices=['s_app', 'sr_app'], default='s_app', help="Which dashboard's audit to render")
+    parser.add_argument('--scenario', type=_scenario, action='append', help="name=w_safe,w_room,w_wealth (repeatable)")
+    parser.add_argument('--countries', nargs='*', default=None)
+    parser.add_argument('--out', default=OUT_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    scenarios = dict(args.scenario) if args.scenario else SCENARIOS
+    rows = build_pack(args.app, scenarios, args.countries, args.out, args.workers)
+    print(f"📋 {len(rows)} reports ({len({r[0] for r in rows})} markets x {len(scenarios)} mandates) -> "
+          f"{os.path.join(args.out, 'index.html')} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# --- 1. KEYS & VERSIONS ---
+def frame_version(df):
+    # Content hash of an in-memory frame, so any loader's output can be versioned
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()[:12]
+
+
+def make_key(kind, dataset_version, model_version, weights=(), country=None):
+    return (kind, dataset_version, model_version, tuple(round(float(w), 3) for w in weights), country)
+
+# --- 2. PROCESS-WIDE TTL + LRU CACHE ---
+class ResultCache:
+    # Memory tier is a bounded LRU with per-entry expiry; the optional disk tier
+    # survives restarts and is shared by every process pointed at the same folder.
+    # Concurrent misses on one key are collapsed so the work runs exactly once.
+
+    def __init__(self, max_entries=512, ttl=3600, disk_dir=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    # --- memory tier ---
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                self.counters['expirations'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return True, value
+
+    def _put_memory(self, key, value, expires):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    # --- disk tier ---
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha1(repr(key).encode()).hexdigest() + '.pkl')
+
+    def _get_disk(self, key):
+        if not self.disk_dir:
+            return False, None
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return False, None
+            with open(path, 'rb') as fh:
+                stored_key, value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        if stored_key != key:
+            return False, None
+        with self._lock:
+            self.counters['disk_hits'] += 1
+        self._put_memory(key, value, os.path.getmtime(path) + self.ttl)
+        return True, value
+
+    def _put_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+        try:
+            with open(tmp, 'wb') as fh:
+                pickle.dump((key, value), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # --- public API ---
+    def get(self, key, default=None):
+        found, value = self._get_memory(key)
+        if not found:
+            found, value = self._get_disk(key)
+        return value if found else default
+
+    def put(self, key, value):
+        self._put_memory(key, value, time.time() + self.ttl)
+        self._put_disk(key, value)
+
+    def get_or_compute(self, key, compute):
+        found, value = self._get_memory(key)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                # Whoever held the lock before us may already have filled the entry
+                found, value = self._get_memory(key)
+                if not found:
+                    found, value = self._get_disk(key)
+                if not found:
+                    with self._lock:
+                        self.counters['misses'] += 1
+                    value = compute()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                if self._key_locks.get(key) is key_lock:
+                    del self._key_locks[key]
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['disk_hits'] + self.counters['misses']
+            return dict(self.counters, size=len(self._entries), max_entries=self.max_entries, ttl=self.ttl,
+                        hit_rate=(self.counters['hits'] + self.counters['disk_hits']) / lookups if lookups else 0.0)
+
+# --- 3. SHARED INSTANCE ---
+# One cache per server process; every Streamlit session and the API read through it
+SHARED = ResultCache(
+    max_entries=int(os.environ.get('GLOBALCHARGE_CACHE_SIZE', 512)),
+    ttl=float(os.environ.get('GLOBALCHARGE_CACHE_TTL', 3600)),
+    disk_dir=os.environ.get('GLOBALCHARGE_CACHE_DIR') or None,
+)
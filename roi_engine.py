@@ -0,0 +1,55 @@
+import pandas as pd
+
+import charger_demand
+import profiling
+import schemas
+
+# --- 1. WAR ROOM DATA ---
+def load_war_room_data(files=schemas.WAR_ROOM_FILES, demand_gap=True):
+    # Projected, typed 'war_room' view; demand_gap swaps infra_saturation for the modelled DC supply/demand gap
+    with profiling.stage('csv_load'):
+        df = schemas.load_view('war_room', files)
+    if df is None:
+        return None
+    if demand_gap:
+        with profiling.stage('charger_gap'):
+            df = charger_demand.apply_gap(df, charger_demand.get_supply_gap())
+    return df
+
+# --- 2. STRATEGIC ROI INDEX ---
+def roi_score(data, w_safe=1.0, w_room=1.0, w_wealth=1.0):
+    # (Survival Confidence * Unsold Market * Wealth) / (1 + Saturation), works on a frame or a single row
+    return (
+        (data['Survival_Prob'] ** w_safe) * (data['market_room'] ** w_room) * (data['purchasing_power'] ** w_wealth)
+    ) / (1 + data['infra_saturation']) * 100
+
+# --- 3. $100M TIERED ALLOCATION (notebook Step 4) ---
+def allocate(df, budget=100, tier_1_ticket=15, tier_2_ticket=5, tier_1_cut=0.70, tier_2_cut=0.40,
+             roi_col='ROI_Score', prob_col='Survival_Prob'):
+    # Walk the ROI leaderboard: Core Bets above the tier-1 cut, Growth Bets above the tier-2 cut
+    # Unscored markets (NaN ROI, e.g. no usable station census) are never funded
+    leaderboard = df.dropna(subset=[roi_col]).sort_values(roi_col, ascending=False)
+    rows = []
+    spent = 0
+    for country, prob, roi in zip(leaderboard['country'], leaderboard[prob_col], leaderboard[roi_col]):
+        if prob > tier_1_cut and spent + tier_1_ticket <= budget:
+            rows.append((country, 'Tier 1', tier_1_ticket, roi, prob))
+            spent += tier_1_ticket
+        elif prob > tier_2_cut and spent + tier_2_ticket <= budget:
+            rows.append((country, 'Tier 2', tier_2_ticket, roi, prob))
+            spent += tier_2_ticket
+    return pd.DataFrame(rows, columns=['country', 'tier', 'allocation_musd', roi_col, prob_col])
+
+# --- 4. CENTERED MANDATE ROI (sr_app audit) ---
+def centered_roi(c_data, w_s=1.0, w_r=1.0, w_w=1.0):
+    # Scales the audit's precomputed ROI: a weight above 1.0 amplifies the market's deviation from the average
+    prob = c_data.get('new_prob_pct', 80) / 100
+    room = c_data.get('market_room', 0.5)
+    wealth = c_data.get('gdp_per_capita', c_data.get('purchasing_power', 40000))
+    base_roi = c_data.get('roi_score', 500)
+
+    mod_s = max(0.1, 1 + (w_s - 1.0) * (prob - 0.5) * 2)      # Resilience, centred at 50% probability
+    mod_r = max(0.1, 1 + (w_r - 1.0) * (room - 0.5) * 2)      # Market room, centred at 50% room
+    norm_w = min(wealth / 40000, 2.0)                        # Wealth, centred at $40k GDP/capita, capped at 2x
+    mod_w = max(0.1, 1 + (w_w - 1.0) * (norm_w - 1.0))
+    return base_roi * mod_s * mod_r * mod_w
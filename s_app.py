@@ -1,10 +1,24 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import os
+
+import charger_demand
+import diagnostics
+import dialog_sections
+import explainability
+import feature_panel as fp
+import hot_reload
+import intel_repository
+import peers
+import profiling
+import result_cache
+import roi_engine
+import schemas
+import sensitivity
 
 # --- 1. CONFIG & "WHITE-PAPER" THEME ---
 st.set_page_config(page_title="GlobalCharge Intelligence", layout="wide", initial_sidebar_state="collapsed")
+profiling.start_run("s_app", diagnostics.profile_mode())
 
 # CSS for a completely clean, no-scroll, white-paper interface
 st.markdown("""
@@ -37,92 +51,107 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- 2. DATA LOADER ---
-@st.cache_data
-def load_data():
-    files = ['war_room_data_v3.csv', 'war_room_data.csv', 'streamlit_data_v2.csv', 'streamlit_data.csv']
-    for file in files:
-        if os.path.exists(file):
-            df = pd.read_csv(file)
-            if not df.empty:
-                if 'EV_Share_Pct_2023' not in df.columns: df['EV_Share_Pct_2023'] = df.get('EV_Share_Pct', 0) - 2.5
-                if 'Policy_Score_2023' not in df.columns: df['Policy_Score_2023'] = df.get('Policy_Score', 0)
-                if 'Survival_Prob' not in df.columns: df['Survival_Prob'] = 0.5
-                if 'market_room' not in df.columns: df['market_room'] = (100 - df.get('EV_Share_Pct', 0)) / 100
-                if 'purchasing_power' not in df.columns: df['purchasing_power'] = df.get('GDP_per_capita', 50000) / 10000
-                if 'infra_saturation' not in df.columns: df['infra_saturation'] = 0.5
-                return df
-    return None
-
-df = load_data()
-if df is None:
-    st.error("Data missing. Please upload your CSV to GitHub.")
+# Hidden ?diagnostics=1 page
+if diagnostics.requested():
+    diagnostics.render("s_app")
+    st.stop()
+
+# --- 2. LIVE DATA (built and hot-swapped off the request path) ---
+def build_map(data):
+    # Use natural earth, but tell Plotly to show all landmasses so the whole map renders
+    fig = px.choropleth(
+        data, locations=data.get("iso_alpha", data["country"]), color="Base_ROI", 
+        hover_name="country", color_continuous_scale="Teal", 
+        projection="natural earth"
+    )
+    
+    # update_geos forces the entire globe to render, filling missing countries with light gray
+    fig.update_geos(
+        showland=True, landcolor="#f1f5f9", 
+        showocean=True, oceancolor="#ffffff",
+        showcoastlines=True, coastlinecolor="#cbd5e1",
+        showframe=False,
+        lataxis_range=[-55, 90] # Hides empty Antarctica to make the map look larger
+    )
+    
+    fig.update_layout(
+        margin={"r":0,"t":0,"l":0,"b":0}, height=550,
+        coloraxis_showscale=False, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+def build_snapshot():
+    # War room frame, attribution cache, prewarmed map, sensitivity sweep and peer index; runs on the reload thread
+    data = roi_engine.load_war_room_data()
+    if data is None:
+        raise FileNotFoundError("Data missing. Please upload your CSV to GitHub.")
+    with profiling.stage('roi_math'):
+        data['Base_ROI'] = roi_engine.roi_score(data)
+    with profiling.stage('attribution_cache'):
+        explain = explainability.get_attributions()
+    data_version = result_cache.frame_version(data)
+    model_version = explain['model_version'] if explain else None
+    # The map and sweep live on the snapshot (no TTL), so they are rebuilt only by the next swap
+    with profiling.stage('choropleth'):
+        fig_map = build_map(data)
+    with profiling.stage('sensitivity'):
+        sens = sensitivity.analyze(data)
+    with profiling.stage('peer_index'):
+        peer_index = peers.get_index()
+    return {'df': data, 'explain': explain, 'peers': peer_index, 'data_version': data_version, 'model_version': model_version,
+            'map': fig_map, 'sens': sens}
+
+@st.cache_resource
+def live_data():
+    watch = schemas.WAR_ROOM_FILES + [charger_demand.SPEC_FILE, charger_demand.EV_SALES_FILE, charger_demand.BEV_SHARE_FILE,
+                                      fp.RF_MODEL_FILE, fp.GMM_MODEL_FILE, fp.MASTER_FILE]
+    return hot_reload.LiveData('s_app', watch, build_snapshot).start()
+
+live = live_data()
+try:
+    # Timed per rerun from outside: a live snapshot is a reference read, a cold start builds it here
+    with profiling.stage('live_snapshot'):
+        snapshot = live.current()
+except schemas.SchemaError as e:
+    st.error(f"Data file does not match the dashboard schema: {e}")
+    st.stop()
+except FileNotFoundError as e:
+    st.error(str(e))
     st.stop()
 
-df['Base_ROI'] = (df['Survival_Prob'] * df['market_room'] * df['purchasing_power']) / (1 + df['infra_saturation']) * 100
+# One snapshot per rerun: a swap mid-run never mixes versions
+df = snapshot['df']
+explain_cache = snapshot['explain']
+peer_index = snapshot['peers']
+
+# Shared result cache: sessions asking for the same audit/map reuse one build
+DATA_VERSION = snapshot['data_version']
+MODEL_VERSION = snapshot['model_version']
 
 # --- 3. DEEP INTELLIGENCE ENGINE ---
-def get_comprehensive_intel(country, c_data, custom_roi):
-    intel = {
-        "Germany": (
-            "⚠️ Constitutional Crisis & The Subsidy Cliff",
-            "**2023-2024 Regime Shift:** In December 2023, the German Federal Constitutional Court struck down €60 billion in climate funding. This forced the immediate, premature cancellation of the *Umweltbonus* (up to €4,500 per EV). Consequently, H1 2024 saw a brutal 30%+ collapse in domestic EV sales. European OEMs (VW, Mercedes) have formally delayed their ICE phase-out targets as a result.",
-            f"**Strategic ROI ({custom_roi:.1f}):** The AI model severely penalizes Germany's Resilience score. The data proves the market was artificially propped up by state aid rather than structural utility. Despite a massive $55k GDP/Capita providing organic purchasing power, the extreme political volatility and high existing infrastructure density make this a high-risk capital deployment zone."
-        ),
-        "USA": (
-            "🛡️ IRA Deployment & Section 301 Trade Walls",
-            "**2023-2024 Regime Shift:** The US market underwent a structural isolation event. In May 2024, the Biden Administration enacted 100% Section 301 tariffs on Chinese EVs, effectively blocking BYD and NIO from undercutting domestic OEMs. Concurrently, the NEVI Formula Program transitioned from planning to breaking ground, injecting billions into domestic highway charging corridors.",
-            f"**Strategic ROI ({custom_roi:.1f}):** The USA is classified as a 'Safe Haven' with massive Protected Alpha. Growth is guaranteed by long-term Inflation Reduction Act (IRA) 30D tax credits locked through 2030, virtually eliminating European-style 'Subsidy Cliff' risks. High wealth and artificially protected margins yield top-tier infrastructure ROI."
-        ),
-        "Norway": (
-            "✅ The Saturation Trap & Fiscal Rollbacks",
-            "**2023-2024 Regime Shift:** Norway has completed the S-Curve (approaching 90% share). Recognizing peak adoption, the Norwegian government initiated a fiscal pullback in 2024. They implemented a new weight-based registration tax and applied a 25% VAT to luxury EVs (over 500k NOK) to recoup lost fossil-fuel road tax revenues. The hyper-growth era is officially over.",
-            f"**Strategic ROI ({custom_roi:.1f}):** While the AI predicts 100% survival probability (the market functions entirely without subsidies now), the ROI is mechanically suppressed. There is functionally zero 'Market Room' remaining. Deploying a new $100M fund here operates as a low-yield public utility play rather than a venture-growth investment."
-        ),
-        "China": (
-            "🏭 Post-Subsidy Hyper-Competition & Export Pivots",
-            "**2023-2024 Regime Shift:** China officially terminated its decade-long national NEV purchase subsidy at the end of 2022/2023. 2024 is defined by a brutal, margin-crushing domestic price war (e.g., BYD launching the Seagull under $10,000). Facing up to 38% anti-subsidy tariffs from the EU in 2024, Chinese OEMs are furiously pivoting export capacity to the Global South.",
-            f"**Strategic ROI ({custom_roi:.1f}):** China acts as a 'Maintenance Market'. The AI correctly identifies that Chinese EV adoption is structurally permanent (highly resilient). However, extreme over-saturation of existing charging infrastructure in Tier-1 and Tier-2 cities drastically dilutes the expected profit-margin per newly deployed charging plug."
-        ),
-        "Mexico": (
-            "📈 USMCA Nearshoring & Fleet Mandates",
-            "**2023-2024 Regime Shift:** Mexico is the primary beneficiary of geopolitical fracturing. To bypass US tariffs via USMCA 'Rules of Origin', Chinese OEMs (like BYD) spent 2024 aggressively scouting Mexican factory sites. Domestically, growth is surging not from consumer subsidies, but from heavy commercial fleet electrification (e.g., DHL, Walmart Mexico) fulfilling cross-border ESG mandates.",
-            f"**Strategic ROI ({custom_roi:.1f}):** Mexico is a highly-rated 'Dark Horse'. The ROI is exceptionally strong because growth is driven by **Industrial Necessity**, not fickle consumer politics. Combined with 98% untapped 'Market Room', this represents one of the highest-alpha deployment targets in the portfolio."
-        ),
-        "UK": (
-            "⚖️ The ZEV Mandate vs. Political Delays",
-            "**2023-2024 Regime Shift:** The UK experienced conflicting market signals. While the strict ZEV Mandate took effect in Jan 2024 (requiring OEMs to hit 22% zero-emission sales or face massive fines), the Prime Minister simultaneously pushed the 2030 ICE ban back to 2035. This created severe consumer confusion and stalled private charging investments.",
-            f"**Strategic ROI ({custom_roi:.1f}):** The AI model flags the UK with moderate resilience. The ZEV mandate forces OEM compliance, preventing a total collapse, but the political delay of the ICE ban reduces the immediate urgency for rapid, nationwide infrastructure expansion."
-        ),
-        "India": (
-            "🌱 Local Manufacturing Subsidy Overhauls",
-            "**2023-2024 Regime Shift:** The flagship FAME-II subsidy ended in March 2024 and was replaced by the leaner EMPS 2024 scheme. Crucially, in 2024, India slashed EV import taxes (from up to 100% down to 15%) for global automakers *only if* they commit to investing at least $500M in local manufacturing. This sparked a race to build localized supply chains.",
-            f"**Strategic ROI ({custom_roi:.1f}):** India possesses astronomical 'Market Room'. The AI views the transition from consumer-handouts to manufacturing-incentives as a positive long-term resilience indicator. However, low current GDP/Capita restricts immediate consumer purchasing power, capping the short-term infrastructure ROI."
-        )
-    }
-    
-    # Dynamic fallback for unlisted countries
-    if country not in intel:
-        s_shift = c_data.get('EV_Share_Pct', 0) - c_data.get('EV_Share_Pct_2023', 0)
-        p_shift = c_data.get('Policy_Score', 0) - c_data.get('Policy_Score_2023', 0)
-        
-        trend_word = "expanded" if s_shift >= 0 else "contracted"
-        pol_word = "strengthened" if p_shift >= 0 else "weakened"
-        
-        dyn_headline = f"🔍 Macro-Economic Maturation Phase"
-        dyn_context = f"**2023-2024 Market Dynamics:** {country} {trend_word} its EV market share by {abs(s_shift):.1f}% over the last 12 months. Concurrently, national policy support has {pol_word} (Shift: {p_shift:+.1f}). Our data pipelines indicate that adoption in {country} is closely following organic GDP S-Curve modeling, rather than being driven by sudden, disruptive geopolitical black-swan events."
-        dyn_roi = f"**Strategic ROI ({custom_roi:.1f}):** The AI generated this score by mathematically weighing {country}'s purchasing power (${c_data.get('GDP_per_capita', 0):,.0f}) against its remaining untapped 'Market Room' ({c_data.get('market_room', 0)*100:.1f}%). The model views this region as a stable, secondary deployment target."
-        return (dyn_headline, dyn_context, dyn_roi)
-        
-    return intel[country]
+get_comprehensive_intel = intel_repository.get_comprehensive_intel
 
 # --- 4. THE FINAL POP-UP REPORT ---
-@st.dialog("📋 OFFICIAL EXECUTIVE AUDIT REPORT", width="large")
-def show_final_report(country, w_safe, w_room, w_wealth):
+def build_audit(country, w_safe, w_room, w_wealth):
     c_data = df[df['country'] == country].iloc[0]
-    
-    custom_roi = ((c_data['Survival_Prob']**w_safe) * (c_data['market_room']**w_room) * (c_data['purchasing_power']**w_wealth)) / (1+c_data['infra_saturation']) * 100
-    headline, context, roi_justification = get_comprehensive_intel(country, c_data, custom_roi)
+    custom_roi = roi_engine.roi_score(c_data, w_safe, w_room, w_wealth)
+    drivers = explainability.country_drivers(explain_cache, country)
+    return {
+        'c_data': c_data,
+        'custom_roi': custom_roi,
+        'intel': get_comprehensive_intel(country, c_data, custom_roi),
+        'drivers': drivers,
+        'drivers_fig': explainability.drivers_figure(drivers) if drivers is not None else None,
+    }
+
+def render_final_report(country, w_safe, w_room, w_wealth):
+    audit = result_cache.SHARED.get_or_compute(
+        result_cache.make_key('s_app_audit', DATA_VERSION, MODEL_VERSION, (w_safe, w_room, w_wealth), country),
+        lambda: build_audit(country, w_safe, w_room, w_wealth)
+    )
+    c_data = audit['c_data']
+    custom_roi = audit['custom_roi']
+    headline, context, roi_justification = audit['intel']
     
     st.markdown(f"<h2 style='color: #0f766e; margin-bottom: 0;'>Strategic Target: {country}</h2>", unsafe_allow_html=True)
     
@@ -147,6 +176,48 @@ def show_final_report(country, w_safe, w_room, w_wealth):
     m1.metric("Current Market Share", f"{c_data['EV_Share_Pct']:.1f}%", f"{s_shift:+.1f}% vs 2023")
     m2.metric("Gov. Policy Support", f"{c_data['Policy_Score']:.1f} Score", f"{p_shift:+.1f} vs 2023")
     m3.metric("Purchasing Power", f"${c_data['GDP_per_capita']:,.0f}", "GDP/Capita")
+    census_note = charger_demand.census_note(c_data)
+    if census_note:
+        st.caption(census_note)
+    elif pd.notna(c_data.get('dc_kw_demand')):
+        st.caption(f"⚡ Public DC charging: ~{c_data['dc_kw_demand'] / 1000:,.0f} MW needed for the on-road BEV fleet vs. {c_data['dc_supply_kw'] / 1000:,.0f} MW installed (infra saturation {c_data['infra_saturation']:.0%}).")
+
+    # Model Attribution (precomputed TreeSHAP)
+    drivers = audit['drivers']
+    if drivers is not None:
+        st.markdown("### 3. What Drove the Survival Probability")
+        rf_prob = explain_cache['survival_prob'][country]
+        top = drivers.iloc[0]
+        st.caption(f"Regime-aware Random Forest (model {explain_cache['model_version']}): {rf_prob:.1%} survival vs. {explain_cache['base_value']:.1%} portfolio baseline. Strongest driver: **{top['label']}** ({top['contribution']*100:+.1f} pts).")
+        st.plotly_chart(audit['drivers_fig'], use_container_width=True)
+
+    # Charger Siting (KD-tree over existing stations; independent of the mandate weights)
+    dialog_sections.siting_section(country, "4. Where to Build: Charger Siting")
+
+    # Global Sensitivity (Sobol sweep over all three weights and every market's inputs, once per dataset)
+    st.markdown("### 5. How Robust Is the Ranking")
+    sens = snapshot['sens']
+    if pd.isna(custom_roi):
+        st.caption(f"{country} has no ROI (see the infra note above), so every sampled mandate ranks it after the scored markets and never funds it.")
+    else:
+        band = sens['rank_band'].loc[country]
+        rank_st = sens['rank']['ST'].loc[country]
+        lead = rank_st.idxmax()
+        funded = sens['funded_share'].loc[country]
+        st.caption(f"Across {sens['n_evaluations']:,} Sobol-sampled mandates (weights 0–2, inputs ±{sensitivity.FEATURE_SPREAD:.0%}), "
+                   f"{country} ranks #{band['p05']:.0f}–#{band['p95']:.0f} of {len(sens['countries'])} (90% band) and is funded in {funded:.0%} of them. "
+                   + (f"**{sensitivity.FACTOR_LABELS[lead]}** explains the most rank variance ({rank_st[lead]:.0%} total effect)."
+                      if rank_st[lead] > 0 else "Its rank does not move."))
+        st.plotly_chart(sensitivity.tornado_figure(sens, country), use_container_width=True)
+
+    # Historical Analogues (precomputed ball-tree neighbours over standardized Country x Year states)
+    st.markdown("### 6. Closest Historical Analogues")
+    analogues = peers.analogues(peer_index, country)
+    if analogues is None:
+        st.caption("No Country x Year history on record for this market.")
+    else:
+        st.dataframe(peers.display_table(analogues), hide_index=True, use_container_width=True)
+        st.caption(f"Other markets whose GDP, policy, infrastructure, share and sentiment looked most like {country} in {peer_index['latest'][country]}. " + peers.summarize(analogues))
 
     # Deep Intelligence Box
     st.markdown(f"""
@@ -159,33 +230,19 @@ def show_final_report(country, w_safe, w_room, w_wealth):
     </div>
     """, unsafe_allow_html=True)
 
+@st.dialog("📋 OFFICIAL EXECUTIVE AUDIT REPORT", width="large")
+def show_final_report(country, w_safe, w_room, w_wealth):
+    with profiling.stage('dialog_render'):
+        render_final_report(country, w_safe, w_room, w_wealth)
+
 # --- 5. SINGLE-PAGE LAYOUT ---
 st.markdown("<h2 style='color: #0f766e; margin-bottom: 5px;'>GlobalCharge Intelligence Engine</h2>", unsafe_allow_html=True)
+st.markdown(hot_reload.badge_html(live, snapshot), unsafe_allow_html=True)
 
 col_map, col_panel = st.columns([7.5, 2.5], gap="medium")
 
 with col_map:
-    # Use natural earth, but tell Plotly to show all landmasses so the whole map renders
-    fig = px.choropleth(
-        df, locations=df.get("iso_alpha", df["country"]), color="Base_ROI", 
-        hover_name="country", color_continuous_scale="Teal", 
-        projection="natural earth"
-    )
-    
-    # update_geos forces the entire globe to render, filling missing countries with light gray
-    fig.update_geos(
-        showland=True, landcolor="#f1f5f9", 
-        showocean=True, oceancolor="#ffffff",
-        showcoastlines=True, coastlinecolor="#cbd5e1",
-        showframe=False,
-        lataxis_range=[-55, 90] # Hides empty Antarctica to make the map look larger
-    )
-    
-    fig.update_layout(
-        margin={"r":0,"t":0,"l":0,"b":0}, height=550,
-        coloraxis_showscale=False, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
-    )
-    map_click = st.plotly_chart(fig, use_container_width=True, on_select="rerun")
+    map_click = st.plotly_chart(snapshot['map'], use_container_width=True, on_select="rerun")
 
 with col_panel:
     selected_country = None
@@ -232,3 +289,5 @@ with col_panel:
         st.dataframe(top_3.rename(columns={'country': 'Market', 'Base_ROI': 'Est. Score'}), hide_index=True, use_container_width=True)
         
         st.info("👆 **Select a market on the map** to configure parameters and run a deep-dive intelligence audit.")
+
+profiling.end_run()
@@ -0,0 +1,108 @@
+import csv
+import os
+
+import pandas as pd
+
+# --- 1. FILE SCHEMAS ---
+WAR_ROOM_FILES = ['war_room_data_v3.csv', 'war_room_data.csv', 'streamlit_data_v2.csv', 'streamlit_data.csv']
+
+# Column order and dtypes of war_room_data_v3.csv as written by iea_ingest.py
+WAR_ROOM_SCHEMA = {
+    'country': 'str', 'year': 'int64', 'EV_Share_Pct': 'float64', 'total_charging_stations': 'float64',
+    'GDP_per_capita': 'float64', 'Policy_Score': 'float64', 'log_gdp': 'float64', 'infra_score': 'float64',
+    'lagged_share': 'float64', 'Survival_Prob': 'float64', 'EV_Share_Pct_2023': 'float64',
+    'Policy_Score_2023': 'float64', 'market_room': 'float64', 'purchasing_power': 'float64',
+    'infra_saturation': 'float64', 'iso_alpha': 'str',
+}
+
+# --- 2. VIEW SCHEMAS (only the columns each screen reads) ---
+# files:   candidates in priority order; the first whose header satisfies the view wins
+# columns: source column -> dtype, applied at parse time
+# derived: columns a file may lack, with the declared way to fill them
+# rename:  source column -> name used by the view's code
+VIEWS = {
+    # s_app.py, api_server.py and the benchmarks
+    'war_room': {
+        'files': WAR_ROOM_FILES,
+        'columns': {
+            'country': 'str', 'iso_alpha': 'str', 'EV_Share_Pct': 'float64', 'EV_Share_Pct_2023': 'float64',
+            'GDP_per_capita': 'float64', 'Policy_Score': 'float64', 'Policy_Score_2023': 'float64',
+            'Survival_Prob': 'float64', 'market_room': 'float64', 'purchasing_power': 'float64',
+            'infra_saturation': 'float64',
+        },
+        'derived': {
+            # streamlit_data.csv predates the 2023 snapshot columns
+            'EV_Share_Pct_2023': lambda df: df['EV_Share_Pct'] - 2.5,
+            'Policy_Score_2023': lambda df: df['Policy_Score'],
+        },
+    },
+    # app.py: 9 of streamlit_data.csv's 40 columns
+    'streamlit': {
+        'files': ['streamlit_data.csv', 'streamlit_data_v2.csv'],
+        'columns': {
+            'country': 'str', 'iso_alpha': 'str', 'EV_Share_Pct': 'float64', 'GDP_per_capita': 'float64',
+            'Policy_Score': 'float64', 'Survival_Prob': 'float64', 'market_room': 'float64',
+            'purchasing_power': 'float64', 'infra_saturation': 'float64',
+        },
+    },
+    # sr_app.py: the 2025 audit export, renamed to the lower-case names the app reads
+    'audit': {
+        'files': ['war_room_audit_2025_FINAL.csv'],
+        'columns': {
+            'Country': 'str', 'ROI_Score': 'float64', 'New_Prob_Pct': 'float64', 'Opportunity_Gap': 'float64',
+            'Market_Room': 'float64', 'lagged_share': 'float64', 'GDP_per_capita': 'float64',
+        },
+        'rename': {
+            'Country': 'country', 'ROI_Score': 'roi_score', 'New_Prob_Pct': 'new_prob_pct',
+            'Opportunity_Gap': 'opportunity_gap', 'Market_Room': 'market_room', 'GDP_per_capita': 'gdp_per_capita',
+        },
+    },
+}
+
+# --- 3. LOADER ---
+class SchemaError(ValueError):
+    pass
+
+
+def read_header(path):
+    # First line only, via the csv module (a pandas nrows=0 read costs more than the projected parse)
+    with open(path, newline='', encoding='utf-8') as f:
+        return set(next(csv.reader(f), []))
+
+
+def missing_columns(view, header):
+    # Required (non-derivable) columns of the view absent from a file header
+    spec = VIEWS[view]
+    return [c for c in spec['columns'] if c not in header and c not in spec.get('derived', {})]
+
+
+def load_view(view, files=None):
+    # First file that satisfies the view, projected and typed at parse time. Returns None when no
+    # candidate exists; raises SchemaError with a per-file diff when candidates exist but none fit
+    spec = VIEWS[view]
+    diffs = {}
+    for path in files or spec['files']:
+        if not os.path.exists(path):
+            continue
+        header = read_header(path)
+        missing = missing_columns(view, header)
+        if missing:
+            diffs[path] = missing
+            continue
+        usecols = [c for c in spec['columns'] if c in header]
+        try:
+            df = pd.read_csv(path, usecols=usecols, dtype={c: spec['columns'][c] for c in usecols})
+        except (ValueError, TypeError) as exc:
+            raise SchemaError(f"{path}: column types do not match the '{view}' view ({exc})") from exc
+        if df.empty:
+            continue
+        for col, derive in spec.get('derived', {}).items():
+            if col not in df.columns:
+                df[col] = derive(df).astype(spec['columns'][col])
+        if list(df.columns) != list(spec['columns']):
+            df = df[list(spec['columns'])]
+        return df.rename(columns=spec['rename']) if 'rename' in spec else df
+    if diffs:
+        detail = '; '.join(f"{path} is missing {cols}" for path, cols in diffs.items())
+        raise SchemaError(f"No file satisfies the '{view}' view: {detail}")
+    return None
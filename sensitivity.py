@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from scipy.stats import qmc
+
+import roi_engine
+
+# --- 1. FACTORS ---
+WEIGHTS = ['w_safe', 'w_room', 'w_wealth']
+FEATURES = ['Survival_Prob', 'market_room', 'purchasing_power', 'infra_saturation']
+FACTORS = WEIGHTS + FEATURES
+FACTOR_LABELS = {
+    'w_safe': 'Resilience Weight', 'w_room': 'Market Room Weight', 'w_wealth': 'Wealth Weight',
+    'Survival_Prob': 'Survival Probability', 'market_room': 'Market Room',
+    'purchasing_power': 'Purchasing Power', 'infra_saturation': 'Infra Saturation',
+}
+WEIGHT_RANGE = (0.0, 2.0)     # Same range as the dashboard sliders
+FEATURE_SPREAD = 0.2          # Each market's input is uncertain within +/-20% of its value
+N_BASE = 2 ** 13              # Sobol base sample; the sweep evaluates N_BASE * (len(FACTORS) + 2) mandates
+
+# --- 2. QUASI-RANDOM DESIGN (Saltelli: A, B and one A/B mix per factor group) ---
+def _groups(n_markets):
+    # Weights are one column each; a feature group is that feature's column for every market
+    cols = {w: slice(i, i + 1) for i, w in enumerate(WEIGHTS)}
+    for k, f in enumerate(FEATURES):
+        start = len(WEIGHTS) + k * n_markets
+        cols[f] = slice(start, start + n_markets)
+    return cols
+
+
+def design(n_markets, n_base=N_BASE, seed=0):
+    # Scrambled Sobol points in [0, 1): rows A, B, then A with each group's columns taken from B
+    dims = len(WEIGHTS) + len(FEATURES) * n_markets
+    u = qmc.Sobol(d=2 * dims, scramble=True, seed=seed).random(n_base)
+    a, b = u[:, :dims], u[:, dims:]
+    blocks = [a, b]
+    for cols in _groups(n_markets).values():
+        mixed = a.copy()
+        mixed[:, cols] = b[:, cols]
+        blocks.append(mixed)
+    return np.vstack(blocks)
+
+# --- 3. ONE VECTORIZED SWEEP ---
+def sweep(df, u, budget=100, tier_1_ticket=15, tier_2_ticket=5, tier_1_cut=0.70, tier_2_cut=0.40):
+    # Every design row is a full mandate: ROI for all markets, leaderboard rank (1 = best) and the
+    # roi_engine.allocate ticket walk, all as (rows x markets) arrays
+    groups = _groups(len(df))
+    lo, hi = WEIGHT_RANGE
+    w = {name: lo + u[:, groups[name]] * (hi - lo) for name in WEIGHTS}
+    x = {f: df[f].to_numpy(float)[None, :] * (1 + FEATURE_SPREAD * (2 * u[:, groups[f]] - 1)) for f in FEATURES}
+    x['Survival_Prob'] = x['Survival_Prob'].clip(0, 1)
+    x['market_room'] = x['market_room'].clip(0, 1)
+
+    roi = roi_engine.roi_score(x, w['w_safe'], w['w_room'], w['w_wealth'])   # weights broadcast as (rows x 1)
+
+    order = np.argsort(-roi, axis=1, kind='stable')
+    rows = np.arange(len(u))[:, None]
+    rank = np.empty_like(order)
+    rank[rows, order] = np.arange(1, len(df) + 1)
+
+    # NaN ROI (no usable station census) sorts last and, as in roi_engine.allocate, is never funded
+    fundable = np.where(np.isnan(roi), 0.0, x['Survival_Prob'])
+    prob = np.take_along_axis(fundable, order, axis=1)
+    spent = np.zeros(len(u))
+    ticket = np.zeros_like(prob)
+    for j in range(len(df)):
+        t1 = (prob[:, j] > tier_1_cut) & (spent + tier_1_ticket <= budget)
+        t2 = ~t1 & (prob[:, j] > tier_2_cut) & (spent + tier_2_ticket <= budget)
+        ticket[:, j] = np.where(t1, tier_1_ticket, np.where(t2, tier_2_ticket, 0))
+        spent += ticket[:, j]
+    allocation = np.empty_like(ticket)
+    allocation[rows, order] = ticket
+    return rank.astype(float), allocation
+
+# --- 4. SOBOL INDICES ---
+def sobol_indices(y, n_base):
+    # Saltelli (2010) first-order and Jansen total-effect estimators, per market column
+    f_a, f_b = y[:n_base], y[n_base:2 * n_base]
+    var = np.var(np.vstack([f_a, f_b]), axis=0)
+    safe = np.where(var > 0, var, 1.0)
+    s1, st = [], []
+    for g in range(len(FACTORS)):
+        f_ab = y[(2 + g) * n_base:(3 + g) * n_base]
+        s1.append(np.where(var > 0, np.mean(f_b * (f_ab - f_a), axis=0) / safe, 0.0))
+        st.append(np.where(var > 0, 0.5 * np.mean((f_a - f_ab) ** 2, axis=0) / safe, 0.0))
+    return np.array(s1).T, np.array(st).T
+
+
+def analyze(df, n_base=N_BASE, seed=0, **allocation):
+    # Rank and allocation Sobol indices for every market, from a single sweep over the whole design
+    u = design(len(df), n_base, seed)
+    rank, alloc = sweep(df, u, **allocation)
+    countries = df['country'].tolist()
+    out = {'n_evaluations': len(u), 'countries': countries}
+    for name, y in (('rank', rank), ('allocation', alloc)):
+        s1, st = sobol_indices(y, n_base)
+        out[name] = {
+            'S1': pd.DataFrame(s1, index=countries, columns=FACTORS).clip(lower=0),
+            'ST': pd.DataFrame(st, index=countries, columns=FACTORS).clip(lower=0),
+        }
+    base = rank[:2 * n_base]
+    out['rank_band'] = pd.DataFrame({'p05': np.percentile(base, 5, axis=0), 'p95': np.percentile(base, 95, axis=0)},
+                                    index=countries)
+    out['funded_share'] = pd.Series((alloc[:2 * n_base] > 0).mean(axis=0), index=countries)
+    return out
+
+# --- 5. DIALOG FIGURE ---
+def tornado_figure(result, country):
+    # Total-effect indices: rank to the right, allocation to the left, widest bar on top
+    rank_st = result['rank']['ST'].loc[country]
+    alloc_st = result['allocation']['ST'].loc[country]
+    order = (rank_st + alloc_st).sort_values().index
+    labels = [FACTOR_LABELS[f] for f in order]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(y=labels, x=-alloc_st[order], orientation='h', name='Allocation', marker_color='#e11d48',
+                         customdata=alloc_st[order], hovertemplate="%{y}: %{customdata:.0%} of allocation variance<extra></extra>"))
+    fig.add_trace(go.Bar(y=labels, x=rank_st[order], orientation='h', name='Rank', marker_color='#0f766e',
+                         hovertemplate="%{y}: %{x:.0%} of rank variance<extra></extra>"))
+    span = max(float(rank_st.max()), float(alloc_st.max()), 0.05)
+    ticks = np.linspace(-span, span, 5)
+    fig.update_layout(barmode='relative', margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=280,
+                      paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', legend=dict(orientation='h', y=1.08),
+                      xaxis=dict(title='Total-effect Sobol index', tickvals=ticks, ticktext=[f"{abs(t):.0%}" for t in ticks],
+                                 zeroline=True, zerolinecolor='#94a3b8'))
+    return fig
@@ -0,0 +1,198 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from sklearn.neighbors import KDTree
+
+import charger_demand
+import feature_panel as fp
+
+# --- 1. SITING ASSUMPTIONS ---
+COVERAGE_KM = 10          # A site farther than this from any station is fully "uncovered"
+CANNIBAL_KM = 3           # Existing stations this close compete for the same drivers
+SETTLED_DENSITY = 150     # People per km² of settled land; sizes the synthetic market plane
+N_CITIES = 25
+POINTS_PER_STATION = 4    # The IEA census counts charging points; several share one site
+
+# --- 2. MARKET GEOMETRY (local km plane) ---
+def to_local_km(lat, lon, origin=None):
+    # Equirectangular projection around the points' centre; fine at country scale for nearest-neighbour work
+    lat, lon = np.asarray(lat, float), np.asarray(lon, float)
+    lat0, lon0 = origin if origin is not None else (lat.mean(), lon.mean())
+    x = (lon - lon0) * 111.32 * np.cos(np.radians(lat0))
+    y = (lat - lat0) * 110.57
+    return np.column_stack([x, y]), (lat0, lon0)
+
+
+def load_points(path, origin=None, frame=None):
+    # User-supplied stations/candidates: CSV with x_km,y_km or lat,lon columns. Returns (points, origin,
+    # frame); pass the first file's origin and frame to the next, since a km plane and lat/lon don't mix
+    pts = pd.read_csv(path)
+    cols = {c.lower(): c for c in pts.columns}
+    if 'x_km' in cols and 'y_km' in cols:
+        found = 'x_km/y_km'
+    elif 'lat' in cols and 'lon' in cols:
+        found = 'lat/lon'
+    else:
+        raise ValueError(f"{path}: expected x_km/y_km or lat/lon columns, found {list(pts.columns)}")
+    if frame is not None and found != frame:
+        raise ValueError(f"{path}: {found} coordinates, but the stations file uses {frame}")
+    if found == 'x_km/y_km':
+        return pts[[cols['x_km'], cols['y_km']]].to_numpy(float), origin, found
+    return (*to_local_km(pts[cols['lat']], pts[cols['lon']], origin), found)
+
+
+def synthetic_market(country, n_stations, population, seed=None):
+    # Seeded per country: cities with Zipf-sized populations on a square settled plane, and stations
+    # placed where people are (70% city clusters, 30% along the spread-out remainder)
+    rng = np.random.default_rng(zlib.crc32(country.encode()) if seed is None else seed)
+    extent = float(np.sqrt(max(population, 1e5) / SETTLED_DENSITY))
+    cities = rng.uniform(0, extent, (N_CITIES, 2))
+    weights = 1 / np.arange(1, N_CITIES + 1)
+    weights /= weights.sum()
+    spread = extent * (0.01 + 0.05 * np.sqrt(weights / weights.max()))
+
+    n_stations = int(max(n_stations, 0))
+    n_city = int(n_stations * 0.7)
+    home = rng.choice(N_CITIES, n_city, p=weights)
+    stations = np.vstack([
+        cities[home] + rng.normal(0, 1, (n_city, 2)) * spread[home, None],
+        rng.uniform(0, extent, (n_stations - n_city, 2)),
+    ]).clip(0, extent)
+    return {'country': country, 'extent_km': extent, 'cities': cities, 'city_weights': weights,
+            'city_spread_km': spread, 'stations': stations}
+
+
+def synthetic_candidates(market, n, grid=False, seed=0):
+    # Either a regular grid of ~n cells or n random points over the market plane
+    extent = market['extent_km']
+    if grid:
+        side = int(np.ceil(np.sqrt(n)))
+        axis = (np.arange(side) + 0.5) * extent / side
+        xx, yy = np.meshgrid(axis, axis)
+        return np.column_stack([xx.ravel(), yy.ravel()])
+    return np.random.default_rng(seed).uniform(0, extent, (n, 2))
+
+# --- 3. NEAREST-NEIGHBOUR SCORING ---
+def build_index(stations):
+    return KDTree(stations, leaf_size=40) if len(stations) else None
+
+
+def demand_density(market, points):
+    # Population kernel: sum over cities of weight * Gaussian(distance / city spread).
+    # Loops the 25 cities, vectorized over all points (no points x cities temporary)
+    out = np.zeros(len(points))
+    x, y = points[:, 0], points[:, 1]
+    for (cx, cy), w, s in zip(market['cities'], market['city_weights'], market['city_spread_km']):
+        out += w * np.exp((-0.5 / s ** 2) * ((x - cx) ** 2 + (y - cy) ** 2))
+    return out / out.max() if out.max() > 0 else out
+
+
+def score_sites(market, candidates, index=None, demand=None, coverage_km=COVERAGE_KM, cannibal_km=CANNIBAL_KM):
+    # Per candidate: distance to the nearest station, coverage gap (0 served .. 1 unserved),
+    # stations competing within cannibal_km, local demand, and the combined site score
+    index = index if index is not None else build_index(market['stations'])
+    if index is None:
+        nearest = np.full(len(candidates), np.inf)
+        rivals = np.zeros(len(candidates), dtype=int)
+    else:
+        nearest = index.query(candidates, k=1, return_distance=True)[0][:, 0]
+        rivals = np.zeros(len(candidates), dtype=int)
+        near = nearest <= cannibal_km   # Only these can have a rival in range
+        if near.any():
+            rivals[near] = index.query_radius(candidates[near], cannibal_km, count_only=True)
+    gap = np.clip(nearest / coverage_km, 0, 1)
+    demand = demand_density(market, candidates) if demand is None else np.asarray(demand, float)
+    return pd.DataFrame({
+        'x_km': candidates[:, 0], 'y_km': candidates[:, 1],
+        'nearest_km': nearest, 'coverage_gap': gap, 'rivals': rivals,
+        'demand': demand, 'site_score': demand * gap / (1 + rivals),
+    })
+
+
+def top_sites(scored, k=20, min_spacing_km=CANNIBAL_KM, pool=20_000):
+    # Greedy pick from the best `pool` candidates, skipping any within min_spacing_km of a pick
+    best = scored.nlargest(min(pool, len(scored)), 'site_score')
+    xy = best[['x_km', 'y_km']].to_numpy()
+    taken = np.zeros(len(best), dtype=bool)
+    blocked = np.zeros(len(best), dtype=bool)
+    tree = KDTree(xy)
+    for i in range(len(best)):
+        if blocked[i]:
+            continue
+        taken[i] = True
+        blocked[tree.query_radius(xy[i:i + 1], min_spacing_km)[0]] = True
+        if taken.sum() >= k:
+            break
+    return best[taken].reset_index(drop=True)
+
+# --- 4. COUNTRY SITING RUN (dialog entry point) ---
+def input_version(master_file=fp.MASTER_FILE, ev_workbook=charger_demand.iea_ingest.EV_WORKBOOK):
+    # Synthetic layouts depend only on the IEA charging-point census and the master dataset's population
+    return f"{fp.file_version(ev_workbook)}-{fp.file_version(master_file)}"
+
+
+def _market_inputs(country, master_file=fp.MASTER_FILE):
+    points = charger_demand.station_supply()
+    raw = pd.read_csv(master_file, usecols=['Country', 'Population'])
+    raw['Country'] = raw['Country'].replace(charger_demand.NAME_ALIASES)
+    population = raw.groupby('Country')['Population'].max()
+    return float(points.get(country, 0)) / POINTS_PER_STATION, float(population.get(country, 1e7))
+
+
+def site_country(country, n_candidates=200_000, k=20, stations_file=None, candidates_file=None):
+    # Synthetic market by default. Pass both CSVs (same lat/lon or x/y frame; candidates may carry a
+    # 'demand' column, else demand is flat) to site against real station and candidate data
+    demand = None
+    if bool(stations_file) != bool(candidates_file):
+        raise ValueError("site_country needs both stations_file and candidates_file (or neither, for a synthetic market)")
+    if stations_file and candidates_file:
+        stations, origin, frame = load_points(stations_file)
+        candidates, _, _ = load_points(candidates_file, origin, frame)
+        market = {'country': country, 'stations': stations}
+        demand = pd.read_csv(candidates_file).get('demand', pd.Series(1.0, index=range(len(candidates)))).to_numpy(float)
+    else:
+        n_stations, population = _market_inputs(country)
+        market = synthetic_market(country, n_stations, population)
+        candidates = synthetic_candidates(market, n_candidates, grid=True)
+
+    scored = score_sites(market, candidates, demand=demand)
+    picks = top_sites(scored, k=k)
+    return {
+        'country': country,
+        'stations': len(market['stations']),
+        'candidates': len(candidates),
+        'uncovered_share': float((scored['coverage_gap'] >= 1).mean()),
+        'median_nearest_km': float(np.median(scored['nearest_km'])) if len(market['stations']) else None,
+        'sites': picks,
+        'market': market,
+        'synthetic': stations_file is None,
+    }
+
+
+def siting_figure(result, max_stations=4000):
+    market = result['market']
+    stations = market['stations']
+    if len(stations) > max_stations:
+        stations = stations[np.random.default_rng(0).choice(len(stations), max_stations, replace=False)]
+    sites = result['sites']
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=stations[:, 0], y=stations[:, 1], mode='markers', name='Existing stations',
+                               marker=dict(size=3, color='#94a3b8', opacity=0.5)))
+    fig.add_trace(go.Scatter(x=sites['x_km'], y=sites['y_km'], mode='markers+text', name='Recommended sites',
+                             text=[str(i + 1) for i in range(len(sites))], textposition='top center',
+                             marker=dict(size=11, color='#0f766e', symbol='star'),
+                             customdata=sites[['nearest_km', 'rivals']].to_numpy(),
+                             hovertemplate="Site %{text}<br>%{customdata[0]:.1f} km to nearest station<br>%{customdata[1]} rivals nearby<extra></extra>"))
+    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=360, paper_bgcolor='rgba(0,0,0,0)',
+                      plot_bgcolor='#f8fafc', legend=dict(orientation='h', y=1.02),
+                      xaxis=dict(title='km', showgrid=False), yaxis=dict(title='km', showgrid=False, scaleanchor='x'))
+    return fig
+
+
+def siting_caption(result):
+    layout = (f"Synthetic settlement layout sized from the IEA charging-point census (~{POINTS_PER_STATION} points per station) and population." if result['synthetic']
+              else "Station and candidate locations from the supplied files.")
+    return (f"Top {len(result['sites'])} of {result['candidates']:,} grid sites ranked by local demand x coverage gap, "
+            f"discounted for rival stations within {CANNIBAL_KM} km. {layout}")
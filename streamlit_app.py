@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import os
 
+import roi_engine
+
 # --- 1. CONFIG & HIGH-CONTRAST THEME ---
 st.set_page_config(page_title="GlobalCharge Intelligence War Room", layout="wide", page_icon="⚡")
 
@@ -116,7 +118,7 @@ w_room = st.sidebar.slider("📈 Opportunity Weight", 0.0, 2.0, 1.0)
 w_wealth = st.sidebar.slider("💰 Wealth Weight", 0.0, 2.0, 1.0)
 
 # ROI MATH
-df['ROI_Score'] = ((df['Survival_Prob']**w_safety) * (df['market_room']**w_room) * (df['purchasing_power']**w_wealth)) / (1+df['infra_saturation']) * 100
+df['ROI_Score'] = roi_engine.roi_score(df, w_safety, w_room, w_wealth)
 
 st.markdown("<h1 style='text-align: center;'>⚡ GlobalCharge Strategic Investment War Room</h1>", unsafe_allow_html=True)
 
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+import api_server
+import intel_repository
+import result_cache
+import roi_engine
+
+
+@pytest.fixture(scope='module')
+def service():
+    return api_server.ScoringService(cache=result_cache.ResultCache(ttl=60))
+
+
+def _exchange(service, *requests):
+    # Sends raw requests over one connection to an in-process server; returns the raw response bytes
+    async def run():
+        server = await asyncio.start_server(lambda r, w: api_server._serve_connection(service, r, w), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for request in requests:
+            writer.write(request)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return data
+
+    return asyncio.run(run())
+
+
+def test_score_is_200_and_sorted(service):
+    status, body, etag = service.handle('/score?w_safe=1.5')
+    markets = json.loads(body)['markets']
+    assert status == 200 and etag
+    scores = [m['ROI_Score'] for m in markets if m['ROI_Score'] is not None]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_etag_follows_the_body(service):
+    assert service.handle('/score')[2] == service.handle('/score')[2]
+    assert service.handle('/score')[2] != service.handle('/score?w_room=2')[2]
+
+
+def test_unknown_market_and_route_are_404(service):
+    status, body, _ = service.handle('/country/atlantis')
+    assert status == 404 and json.loads(body)['market'] == 'atlantis'
+    assert service.handle('/nowhere')[0] == 404
+
+
+def test_bad_parameter_is_400(service):
+    status, body, etag = service.handle('/score?w_safe=abc')
+    assert status == 400 and etag is None
+    assert 'w_safe' in json.loads(body)['error']
+
+
+def test_key_error_inside_a_route_is_500_not_404(service, monkeypatch):
+    # Only an unknown market key is a 404; a bug that raises KeyError is a server error and is not cached
+    def broken(params):
+        raise KeyError('ROI_Score')
+
+    monkeypatch.setattr(service, 'allocate', broken)
+    status, body, etag = service.handle('/allocate?budget=7')
+    assert (status, etag) == (500, None) and json.loads(body)['error'] == 'internal error'
+    monkeypatch.undo()
+    assert service.handle('/allocate?budget=7')[0] == 200
+
+
+def test_intel_uses_the_war_room_repository(service):
+    row = service.df[service.df['country'] == 'Germany'].iloc[0]
+    expected = intel_repository.get_comprehensive_intel('Germany', row, roi_engine.roi_score(row))
+    body = json.loads(service.handle('/intel/germany')[1])
+    assert (body['headline'], body['context'], body['verdict']) == expected
+
+
+def test_http_etag_revalidation_returns_304(service):
+    _, _, etag = service.handle('/country/DEU')
+    first, second = _exchange(
+        service,
+        b'GET /country/DEU HTTP/1.1\r\nHost: x\r\n\r\n',
+        b'GET /country/DEU HTTP/1.1\r\nHost: x\r\nIf-None-Match: ' + etag.encode() + b'\r\nConnection: close\r\n\r\n',
+    ).split(b'HTTP/1.1 ')[1:]
+    assert first.startswith(b'200 OK') and b'ETag: ' + etag.encode() in first
+    assert second.startswith(b'304 Not Modified') and second.endswith(b'\r\n\r\n')
+
+
+def test_http_bad_content_length_is_400(service):
+    response = _exchange(service, b'GET /health HTTP/1.1\r\nContent-Length: lots\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 400 Bad Request') and b'invalid content-length' in response
+
+
+def test_http_oversized_head_is_400(service):
+    response = _exchange(service, b'GET /health HTTP/1.1\r\nX-Pad: ' + b'a' * 100000 + b'\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 400 Bad Request') and b'too large' in response
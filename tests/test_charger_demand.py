@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import charger_demand as cd
+import roi_engine
+
+
+def test_station_supply_reads_the_iea_charging_points():
+    supply = cd.station_supply()
+    assert supply['USA'] == pytest.approx(193_000, rel=0.05)
+    assert supply['China'] == pytest.approx(3_500_000, rel=0.05)
+    assert supply['South Korea'] == pytest.approx(417_000, rel=0.05)
+    assert supply['Turkey'] == pytest.approx(11_900, rel=0.05)
+    assert (supply > 0).all()
+
+
+def test_station_supply_is_empty_without_the_workbook(tmp_path):
+    assert cd.station_supply(str(tmp_path / 'missing.xlsx')).empty
+
+
+def test_supply_gap_flags_missing_and_implausible_censuses():
+    demand = pd.DataFrame({'bev_stock': [100_000.0, 100_000.0, 100_000.0], 'dc_kw_demand': [3000.0, 3000.0, 3000.0]},
+                          index=['Balanced', 'Stub', 'Absent'])
+    supply = pd.Series({'Balanced': 150.0, 'Stub': 5.0}, name='charging_points')
+    gap = cd.supply_gap(demand, supply)
+    assert list(gap['census']) == ['ok', 'implausible', 'missing']
+    assert gap.loc['Balanced', 'infra_saturation'] == pytest.approx(150 * cd.POINT_KW / (150 * cd.POINT_KW + 3000))
+    assert gap.loc['Balanced', 'gap_kw'] == pytest.approx(3000 - 150 * cd.POINT_KW)
+    assert gap.loc[['Stub', 'Absent'], 'infra_saturation'].isna().all()
+
+
+def test_apply_gap_keeps_and_flags_unmodelled_markets():
+    gap = pd.DataFrame({'census': ['ok', 'implausible'], 'infra_saturation': [0.4, np.nan],
+                        'dc_kw_demand': [3000.0, 3000.0], 'supply_kw': [2000.0, 100.0]}, index=['A', 'B'])
+    df = pd.DataFrame({'country': ['A', 'B', 'C'], 'infra_saturation': [0.9, 0.3, 0.2]})
+    out = cd.apply_gap(df, gap)
+    assert list(out['infra_saturation']) == [0.4, 0.3, 0.2]
+    assert list(out['infra_census']) == ['ok', 'implausible', 'no demand model']
+    assert cd.census_note(out.iloc[0]) is None
+    assert '5 public charging points' in cd.census_note(out.iloc[1])
+    assert 'outside the BEV demand model' in cd.census_note(out.iloc[2])
+
+
+def test_big_markets_stay_scored_and_usa_leads():
+    df = roi_engine.load_war_room_data()
+    df['ROI_Score'] = roi_engine.roi_score(df)
+    scored = df.set_index('country')
+    assert scored.loc[['USA', 'China', 'South Korea', 'Turkey'], 'ROI_Score'].notna().all()
+    assert scored['ROI_Score'].idxmax() == 'USA'
+
+
+def test_segment_demand_sums_to_market_demand():
+    model = cd.get_demand_model()
+    per_cell = cd.segment_demand(model).groupby(level='country')['dc_kw_demand'].sum()
+    total = cd.market_demand(model)['dc_kw_demand']
+    np.testing.assert_allclose(per_cell.reindex(total.index), total, rtol=1e-9)
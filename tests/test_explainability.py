@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import explainability
+import feature_panel as fp
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    X[:, 3] = 1.0                       # Constant: no tree can split on it
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] > 0).astype(int)
+    return X, RandomForestClassifier(n_estimators=8, max_depth=5, random_state=0).fit(X, y)
+
+
+def test_attributions_sum_to_predicted_probability(data):
+    X, model = data
+    base, phi = explainability.forest_attributions(model, X[:50])
+    np.testing.assert_allclose(base + phi.sum(axis=1), model.predict_proba(X[:50])[:, 1], atol=1e-6)
+
+
+def test_feature_no_tree_splits_on_gets_zero(data):
+    X, model = data
+    _, phi = explainability.forest_attributions(model, X[:50])
+    np.testing.assert_allclose(phi[:, 3], 0.0, atol=1e-12)
+    assert np.abs(phi[:, 0]).mean() > np.abs(phi[:, 3]).mean()
+
+
+def test_single_stump_matches_hand_computed_shapley():
+    # One split on feature 0: the whole gap between leaf and root mean goes to that feature
+    X = np.array([[0.0, 5.0], [0.0, 6.0], [1.0, 5.0], [1.0, 7.0]])
+    y = np.array([0, 0, 1, 1])
+    model = RandomForestClassifier(n_estimators=1, max_depth=1, bootstrap=False, random_state=0).fit(X, y)
+    base, phi = explainability.forest_attributions(model, X)
+    assert base == pytest.approx(0.5)
+    np.testing.assert_allclose(phi, [[-0.5, 0], [-0.5, 0], [0.5, 0], [0.5, 0]])
+
+
+def test_cache_is_empty_without_the_gmm(tmp_path):
+    assert explainability.get_attributions(gmm_file=str(tmp_path / 'missing.pkl')) is None
+
+
+def test_real_model_attributions_are_additive():
+    cache = explainability.get_attributions()
+    model = fp.load_model(fp.RF_MODEL_FILE)
+    total = cache['base_value'] + cache['attributions'].sum(axis=1)
+    np.testing.assert_allclose(total, model.predict_proba(cache['features'])[:, 1], atol=1e-6)
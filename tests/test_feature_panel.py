@@ -0,0 +1,28 @@
+import pytest
+
+import feature_panel as fp
+
+
+def test_panel_excludes_aggregates_and_carries_rf_features():
+    panel = fp.build_panel()
+    assert not panel['Country'].isin(fp.AGGREGATES).any()
+    assert set(fp.RF_FEATURES) <= set(panel.columns)
+    assert panel['regime_prob'].between(0, 1).all()
+
+
+def test_missing_gmm_is_a_clear_error(tmp_path):
+    with pytest.raises(FileNotFoundError, match='regime_prob'):
+        fp.build_panel(gmm_file=str(tmp_path / 'missing.pkl'))
+
+
+def test_panel_without_regime_is_explicit():
+    assert 'regime_prob' not in fp.build_panel(gmm_file=None).columns
+
+
+def test_file_version_tracks_content(tmp_path):
+    path = tmp_path / 'a.csv'
+    path.write_text('1')
+    first = fp.file_version(str(path))
+    path.write_text('22')
+    assert fp.file_version(str(path)) != first
+    assert fp.file_version(str(tmp_path / 'absent.csv')) is None
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+import hot_reload
+import profiling
+
+
+@pytest.fixture
+def source(tmp_path):
+    # A watched file, the texts every build saw, and a LiveData whose build fails on a 'bad' push
+    path = tmp_path / 'data.csv'
+    path.write_text('v1')
+    calls = []
+
+    def build():
+        text = path.read_text()
+        calls.append(text)
+        if text.startswith('bad'):
+            raise ValueError('bad push')
+        return {'text': text}
+
+    return path, calls, hot_reload.LiveData('test', [str(path)], build, poll=60)
+
+
+def test_swap_keeps_old_snapshot_for_runs_holding_it(source):
+    path, calls, live = source
+    old = live.current()
+    assert live.refresh() is False      # Unchanged files: no rebuild
+    path.write_text('v2-longer')
+    assert live.refresh() is True
+    assert old['text'] == 'v1' and live.current()['text'] == 'v2-longer'
+    assert live.swaps == 2 and calls == ['v1', 'v2-longer']
+
+
+def test_failed_versions_are_not_retried(source):
+    path, calls, live = source
+    live.current()
+    path.write_text('bad push')
+    with pytest.raises(ValueError):
+        live.refresh()
+    assert live.refresh() is False      # Same failed versions: skipped
+    assert live.current()['text'] == 'v1'
+    assert live.last_error == 'ValueError: bad push'
+    path.write_text('fixed again')
+    assert live.refresh() is True
+    assert live.last_error is None and calls == ['v1', 'bad push', 'fixed again']
+
+
+def test_cold_start_failure_is_raised_once_per_version(source):
+    path, calls, live = source
+    path.write_text('bad')
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            live.current()
+    assert calls == ['bad']
+
+
+def test_idle_watcher_records_no_profiling_runs(source):
+    path, calls, live = source
+    live.current()
+    live.poll = 0.01
+    profiling.clear()
+    live.start()
+    try:
+        time.sleep(0.2)
+        assert not [r for r in profiling.records() if r['app'] == 'test_reload']
+        path.write_text('v2-longer')
+        time.sleep(0.2)
+    finally:
+        live.stop()
+    assert live.current()['text'] == 'v2-longer'
+    assert calls == ['v1', 'v2-longer']
+
+
+def test_badge_reports_the_live_version_and_last_error(source):
+    path, calls, live = source
+    snapshot = live.current()
+    path.write_text('bad push')
+    with pytest.raises(ValueError):
+        live.refresh()
+    badge = hot_reload.badge_html(live, dict(snapshot, data_version='abc123'))
+    assert 'Data abc123' in badge and '⚠️' in badge and 'bad push' in badge
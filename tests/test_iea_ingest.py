@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import feature_panel as fp
+import iea_ingest
+
+
+@pytest.fixture
+def master(tmp_path):
+    # GDP source for build_war_room: two countries, a region, and a market with no ISO code
+    path = tmp_path / 'master.csv'
+    pd.DataFrame({'Country': ['Germany', 'France', 'World', 'Atlantis'], 'Year': 2024,
+                  'GDP_per_capita': [54000.0, 46000.0, 13000.0, 30000.0]}).to_csv(path, index=False)
+    return str(path)
+
+
+def _series(values, name):
+    return pd.Series(values, name=name)
+
+
+def test_build_war_room_drops_aggregates_and_keeps_unmapped_iso_as_nan(master):
+    share = _series({(c, y): v for c, v in [('Germany', 20.0), ('France', 25.0), ('World', 22.0), ('Atlantis', 5.0)]
+                     for y in (2023, 2024)}, 'EV_Share_Pct')
+    chargers = _series({('Germany', 2024): 150_000.0, ('France', 2023): 100_000.0, ('World', 2024): 5e6}, 'total_charging_stations')
+    policies = pd.DataFrame({'country': ['Germany', 'Germany', 'France'], 'year': [2020, 2024, None]})
+    df = iea_ingest.build_war_room(share, chargers, policies, master_file=master)
+
+    assert list(df['country']) == ['Atlantis', 'France', 'Germany']
+    assert not df['country'].isin(fp.AGGREGATES).any()
+    iso = df.set_index('country')['iso_alpha']
+    assert pd.isna(iso['Atlantis']) and (iso['France'], iso['Germany']) == ('FRA', 'DEU')
+    row = df.set_index('country').loc['France']
+    assert row['total_charging_stations'] == 100_000   # Carried forward from 2023
+    assert row['Policy_Score'] == 5.0                   # One undated measure vs Germany's two
+
+
+def test_policy_scores_count_measures_in_force():
+    policies = pd.DataFrame({'country': ['A', 'A', 'B', 'B'], 'year': [2020, 2024, None, 2025]})
+    now, prior = iea_ingest.policy_scores(policies, 2024)
+    assert now.to_dict() == {'A': 10.0, 'B': 5.0}
+    assert prior.to_dict() == {'A': 5.0, 'B': 5.0}
+
+
+def test_change_report_lists_new_dropped_and_unmapped():
+    df = pd.DataFrame({'country': ['France', 'Atlantis'], 'iso_alpha': ['FRA', np.nan]})
+    previous = pd.DataFrame({'country': ['France', 'World']})
+    lines = iea_ingest.change_report(df, previous)
+    assert lines[0].startswith('+1 new') and 'Atlantis' in lines[0]
+    assert lines[1] == '-1 dropped: World'
+    assert 'Atlantis' in lines[2] and 'map' in lines[2]
+
+
+def test_carry_forward_keeps_model_output():
+    df = pd.DataFrame({'country': ['A', 'B'], 'Survival_Prob': [0.5, 0.5]})
+    previous = pd.DataFrame({'country': ['A'], 'Survival_Prob': [0.9]})
+    assert iea_ingest.carry_forward(df, previous)['Survival_Prob'].tolist() == [0.9, 0.5]
+
+
+def test_real_workbook_ingest_has_no_regions(tmp_path, monkeypatch):
+    monkeypatch.setattr(iea_ingest, 'CACHE_DIR', str(tmp_path))
+    df, hit = iea_ingest.ingest()
+    assert not hit and len(df) == 48
+    assert not df['country'].isin(fp.AGGREGATES).any()
+    assert df['iso_alpha'].notna().all()
+    assert {'USA', 'South Korea', 'Turkey', 'UK'} <= set(df['country'])
+    assert iea_ingest.ingest()[1]                       # Second call is a cache hit
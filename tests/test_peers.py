@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import peers
+
+
+def _panel(countries, years=range(2018, 2024), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [(c, y) for c in countries for y in years]
+    panel = pd.DataFrame(rows, columns=['Country', 'Year'])
+    for f in peers.PEER_FEATURES:
+        panel[f] = rng.normal(size=len(panel))
+    panel['EV_Share_Pct'] = rng.uniform(0, 30, len(panel))
+    return panel
+
+
+@pytest.fixture(scope='module')
+def index():
+    return peers.build_index(_panel(['Germany', 'France', 'Norway', 'Spain', 'Italy']), k_max=4)
+
+
+def test_neighbours_match_brute_force(index):
+    panel = _panel(['Germany', 'France', 'Norway', 'Spain', 'Italy'])
+    X = panel[peers.PEER_FEATURES].to_numpy()
+    Z = (X - X.mean(axis=0)) / X.std(axis=0)
+    me = panel.index[(panel['Country'] == 'Germany') & (panel['Year'] == 2020)][0]
+    pool = panel.index[(panel['Country'] != 'Germany') & (panel['Year'] < 2023)]
+    dist = np.linalg.norm(Z[pool] - Z[me], axis=1)
+    expected = [(panel.loc[pool[j], 'Country'], panel.loc[pool[j], 'Year']) for j in np.argsort(dist)[:4]]
+    found = peers.neighbours(index, 'Germany', 2020, k=4)
+    assert [(c, y) for c, y, *_ in found] == expected
+    assert [p[5] for p in found] == pytest.approx(np.sort(dist)[:4])
+
+
+def test_peers_always_have_a_next_year(index):
+    for country in index['latest']:
+        for peer in peers.neighbours(index, country, k=4):
+            assert peer[1] < 2023 and peer[3] == pytest.approx(peer[2] + peer[4])
+
+
+def test_alias_spellings_are_one_market():
+    # The master carries both spellings; a market must never be its own analogue
+    panel = pd.concat([_panel(['Turkey', 'Germany', 'France', 'Spain']), _panel(['Turkiye'], seed=1)], ignore_index=True)
+    index = peers.build_index(panel, k_max=5)
+    assert 'Turkiye' not in index['latest']
+    found = peers.neighbours(index, 'Turkiye', k=5)
+    assert found == peers.neighbours(index, 'Turkey', k=5)
+    assert len(found) == 5 and {c for c, *_ in found}.isdisjoint({'Turkey', 'Turkiye'})
+
+
+def test_unknown_market_has_no_analogues(index):
+    assert peers.neighbours(index, 'Atlantis') == [] and peers.analogues(index, 'Atlantis') is None
+    assert peers.neighbours(None, 'Germany') == []
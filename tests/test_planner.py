@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import planner
+
+
+def _inputs(rows):
+    # rows: (year, country, ROI_Score, Survival_Prob)
+    df = pd.DataFrame(rows, columns=['year', 'country', 'ROI_Score', 'Survival_Prob'])
+    return df.assign(EV_Share_Pct=10.0, regime_prob=np.nan)
+
+
+def _brute_force(inputs, budget, cap, tickets, cuts, discount):
+    # Every (market, year) -> ticket tier assignment, scored the way plan() scores it
+    years = sorted(inputs['year'].unique())
+    rows = list(inputs.itertuples(index=False))
+    best = 0.0
+    for tiers in itertools.product((0, 1, 2), repeat=len(rows)):
+        spent, payoff, per_year = 0, 0.0, dict.fromkeys(years, 0)
+        for row, tier in zip(rows, tiers):
+            if not tier or row.Survival_Prob <= cuts[tier - 1]:
+                continue
+            units = tickets[tier - 1]
+            spent += units
+            per_year[row.year] += units
+            payoff += units * row.ROI_Score / (1 + discount) ** years.index(row.year)
+        if spent <= budget and max(per_year.values()) <= cap:
+            best = max(best, payoff)
+    return best
+
+
+def test_plan_matches_brute_force_and_respects_caps():
+    inputs = _inputs([
+        (2025, 'A', 30.0, 0.9), (2025, 'B', 20.0, 0.5), (2025, 'C', 5.0, 0.3),
+        (2026, 'A', 35.0, 0.9), (2026, 'B', 40.0, 0.8), (2026, 'C', 25.0, 0.75),
+    ])
+    result = planner.plan(inputs, budget=40, annual_cap=25, tier_1_ticket=15, tier_2_ticket=5)
+    assert result['deployed_musd'].sum() + result['unspent_musd'] == 40
+    assert (result['deployed_musd'] <= 25).all()
+    assert result['plan'].query("year == 2025 and country == 'C'").empty     # Below the tier-2 survival cut
+    assert result['payoff'] == pytest.approx(_brute_force(inputs, 40, 25, (15, 5), (0.70, 0.40), planner.PLAN_DISCOUNT))
+
+
+def test_growing_market_is_funded_in_a_later_year():
+    # One Tier 1 ticket to place: B's forecast ROI doubles by 2027, well past two years of discount
+    inputs = _inputs([(2025, 'A', 20.0, 0.9), (2025, 'B', 15.0, 0.9),
+                      (2026, 'A', 20.0, 0.9), (2026, 'B', 22.0, 0.9),
+                      (2027, 'A', 20.0, 0.9), (2027, 'B', 30.0, 0.9)])
+    result = planner.plan(inputs, budget=15, annual_cap=15, tier_2_cut=1.0)
+    assert result['plan'][['year', 'country']].values.tolist() == [[2027, 'B']]
+    assert result['deployed_musd'].to_dict() == {2025: 0, 2026: 0, 2027: 15.0}
+
+
+def test_growth_below_the_discount_is_funded_now():
+    inputs = _inputs([(2025, 'A', 20.0, 0.9), (2026, 'A', 21.0, 0.9)])
+    result = planner.plan(inputs, budget=15, annual_cap=15, tier_2_cut=1.0)
+    assert result['plan'][['year', 'country']].values.tolist() == [[2025, 'A']]
+
+
+def test_plan_skips_markets_below_the_survival_cut():
+    inputs = _inputs([(2025, 'A', 90.0, 0.39), (2025, 'B', 1.0, 0.45)])
+    result = planner.plan(inputs, budget=20, annual_cap=20)
+    assert list(result['plan']['country']) == ['B']
+    assert list(result['plan']['tier']) == ['Tier 2']
+
+
+def test_plan_inputs_drop_aggregates_and_unscored_markets():
+    df = pd.DataFrame({
+        'country': ['Norway', 'World', 'Rest of World', 'China'],
+        'Survival_Prob': [0.9, 0.9, 0.9, 0.9], 'EV_Share_Pct': [80.0, 15.0, 10.0, 30.0],
+        'GDP_per_capita': [90000.0, 12000.0, 8000.0, 13000.0], 'infra_saturation': [0.5, 0.2, 0.1, np.nan],
+    })
+    inputs = planner.plan_inputs(df, None, years=(2025, 2026))
+    assert set(inputs['country']) == {'Norway'}
+    assert list(inputs['year']) == [2025, 2026]
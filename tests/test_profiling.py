@@ -0,0 +1,49 @@
+import threading
+import tracemalloc
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def clean_buffer():
+    profiling.clear()
+    yield
+    profiling.end_run()
+
+
+def _stages(app):
+    return [r['stage'] for r in profiling.records() if r['app'] == app]
+
+
+def test_stages_and_total_are_recorded_per_run():
+    profiling.start_run('t_app')
+    with profiling.stage('load'):
+        pass
+    profiling.end_run()
+    assert _stages('t_app') == ['load', 'rerun_total']
+    assert profiling.summary().set_index('stage').loc['load', 'calls'] == 1
+
+
+def test_mem_stage_reads_its_own_allocation():
+    profiling.start_run('t_mem', 'mem')
+    with profiling.stage('alloc'):
+        block = bytearray(4 << 20)
+    profiling.end_run()
+    del block
+    mem = [r['mem_kb'] for r in profiling.records() if r['stage'] == 'alloc'][0]
+    assert mem >= 4000
+    assert not tracemalloc.is_tracing()
+
+
+def test_run_abandoned_on_an_exited_thread_releases_tracing():
+    # A rerun that ends in st.stop() never calls end_run, and the next rerun runs on another thread
+    abandoned = threading.Thread(target=profiling.start_run, args=('t_stop', 'mem'))
+    abandoned.start()
+    abandoned.join()
+    assert tracemalloc.is_tracing()
+    profiling.start_run('t_next')
+    assert not tracemalloc.is_tracing()
+    profiling.end_run()
+    assert 'rerun_total' not in _stages('t_stop')
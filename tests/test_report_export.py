@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+import report_export
+import result_cache
+
+
+@pytest.fixture
+def figure_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_export, '_figure_cache', result_cache.ResultCache(max_entries=8, ttl=60, disk_dir=str(tmp_path / 'figs')))
+
+
+def test_index_marks_unscored_markets(tmp_path):
+    rows = [('Germany', 'balanced', 12.34, 'Germany__balanced.html'), ('Iceland', 'balanced', float('nan'), 'Iceland__balanced.html')]
+    report_export.write_index(str(tmp_path), rows, {'balanced': (1, 1, 1), 'growth': (1, 1, 1)}, {'data_version': 'abc', 'model_version': None})
+    page = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert '>12.3</a>' in page and '>unscored</a>' in page and 'nan' not in page
+    assert page.count('<td>–</td>') == 2   # No 'growth' page for either market
+
+
+def test_pack_with_no_known_markets_is_empty(tmp_path, figure_cache):
+    rows = report_export.build_pack('sr_app', countries=['Atlantis'], out_dir=str(tmp_path), workers=4)
+    assert rows == [] and (tmp_path / 'index.html').exists()
+
+
+def test_pack_writes_one_page_per_mandate(tmp_path, figure_cache):
+    scenarios = {'balanced': (1.0, 1.0, 1.0), 'growth': (0.8, 1.6, 1.0)}
+    rows = report_export.build_pack('sr_app', scenarios, countries=['Germany'], out_dir=str(tmp_path), workers=1)
+    assert [r[1] for r in rows] == list(scenarios)
+    for _, _, _, name in rows:
+        assert 'Strategic Target: Germany' in (tmp_path / name).read_text(encoding='utf-8')
+
+
+def test_figure_cache_stays_out_of_the_working_tree():
+    if not os.environ.get('GLOBALCHARGE_EXPORT_CACHE'):
+        assert not os.path.abspath(report_export.FIGURE_CACHE_DIR).startswith(os.getcwd())
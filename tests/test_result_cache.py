@@ -0,0 +1,53 @@
+import threading
+import time
+
+import result_cache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = result_cache.ResultCache(max_entries=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1          # 'b' is now the oldest
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = result_cache.ResultCache(ttl=0.05)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.1)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    result_cache.ResultCache(ttl=60, disk_dir=str(tmp_path)).put(('k', 1), {'x': 1})
+    cache = result_cache.ResultCache(ttl=60, disk_dir=str(tmp_path))
+    assert cache.get(('k', 1)) == {'x': 1}
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = result_cache.ResultCache(ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'v'
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=('k', compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert cache.get('k') == 'v'
+
+
+def test_make_key_rounds_weights():
+    assert result_cache.make_key('roi', 'd', 'm', (1.00004, 0.5)) == result_cache.make_key('roi', 'd', 'm', (1.0, 0.5))
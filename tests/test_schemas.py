@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import schemas
+
+STREAMLIT_COLUMNS = list(schemas.VIEWS['streamlit']['columns'])
+
+
+def _write(path, columns):
+    pd.DataFrame([{c: ('X' if c in ('country', 'iso_alpha') else 1.0) for c in columns}]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_missing_column_fails_fast(tmp_path):
+    path = _write(tmp_path / 'bad.csv', [c for c in STREAMLIT_COLUMNS if c != 'Survival_Prob'])
+    with pytest.raises(schemas.SchemaError, match='Survival_Prob'):
+        schemas.load_view('streamlit', files=[path])
+
+
+def test_wrong_column_type_fails_fast(tmp_path):
+    path = tmp_path / 'typed.csv'
+    _write(path, STREAMLIT_COLUMNS)
+    df = pd.read_csv(path)
+    df['EV_Share_Pct'] = 'high'
+    df.to_csv(path, index=False)
+    with pytest.raises(schemas.SchemaError, match='column types'):
+        schemas.load_view('streamlit', files=[str(path)])
+
+
+def test_first_fitting_file_is_projected_and_derived(tmp_path):
+    bad = _write(tmp_path / 'old.csv', ['country'])
+    good = _write(tmp_path / 'good.csv', [c for c in schemas.VIEWS['war_room']['columns'] if not c.endswith('_2023')] + ['extra'])
+    df = schemas.load_view('war_room', files=[bad, good])
+    assert list(df.columns) == list(schemas.VIEWS['war_room']['columns'])
+    assert df['EV_Share_Pct_2023'].iloc[0] == -1.5
+
+
+def test_no_candidate_file_returns_none(tmp_path):
+    assert schemas.load_view('streamlit', files=[str(tmp_path / 'absent.csv')]) is None
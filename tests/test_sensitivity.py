@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import qmc
+
+import roi_engine
+import sensitivity
+
+N = 2 ** 14
+K = len(sensitivity.FACTORS)
+
+
+def _saltelli_outputs(f):
+    # A, B and A-with-column-g-from-B blocks over K scalar factors in [0, 1), stacked as sobol_indices expects
+    u = qmc.Sobol(d=2 * K, scramble=True, seed=3).random(N)
+    a, b = u[:, :K], u[:, K:]
+    blocks = [a, b]
+    for g in range(K):
+        mixed = a.copy()
+        mixed[:, g] = b[:, g]
+        blocks.append(mixed)
+    return np.concatenate([f(block) for block in blocks])[:, None]
+
+
+def test_ishigami_indices():
+    # Ishigami on the first three factors, the rest inert; analytic values for a=7, b=0.1
+    def ishigami(u):
+        x = -np.pi + 2 * np.pi * u
+        return np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+    s1, st = sensitivity.sobol_indices(_saltelli_outputs(ishigami), N)
+    np.testing.assert_allclose(s1[0, :3], [0.3139, 0.4424, 0.0], atol=0.02)
+    np.testing.assert_allclose(st[0, :3], [0.5576, 0.4424, 0.2437], atol=0.02)
+    np.testing.assert_allclose(st[0, 3:], 0.0, atol=1e-12)
+
+
+def test_additive_model_has_equal_first_and_total_effects():
+    coef = np.array([3.0, 2.0, 1.0, 0.5, 0.0, 0.0, 0.0])
+    s1, st = sensitivity.sobol_indices(_saltelli_outputs(lambda u: u @ coef), N)
+    expected = coef ** 2 / (coef ** 2).sum()
+    np.testing.assert_allclose(s1[0], expected, atol=0.01)
+    np.testing.assert_allclose(st[0], expected, atol=0.01)
+
+
+@pytest.fixture(scope='module')
+def markets():
+    return pd.DataFrame({
+        'country': ['A', 'B', 'C', 'D'],
+        'Survival_Prob': [0.9, 0.75, 0.5, 0.95], 'market_room': [0.8, 0.6, 0.9, 0.3],
+        'purchasing_power': [5.0, 3.0, 1.0, 6.0], 'infra_saturation': [0.5, 0.2, 0.1, np.nan],
+    })
+
+
+def test_sweep_at_the_centre_matches_the_allocation_walk(markets):
+    # u = 0.5 leaves every feature at its value and every weight at 1.0
+    rank, alloc = sensitivity.sweep(markets, np.full((1, len(sensitivity.WEIGHTS) + 4 * len(markets)), 0.5))
+    scored = markets.assign(ROI_Score=roi_engine.roi_score(markets))
+    walk = roi_engine.allocate(scored).set_index('country')['allocation_musd']
+    np.testing.assert_array_equal(alloc[0], walk.reindex(markets['country']).fillna(0).to_numpy())
+    assert rank[0, 3] == 4                               # Unscored D ranks last and is never funded
+
+
+def test_sweep_ranks_are_permutations_within_budget(markets):
+    u = sensitivity.design(len(markets), n_base=64)
+    rank, alloc = sensitivity.sweep(markets, u, budget=30)
+    assert (np.sort(rank, axis=1) == np.arange(1, len(markets) + 1)).all()
+    assert (alloc.sum(axis=1) <= 30).all() and (alloc[:, 3] == 0).all()
+
+
+def test_analyze_shapes_and_bounds(markets):
+    result = sensitivity.analyze(markets, n_base=256)
+    assert result['n_evaluations'] == 256 * (K + 2)
+    assert list(result['rank']['ST'].columns) == sensitivity.FACTORS
+    assert (result['rank']['ST'].to_numpy() >= 0).all()
+    assert result['funded_share']['D'] == 0
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import siting
+
+
+@pytest.fixture(scope='module')
+def market():
+    return siting.synthetic_market('Testland', 2_000, 5e6, seed=1)
+
+
+def test_nearest_and_rivals_match_brute_force(market):
+    candidates = siting.synthetic_candidates(market, 500, seed=2)
+    scored = siting.score_sites(market, candidates)
+    dist = np.linalg.norm(candidates[:, None, :] - market['stations'][None, :, :], axis=2)
+    np.testing.assert_allclose(scored['nearest_km'], dist.min(axis=1))
+    rivals = np.where(dist.min(axis=1) <= siting.CANNIBAL_KM, (dist <= siting.CANNIBAL_KM).sum(axis=1), 0)
+    np.testing.assert_array_equal(scored['rivals'], rivals)
+    np.testing.assert_allclose(scored['coverage_gap'], np.clip(dist.min(axis=1) / siting.COVERAGE_KM, 0, 1))
+
+
+def test_market_without_stations_is_fully_uncovered(market):
+    empty = dict(market, stations=np.empty((0, 2)))
+    scored = siting.score_sites(empty, siting.synthetic_candidates(market, 100))
+    assert (scored['coverage_gap'] == 1).all() and (scored['rivals'] == 0).all()
+
+
+def test_top_sites_respect_minimum_spacing(market):
+    scored = siting.score_sites(market, siting.synthetic_candidates(market, 20_000, grid=True))
+    picks = siting.top_sites(scored, k=10)
+    xy = picks[['x_km', 'y_km']].to_numpy()
+    gaps = np.linalg.norm(xy[:, None] - xy[None, :], axis=2)[np.triu_indices(len(xy), 1)]
+    assert len(picks) == 10 and gaps.min() > siting.CANNIBAL_KM
+    assert picks['site_score'].is_monotonic_decreasing
+
+
+def test_lat_lon_projection_scale():
+    xy, origin = siting.to_local_km([50.0, 51.0], [10.0, 10.0])
+    assert np.linalg.norm(xy[1] - xy[0]) == pytest.approx(110.57)
+    assert origin == (50.5, 10.0)
+
+
+def test_real_files_in_one_frame(tmp_path):
+    stations, candidates = tmp_path / 'stations.csv', tmp_path / 'candidates.csv'
+    pd.DataFrame({'lat': [52.52, 48.14], 'lon': [13.40, 11.58]}).to_csv(stations, index=False)
+    pd.DataFrame({'LAT': [52.50, 50.11], 'LON': [13.40, 8.68], 'demand': [1.0, 3.0]}).to_csv(candidates, index=False)
+    result = siting.site_country('Germany', k=2, stations_file=str(stations), candidates_file=str(candidates))
+    assert result['stations'] == 2 and not result['synthetic']
+    assert result['sites']['nearest_km'].min() == pytest.approx(2.2, abs=0.1)   # Berlin candidate, 0.02° south
+
+
+def test_mixed_coordinate_systems_are_rejected(tmp_path):
+    stations, candidates = tmp_path / 'stations.csv', tmp_path / 'candidates.csv'
+    pd.DataFrame({'lat': [52.5], 'lon': [13.4]}).to_csv(stations, index=False)
+    pd.DataFrame({'x_km': [1.0], 'y_km': [2.0]}).to_csv(candidates, index=False)
+    with pytest.raises(ValueError, match='lat/lon'):
+        siting.site_country('Germany', stations_file=str(stations), candidates_file=str(candidates))
+
+
+def test_half_specified_files_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match='both'):
+        siting.site_country('Germany', stations_file=str(tmp_path / 'stations.csv'))
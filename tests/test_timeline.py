@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import feature_panel as fp
+import roi_engine
+import timeline
+
+
+class ConstantModel:
+    def predict_proba(self, X):
+        return np.column_stack([np.full(len(X), 0.3), np.full(len(X), 0.7)])
+
+
+@pytest.fixture(scope='module')
+def history():
+    rows = [('Germany', 2022, 20.0), ('Germany', 2023, 25.0), ('France', 2023, 15.0),
+            ('Turkiye', 2023, 7.0), ('Turkey', 2023, 7.2), ('World', 2023, 18.0)]
+    panel = pd.DataFrame(rows, columns=['Country', 'Year', 'EV_Share_Pct'])
+    for f in fp.RF_FEATURES:
+        panel[f] = panel.get(f, 1.0)
+    panel['GDP_per_capita'] = 40_000.0
+    panel['infra_score'] = 0.5
+    return {'version': 'test', 'frame': timeline.build_history(panel, ConstantModel())}
+
+
+def test_history_keeps_one_row_per_iso_year(history):
+    frame = history['frame']
+    assert sorted(frame['iso_alpha']) == ['DEU', 'DEU', 'FRA', 'TUR']   # World has no ISO code; Turkiye and Turkey share TUR
+    assert frame['Survival_Prob'].eq(0.7).all()
+    assert frame.loc[frame['iso_alpha'] == 'FRA', 'market_room'].item() == pytest.approx(0.85)
+
+
+def test_year_matrix_is_nan_where_a_country_has_no_row(history):
+    grid = timeline.year_matrix(history, 'EV_Share_Pct')
+    assert list(grid.index) == ['DEU', 'FRA', 'TUR'] and list(grid.columns) == [2022, 2023]
+    assert np.isnan(grid.loc['FRA', 2022]) and grid.loc['DEU', 2023] == 25.0
+
+
+def test_roi_matrix_follows_the_weights(history):
+    weights = (1.2, 0.8, 1.0)
+    grid = timeline.year_matrix(history, 'ROI_Score', weights)
+    frame = history['frame']
+    roi = np.asarray(roi_engine.roi_score(frame, *weights), float)
+    for (iso, year), value in zip(zip(frame['iso_alpha'], frame['Year']), roi):
+        assert grid.loc[iso, year] == pytest.approx(value)
+
+
+def test_frames_carry_only_float32_z(history):
+    fig = timeline.history_figure(history, 'EV_Share_Pct')
+    assert [f.name for f in fig.frames] == ['2022', '2023']
+    for frame in fig.frames:
+        trace = frame.data[0]
+        assert trace.locations is None and trace.text is None
+        assert np.asarray(trace.z).dtype == np.float32
+    base = fig.data[0]
+    assert list(base.locations) == ['DEU', 'FRA', 'TUR'] and (base.zmin, base.zmax) == (7.0, 25.0)
+    assert fig.layout.sliders[0].active == 1
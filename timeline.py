@@ -0,0 +1,86 @@
+import numpy as np
+import plotly.graph_objects as go
+
+import feature_panel as fp
+import iea_ingest
+import roi_engine
+
+# --- 1. SETTINGS ---
+METRICS = {
+    # column: (label, colorscale, hover format)
+    'EV_Share_Pct': ('EV Share (%)', 'Teal', '%{z:.1f}%'),
+    'ROI_Score': ('ROI Score', 'Viridis', '%{z:.1f}'),
+    'Survival_Prob': ('Survival Probability', 'RdYlGn', '%{z:.0%}'),
+}
+FRAME_MS = 700             # Play speed per year
+FRAME_DTYPE = np.float32   # Frames ship as binary float32 arrays: half the bytes of float64, finer than any colorscale
+
+# --- 2. COUNTRY x YEAR HISTORY (weight-independent, once per data/model version) ---
+def build_history(panel, model):
+    # Same ROI inputs the live views use, rebuilt per year: survival from the regime-aware RF on that
+    # year's features, room from share, wealth from GDP, and the station index as saturation (as in
+    # iea_ingest). Countries without an ISO code (regional rows) are dropped.
+    iso = iea_ingest.iso_lookup()
+    hist = panel.assign(iso_alpha=panel['Country'].map(lambda c: iso.get(iea_ingest.NAME_ALIASES.get(c, c))))
+    hist = hist.dropna(subset=['iso_alpha']).drop_duplicates(['iso_alpha', 'Year'])
+    hist['Survival_Prob'] = model.predict_proba(hist[fp.RF_FEATURES])[:, 1]
+    hist['market_room'] = (100 - hist['EV_Share_Pct']) / 100
+    hist['purchasing_power'] = hist['GDP_per_capita'] / 10000
+    hist['infra_saturation'] = hist['infra_score']
+    return hist[['iso_alpha', 'Country', 'Year', 'EV_Share_Pct', 'Survival_Prob', 'market_room',
+                 'purchasing_power', 'infra_saturation']].reset_index(drop=True)
+
+
+_cache = {}
+
+def get_history(master_file=fp.MASTER_FILE, gmm_file=fp.GMM_MODEL_FILE, model_file=fp.RF_MODEL_FILE):
+    key = (fp.file_version(master_file), fp.file_version(gmm_file), fp.file_version(model_file))
+    if None in key:
+        return None
+    if key not in _cache:
+        _cache.clear()
+        _cache[key] = {'version': '-'.join(key),
+                       'frame': build_history(fp.build_panel(master_file, gmm_file), fp.load_model(model_file))}
+    return _cache[key]
+
+# --- 3. ANIMATED CHOROPLETH ---
+def year_matrix(history, metric, weights=(1.0, 1.0, 1.0)):
+    # (countries x years) grid of the metric; NaN where a country has no row that year
+    frame = history['frame']
+    if metric == 'ROI_Score':
+        frame = frame.assign(ROI_Score=roi_engine.roi_score(frame, *weights))
+    return frame.pivot(index='iso_alpha', columns='Year', values=metric).sort_index()
+
+
+def history_figure(history, metric='EV_Share_Pct', weights=(1.0, 1.0, 1.0)):
+    # Locations, names, colorscale and a fixed color range are sent once in the base trace; each
+    # year's frame is a partial update of that trace carrying only its z array, so the slider and
+    # play button animate in the browser with no server rerun.
+    label, scale, fmt = METRICS[metric]
+    grid = year_matrix(history, metric, weights)
+    names = history['frame'].drop_duplicates('iso_alpha').set_index('iso_alpha')['Country'].reindex(grid.index)
+    z = grid.to_numpy(dtype=FRAME_DTYPE)
+    years = [int(y) for y in grid.columns]
+    lo, hi = float(np.nanmin(z)), float(np.nanmax(z))
+
+    fig = go.Figure(
+        data=[go.Choropleth(locations=grid.index, z=z[:, -1], text=names, zmin=lo, zmax=hi, colorscale=scale,
+                            marker_line_color='#cbd5e1', colorbar=dict(title=label, thickness=12),
+                            hovertemplate=f"<b>%{{text}}</b><br>{label}: {fmt}<extra></extra>")],
+        frames=[go.Frame(name=str(year), data=[go.Choropleth(z=z[:, j])], traces=[0]) for j, year in enumerate(years)],
+    )
+    play = dict(frame=dict(duration=FRAME_MS, redraw=True), transition=dict(duration=0), fromcurrent=True, mode='immediate')
+    fig.update_layout(
+        margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=560, paper_bgcolor='rgba(0,0,0,0)',
+        geo=dict(projection_type='natural earth', showland=True, landcolor='#f1f5f9', showframe=False, lataxis_range=[-55, 90]),
+        updatemenus=[dict(type='buttons', direction='left', x=0.0, y=0.0, xanchor='left', yanchor='top', pad=dict(t=40, r=10),
+                          buttons=[dict(label='▶ Play', method='animate', args=[None, play]),
+                                   dict(label='⏸ Pause', method='animate',
+                                        args=[[None], dict(frame=dict(duration=0, redraw=False), mode='immediate')])])],
+        sliders=[dict(active=len(years) - 1, x=0.12, len=0.88, y=0.0, yanchor='top', pad=dict(t=30),
+                      currentvalue=dict(prefix='Year: ', font=dict(size=14, color='#0f766e')),
+                      steps=[dict(label=str(year), method='animate',
+                                  args=[[str(year)], dict(frame=dict(duration=0, redraw=True), mode='immediate')])
+                             for year in years])],
+    )
+    return fig